@@ -1,59 +1,27 @@
 import csv
-import json
 import os
+import sys
 from datetime import datetime, timedelta
 
-atomic_log_path = r'c:\Users\gaelf\Documents\GitHub\local_ai_campaign_assistant\data\atomic_wallet_log\history-atomicwallet-02.02.2026.csv'
-output_path = r'c:\Users\gaelf\Documents\GitHub\local_ai_campaign_assistant\data\atomic_fund_analysis.csv'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.donation_store import ATOMIC, DonationStore
 
-def parse_date(date_str):
-    # Example: "20 January 2026 at 17:38:45 WET"
-    # Remove " WET" and other timezones if present
-    date_str = date_str.split(' at ')[0] + ' ' + date_str.split(' at ')[1].split(' ')[0]
-    return datetime.strptime(date_str, '%d %B %Y %H:%M:%S')
+atomic_log_path = 'data/atomic_wallet_log/history-atomicwallet-02.02.2026.csv'
+output_path = 'data/atomic_fund_analysis.csv'
 
-# Better date parser for the specific format
-def parse_atomic_date(date_str):
-    try:
-        # Example: "24 January 2026 at 22:58:43 WET"
-        parts = date_str.strip().split(' ')
-        # parts: ['24', 'January', '2026', 'at', '22:58:43', 'WET']
-        day = parts[0]
-        month = parts[1]
-        year = parts[2]
-        time = parts[4]
-        dt_str = f"{day} {month} {year} {time}"
-        return datetime.strptime(dt_str, '%d %B %Y %H:%M:%S')
-    except Exception as e:
-        print(f"Error parsing date '{date_str}': {e}")
-        return None
+# Wallet legs come from the donation fact store; the log is only re-read when it changes
+store = DonationStore()
+store.ingest(atomic_log_path, ATOMIC)
 
 transactions = []
-with open(atomic_log_path, mode='r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        dt = parse_atomic_date(row['DATE'])
-        if not dt: continue
-        
-        # IN transaction
-        if row.get('INAMOUNT') and row.get('INAMOUNT') != '-' and row.get('INCURRENCY') == 'TRX-USDT':
-            transactions.append({
-                'type': 'IN',
-                'amount': float(row['INAMOUNT']),
-                'date': dt,
-                'txid': row['INTXID'],
-                'address': row['ADDRESSTO'] # In logs, ADDRESSTO is often the wallet itself for IN?
-            })
-        
-        # OUT transaction
-        if row.get('OUTAMOUNT') and row.get('OUTAMOUNT') != '-' and row.get('OUTCURRENCY') == 'TRX-USDT':
-            transactions.append({
-                'type': 'OUT',
-                'amount': float(row['OUTAMOUNT']),
-                'date': dt,
-                'txid': row['ORDERID'], # Logs use ORDERID or INTXID differently
-                'address': row['ADDRESSTO']
-            })
+for fact in store.donations(kind=ATOMIC, source=atomic_log_path, currency='TRX-USDT'):
+    transactions.append({
+        'type': fact.direction.upper(),
+        'amount': fact.amount,
+        'date': fact.donated_at,
+        'txid': fact.reference, # INTXID for IN, ORDERID for OUT
+        'address': fact.counterparty # In logs, ADDRESSTO is often the wallet itself for IN?
+    })
 
 # Sort by date
 transactions.sort(key=lambda x: x['date'])
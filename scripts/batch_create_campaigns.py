@@ -1,89 +1,167 @@
 import requests
 import json
-import websocket
 import time
 import os
+import re
 import sys
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
 
-CDP_URL = "http://127.0.0.1:9222/json"
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.batch_runner import BatchJournal, run_pool
+from src.utils.cdp_client import CDPBrowser, CDPError
+from src.utils.media_catalog import MediaCatalog
+from src.utils.normalize_campaigns import write_json_atomic
+from src.utils.title_index import STRICT_KINDS, TitleIndex
+
+CDP_URL = "http://127.0.0.1:9222"
 GAZA_PICTURES = r"C:\Users\gaelf\Pictures\GAZA"
+START_URL = "https://whydonate.com/fundraising/start"
+BATCH_JSON = os.path.join('data', 'raneen_batch.json')
+JOURNAL_PATH = os.path.join('data', 'cache', 'raneen_batch.journal.jsonl')
+DEFAULT_TABS = 2
+MIN_START_INTERVAL = 10  # Seconds between campaign starts across all tabs (courtesy to the site)
+UPLOAD_EXTENSIONS = ('.jpg', '.jpeg', '.png')  # Image types the campaign form accepts
+
+# Readiness conditions, evaluated on every DOM mutation by page.wait_until
+START_READY_JS = """
+    (location.href.includes('/login') || location.href.includes('/account/login')) ? "LOGIN_REQUIRED" :
+    (document.querySelector('input[placeholder*="address"], mat-chip-option, mat-chip') ||
+     /step 1|humanitarian|start fundraiser/.test((document.body.innerText || "").toLowerCase())) ? "OK" : null
+"""
+FORM_READY_JS = "!!document.querySelector('input[placeholder*=\"address\"], mat-chip-option')"
+STEP2_READY_JS = """
+    !!document.querySelector('input[placeholder*="Title"], input[formcontrolname="title"]') ||
+    /who is this fundraiser for|yourself|mijzelf/.test((document.body.innerText || "").toLowerCase())
+"""
+STEP3_READY_JS = """
+    !!document.querySelector('input[placeholder*="Title"], input[formcontrolname="title"], input[placeholder*="itulo"], textarea')
+"""
+LEFT_START_JS = "!location.href.includes('fundraising/start') && location.href"
+
+# In-page polling for the step scripts: resolves as soon as `cond()` holds, or with its last value after `ms`
+WAIT_FOR_JS = """
+        const waitFor = async (cond, ms) => {
+            const end = Date.now() + ms;
+            let value = cond();
+            while (!value && Date.now() < end) {
+                await new Promise(r => setTimeout(r, 100));
+                value = cond();
+            }
+            return value;
+        };
+"""
+
+UPLOAD_PATH = re.compile(r"upload|image|media|file|photo|picture", re.IGNORECASE)
+
+def is_upload_request(request):
+    """The image upload: a POST/PUT carrying a file, or sent to an upload/media endpoint (not analytics beacons)"""
+    if request.get("method") not in ("POST", "PUT"):
+        return False
+    headers = {k.lower(): v for k, v in (request.get("headers") or {}).items()}
+    content_type = (headers.get("content-type") or "").lower()
+    if content_type.startswith(("multipart/form-data", "image/", "application/octet-stream")):
+        return True
+    return bool(UPLOAD_PATH.search(urlparse(request.get("url") or "").path))
+
+class StepTimer:
+    """
+    Wall-clock duration of each creation step. Timeouts adapt to the site's
+    recent speed: three times the slowest of the last few runs of a step,
+    bounded by [floor, default]. History is shared by all tabs; the
+    timings of the campaign in progress are per thread.
+    """
+
+    def __init__(self, history=5):
+        self.history = history
+        self.recent = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current(self):
+        if not hasattr(self._local, "current"):
+            self._local.current = {}
+        return self._local.current
 
-MSG_ID = 1
+    def begin_campaign(self):
+        self._local.current = {}
+
+    def _remember(self, step, elapsed):
+        self.current[step] = elapsed
+        with self._lock:
+            self.recent.setdefault(step, []).append(elapsed)
+            del self.recent[step][:-self.history]
+
+    def record(self, step, started):
+        elapsed = round(time.time() - started, 2)
+        self._remember(step, elapsed)
+        print(f"DEBUG: [{threading.current_thread().name}] step '{step}' took {elapsed}s", flush=True)
+        return elapsed
+
+    def miss(self, step, waited):
+        """
+        A wait that gave up after `waited` seconds. It counts as a run of that
+        length, so the next timeout grows (up to its default) instead of
+        staying at the floor the fast runs set.
+        """
+        self._remember(step, waited)
+        print(f"DEBUG: [{threading.current_thread().name}] step '{step}' timed out after {waited}s", flush=True)
+
+    def timeout(self, step, default, floor=5):
+        with self._lock:
+            recent = list(self.recent.get(step, ()))
+        if not recent:
+            return default
+        return min(default, max(floor, 3 * max(recent)))
+
+TIMER = StepTimer()
+
+_MEDIA = None
+_MEDIA_LOCK = threading.Lock()
+
+def media_catalog():
+    """Catalog of GAZA_PICTURES, brought up to date once per run (only changed files are re-read)"""
+    global _MEDIA
+    with _MEDIA_LOCK:
+        if _MEDIA is None:
+            _MEDIA = MediaCatalog()
+            if os.path.isdir(GAZA_PICTURES):
+                _MEDIA.sync(GAZA_PICTURES)
+        return _MEDIA
 
 def get_socket():
-    global MSG_ID
+    """Page handle on a Whydonate tab (opened if none), over the shared CDP client"""
     try:
-        r = requests.get(CDP_URL).json()
-        print(f"Debugger active tabs: {len(r)}")
-        target_tab = None
-        for t in r:
-            if 'whydonate.com' in t.get('url', '') and t['type'] == 'page':
-                target_tab = t
-                break
-        
-        if not target_tab:
-            print("No Whydonate tab found. Opening a new one...")
-            requests.put(f"{CDP_URL}/new?https://whydonate.com/fundraising/start")
-            time.sleep(5)
-            r = requests.get(CDP_URL).json()
-            for t in r:
-                if 'whydonate.com' in t.get('url', '') and t['type'] == 'page':
-                    target_tab = t
-                    break
-        
-        if target_tab:
-            print(f"Connecting to: {target_tab['url']}")
-            ws = websocket.create_connection(target_tab['webSocketDebuggerUrl'])
-            ws.settimeout(60)
-            # Enable basic domains
-            ws.send(json.dumps({"id": 10001, "method": "Page.enable"}))
-            ws.send(json.dumps({"id": 10002, "method": "Runtime.enable"}))
-            return ws
+        browser = CDPBrowser(CDP_URL)
+        print(f"Debugger active tabs: {len(browser.pages())}")
+        page = browser.page(lambda t: 'whydonate.com' in t.get('url', ''), open_url=START_URL)
+        if page:
+            print(f"Connecting to: {page.evaluate('window.location.href', await_promise=False)}")
+            # Enable basic domains (one round trip)
+            page.enable("Page", "Runtime")
+            return page
             
         return None
     except Exception as e:
         print(f"Socket error: {e}")
         return None
 
-def run_js(ws, js, await_promise=True, timeout=60):
-    global MSG_ID
-    MSG_ID += 1
-    this_id = MSG_ID
-    msg = json.dumps({
-        "id": this_id,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js,
-            "returnByValue": True,
-            "awaitPromise": await_promise
-        }
-    })
+def run_js(page, js, await_promise=True, timeout=60):
     try:
-        ws.send(msg)
-        start_t = time.time()
-        while time.time() - start_t < timeout:
-            try:
-                ws.settimeout(1)
-                res_str = ws.recv()
-            except websocket.WebSocketTimeoutException:
-                continue
-            finally:
-                ws.settimeout(60)
-            
-            debug_res = json.loads(res_str)
-            if debug_res.get('id') == this_id:
-                if 'exceptionDetails' in debug_res.get('result', {}):
-                    print(f"JS Run Error [ID: {this_id}]: {debug_res['result']['exceptionDetails']}", flush=True)
-                    return None
-                val = debug_res.get('result', {}).get('result', {}).get('value')
-                if val is None:
-                    print(f"JS Result is None for ID {this_id}. Raw msg snippet: {res_str[:500]}", flush=True)
-                return val
-            
-        print(f"JS Timeout [ID: {this_id}, {timeout}s]", flush=True)
+        val = page.evaluate(js, await_promise=await_promise, timeout=timeout)
+        if val is None:
+            print(f"JS Result is None for: {js.strip()[:80]}", flush=True)
+        return val
+    except CDPError as e:
+        print(f"JS Run Error: {e.error}", flush=True)
+        return None
+    except TimeoutError:
+        print(f"JS Timeout [{timeout}s]", flush=True)
         return None
     except Exception as e:
-        print(f"JS Run Exception [ID: {this_id}]: {e}")
+        print(f"JS Run Exception: {e}")
         return None
 
 def find_local_image(title):
@@ -93,30 +171,15 @@ def find_local_image(title):
     print(f"Looking for names: {names}")
     
     try:
-        dirs = [d for d in os.listdir(GAZA_PICTURES) if os.path.isdir(os.path.join(GAZA_PICTURES, d))]
+        catalog = media_catalog()
         for name in names:
-            matches = [d for d in dirs if name.lower() in d.lower()]
+            # QR codes and images under 25KB are not campaign photos; the form takes JPEG/PNG only
+            matches = [m for m in catalog.find(name, root=GAZA_PICTURES, min_size=25000)
+                       if m.path.lower().endswith(UPLOAD_EXTENSIONS)]
             if matches:
-                 # Check if match is a good one (not just a common word)
-                 print(f"Found folder match: {matches[0]}")
-                 target_dir = os.path.join(GAZA_PICTURES, matches[0])
-                 images = [f for f in os.listdir(target_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-                 # Filter out QR codes from local results too
-                 valid_images = []
-                 for img in images:
-                     img_lower = img.lower()
-                     if "qr" in img_lower or "code" in img_lower:
-                         continue
-                     
-                     full_p = os.path.join(target_dir, img)
-                     if os.path.getsize(full_p) < 25000: # 25KB minimum for local
-                         continue
-                     valid_images.append(full_p)
-
-                 if valid_images:
-                     p = os.path.abspath(valid_images[0])
-                     print(f"Valid local image match: {p}")
-                     return p
+                print(f"Found folder match: {matches[0].folder}")
+                print(f"Valid local image match: {matches[0].path}")
+                return matches[0].path
     except Exception as e:
         print(f"Image search error: {e}")
     return None
@@ -147,39 +210,18 @@ def download_image(url, campaign_id):
         print(f"Download error: {e}")
     return None
 
-def check_connection(ws):
+def check_connection(page):
     """
     Performs a lightweight check to see if the connection and session are still alive.
     Returns: 'OK', 'LOGIN_REQUIRED', or 'DEAD'
     """
     try:
-        # 1. Check if socket is open
-        if not ws or not ws.connected:
+        # 1. Check if we have a page at all
+        if not page:
             return "DEAD"
         
         # 2. Try a very simple JS call with a short timeout
-        check_id = 99999
-        msg = json.dumps({
-            "id": check_id,
-            "method": "Runtime.evaluate",
-            "params": {
-                "expression": "window.location.href",
-                "returnByValue": True
-            }
-        })
-        ws.send(msg)
-        
-        start_t = time.time()
-        res_url = None
-        while time.time() - start_t < 3:
-            try:
-                ws.settimeout(0.5)
-                res = json.loads(ws.recv())
-                if res.get('id') == check_id:
-                    res_url = res.get('result', {}).get('result', {}).get('value')
-                    break
-            except:
-                continue
+        res_url = page.evaluate("window.location.href", await_promise=False, timeout=3)
         
         if not res_url:
             return "DEAD"
@@ -192,64 +234,33 @@ def check_connection(ws):
     except:
         return "DEAD"
 
-def process_campaign(ws, campaign):
-    global MSG_ID
+def process_campaign(page, campaign):
     print(f"\n--- [START] {campaign['title']} ---", flush=True)
     
+    TIMER.begin_campaign()
+
     # Navigating with retry
     for i in range(3):
         print(f"Navigation attempt {i+1}...", flush=True)
-        global MSG_ID
-        MSG_ID += 1
-        nav_id = MSG_ID
-        ws.send(json.dumps({"id": nav_id, "method": "Page.navigate", "params": {"url": "https://whydonate.com/fundraising/start"}}))
-        print("Navigation command acknowledged.", flush=True)
-        
-        # Drain until navigation id or timeout
-        start_n = time.time()
-        while time.time() - start_n < 10:
-            try:
-                ws.settimeout(1)
-                res = json.loads(ws.recv())
-                if res.get('id') == nav_id: break
-            except: continue
-        
-        # Poll for specific text or button
-        check_js = """
-        (async function() {
-            if (window.location.href.includes('/login') || window.location.href.includes('/account/login')) return "LOGIN_REQUIRED";
-            
-            for (let i = 0; i < 20; i++) {
-                const text = (document.body.innerText || "").toLowerCase();
-                const hasButtons = document.querySelectorAll('button').length > 0;
-                const hasChips = !!document.querySelector('mat-chip-option, mat-chip');
-                const hasAddress = !!document.querySelector('input[placeholder*="address"]');
-                
-                const ok = text.includes('step 1') || 
-                          text.includes('humanitarian') || 
-                          text.includes('start fundraiser') ||
-                          text.includes('whydonate') ||
-                          hasButtons || 
-                          hasAddress;
-                          
-                if (ok) return "OK";
-                await new Promise(r => setTimeout(r, 250));
-            }
-            
-            const text = (document.body.innerText || "").toLowerCase();
-            return `DEBUG: final_text_len=${text.length}, buttons=${document.querySelectorAll('button').length > 0}`;
-        })()
-        """
-        result = run_js(ws, check_js)
+        started = time.time()
+        try:
+            page.navigate(START_URL, wait=True, timeout=TIMER.timeout("navigate", 30))
+            print("Navigation load event received.", flush=True)
+        except Exception as e:
+            print(f"Navigation failed: {e}", flush=True)
+
+        # Resolves as soon as the start page (or a login redirect) is rendered
+        result = page.wait_until(START_READY_JS, timeout=TIMER.timeout("start_ready", 15))
         if result == "LOGIN_REQUIRED":
             print("Session expired or redirected to login. Please ensure you are logged in.", flush=True)
             return "ERROR_LOGIN"
             
         if result == "OK":
+            TIMER.record("navigate", started)
             print("Page loaded (found text or button).", flush=True)
             
             # IMPROVED: Check if we are on the landing page and need to click "Start Fundraiser"
-            is_landing = run_js(ws, """
+            is_landing = run_js(page, """
                 (function() {
                     const buttons = Array.from(document.querySelectorAll('button, a'));
                     const btn = buttons.find(b => (b.innerText || "").includes('Start Fundraiser'));
@@ -262,14 +273,19 @@ def process_campaign(ws, campaign):
             """)
             if is_landing:
                 print("Clicked 'Start Fundraiser' landing button. Waiting for form...", flush=True)
-                time.sleep(8)
+                started = time.time()
+                landing_timeout = TIMER.timeout("landing", 20)
+                if page.wait_until(FORM_READY_JS, timeout=landing_timeout):
+                    TIMER.record("landing", started)
+                else:
+                    TIMER.miss("landing", landing_timeout)
+                    print("Form did not appear after the landing click; continuing.", flush=True)
             break
         
         print(f"Page didn't load target elements (Attempt {i+1}). Result: {result}", flush=True)
-        print(f"Current URL: {run_js(ws, 'window.location.href')}", flush=True)
-        snippet = run_js(ws, "document.body.innerText.substring(0, 200)")
+        print(f"Current URL: {run_js(page, 'window.location.href')}", flush=True)
+        snippet = run_js(page, "document.body.innerText.substring(0, 200)")
         print(f"Snippet: {snippet}", flush=True)
-        time.sleep(5)
     else:
         print("Failed to reach start page after 3 attempts.", flush=True)
         return False
@@ -287,16 +303,14 @@ def process_campaign(ws, campaign):
     
     # STEP 1: Category & Location
     print("Step 1 execution...", flush=True)
+    started = time.time()
     js1 = """
-    (async function() {
+    (async function() {""" + WAIT_FOR_JS + """
         // Wait for form to be visible
-        let attempts = 0;
-        while (attempts < 20) {
-            if (document.querySelector('input[placeholder*="address"]') || document.querySelector('mat-chip-option')) break;
-            if (document.querySelector('mat-card, .fundraiser-type-card')) return "SKIPPED_ALREADY_ON_2";
-            attempts++;
-            await new Promise(r => setTimeout(r, 1000));
-        }
+        const form = await waitFor(() =>
+            (document.querySelector('input[placeholder*="address"]') || document.querySelector('mat-chip-option')) ? "FORM" :
+            document.querySelector('mat-card, .fundraiser-type-card') ? "STEP2" : null, 20000);
+        if (form === "STEP2") return "SKIPPED_ALREADY_ON_2";
 
         // Find category
         const findCat = () => {
@@ -314,7 +328,8 @@ def process_campaign(ws, campaign):
             chip.scrollIntoView();
             if (chip.tagName === 'MAT-CHIP-OPTION') chip.setAttribute('aria-selected', 'true');
             chip.click();
-            await new Promise(r => setTimeout(r, 1000));
+            await waitFor(() => chip.getAttribute('aria-selected') === 'true' ||
+                                chip.classList.contains('mat-mdc-chip-selected') || chip.classList.contains('mat-chip-selected'), 1000);
         }
         
         const addr = document.querySelector('input[placeholder*="address"]');
@@ -328,28 +343,26 @@ def process_campaign(ws, campaign):
                 await new Promise(r => setTimeout(r, 50));
             }
             // Wait for suggestions
-            let suggestion = null;
-            for (let i=0; i<15; i++) {
-                suggestion = document.querySelector('.mat-mdc-option, .pac-item, mat-option, .autocomplete-suggestion');
-                if (suggestion) break;
-                await new Promise(r => setTimeout(r, 500));
-            }
+            const suggestionSelector = '.mat-mdc-option, .pac-item, mat-option, .autocomplete-suggestion';
+            const suggestion = await waitFor(() => document.querySelector(suggestionSelector), 7500);
             if (suggestion) {
                 suggestion.click();
-                await new Promise(r => setTimeout(r, 1000));
+                // The choice is applied once the suggestion list closes
+                await waitFor(() => !document.querySelector(suggestionSelector), 3000);
             } else {
                 // Fallback: Enter
                 addr.dispatchEvent(new KeyboardEvent('keydown', { key: 'ArrowDown', bubbles: true }));
-                await new Promise(r => setTimeout(r, 500));
+                await waitFor(() => addr.getAttribute('aria-activedescendant') ||
+                                    document.querySelector('.mat-mdc-option-active, mat-option.mat-active, .pac-item-selected'), 500);
                 addr.dispatchEvent(new KeyboardEvent('keydown', { key: 'Enter', bubbles: true }));
             }
         }
         
-        await new Promise(r => setTimeout(r, 2000));
-        
-        const nextBtn = document.getElementById('saveStep1') || 
-                        document.querySelector('button[id="saveStep1"]') ||
-                        Array.from(document.querySelectorAll('button')).find(b => (b.innerText || "").includes('Next'));
+        // The form enables Next once category and address validate
+        const findNext = () => document.getElementById('saveStep1') ||
+                               Array.from(document.querySelectorAll('button')).find(b => (b.innerText || "").includes('Next'));
+        await waitFor(() => { const b = findNext(); return b && !b.disabled; }, 5000);
+        const nextBtn = findNext();
         if (nextBtn) {
             nextBtn.disabled = false;
             nextBtn.click();
@@ -358,72 +371,76 @@ def process_campaign(ws, campaign):
         return "NEXT_BUTTON_NOT_FOUND";
     })()
     """
-    res1 = run_js(ws, js1, timeout=45)
+    res1 = run_js(page, js1, timeout=45)
     print(f"Step 1 Result: {res1}", flush=True)
     if not res1:
         print("Step 1 Failed. Stopping campaign process.")
         return False
-    time.sleep(8)
+    # Step 2 renders client-side; resume as soon as it is on screen
+    if not page.wait_until(STEP2_READY_JS, timeout=TIMER.timeout("step1", 20)):
+        print("Step 2 not detected yet; continuing with its own checks.", flush=True)
+    TIMER.record("step1", started)
     
     # STEP 2: Myself
     print("Step 2: Choosing target...", flush=True)
+    started = time.time()
     js2 = """
-    (async function() {
+    (async function() {""" + WAIT_FOR_JS + """
+        const onStep3 = () => document.querySelector('input[placeholder*="Title"]') ||
+                              document.querySelector('input[formcontrolname="title"]') ||
+                              document.querySelector('input[placeholder*="itulo"]') ||
+                              document.querySelector('textarea');
         // Wait for page to be ready
-        for (let i = 0; i < 20; i++) {
-            if (document.body.innerText.toLowerCase().includes('who is this fundraiser for') || 
-                document.body.innerText.toLowerCase().includes('yourself') ||
-                document.body.innerText.toLowerCase().includes('mijzelf')) break;
-            await new Promise(r => setTimeout(r, 500));
-        }
+        await waitFor(() => /who is this fundraiser for|yourself|mijzelf/.test((document.body.innerText || "").toLowerCase()), 10000);
 
         if (document.querySelector('input[placeholder*="Title"]')) return "SKIPPED_ALREADY_ON_3";
         
         const targets = ["myself", "mijzelf", "yourself", "uzelf", "u zelf", "moi-même", "moi-meme"];
+        const findMyself = () => Array.from(document.querySelectorAll('mat-card, .fundraiser-type-card, div[role="button"], span, p, h3, div, .mdc-card')).find(el => {
+            const t = (el.innerText || "").toLowerCase().trim();
+            return targets.includes(t) || (el.children.length === 0 && targets.some(tgt => t.includes(tgt)));
+        });
+        const findNext = () => document.getElementById('saveStep2') ||
+                    Array.from(document.querySelectorAll('button')).find(b => {
+                        const t = (b.innerText || "").toLowerCase();
+                        return t.includes('next') || t.includes('volgende') || t.includes('suivant');
+                    });
         let attempts = 0;
         while (attempts < 15) {
-            const myself = Array.from(document.querySelectorAll('mat-card, .fundraiser-type-card, div[role="button"], span, p, h3, div, .mdc-card')).find(el => {
-                const t = (el.innerText || "").toLowerCase().trim();
-                return targets.includes(t) || (el.children.length === 0 && targets.some(tgt => t.includes(tgt)));
-            });
-
+            const myself = findMyself();
             if (myself) {
                 const choice = myself.closest('mat-card, .fundraiser-type-card, div[role="button"], mat-chip-option, .mdc-card') || myself;
                 choice.click();
-                await new Promise(r => setTimeout(r, 1000));
+                // Selecting the target enables Next
+                await waitFor(() => { const b = findNext(); return b && !b.disabled; }, 1000);
             }
             
-            const btn = document.getElementById('saveStep2') || 
-                        Array.from(document.querySelectorAll('button')).find(b => {
-                            const t = (b.innerText || "").toLowerCase();
-                            return t.includes('next') || t.includes('volgende') || t.includes('suivant');
-                        });
+            const btn = findNext();
             if (btn) {
                 btn.removeAttribute('disabled');
                 btn.click();
-                // Wait to see if it moves
-                await new Promise(r => setTimeout(r, 4000));
-                const onStep3 = document.querySelector('input[placeholder*="Title"]') || 
-                                document.querySelector('input[formcontrolname="title"]') ||
-                                document.querySelector('input[placeholder*="itulo"]') ||
-                                document.querySelector('textarea');
-                if (onStep3) return "SUCCESS";
+                // Resolves as soon as step 3 renders
+                if (await waitFor(onStep3, 4000)) return "SUCCESS";
             }
             attempts++;
-            await new Promise(r => setTimeout(r, 1000));
+            // Retry once the page shows a target or a Next button (or has moved on by itself)
+            if (await waitFor(onStep3, 0)) return "SUCCESS";
+            await waitFor(() => onStep3() || findMyself() || findNext(), 1000);
         }
         return "TARGET_BUTTON_NOT_FOUND_OR_STUCK";
     })()
     """
-    res2 = run_js(ws, js2, timeout=60)
+    res2 = run_js(page, js2, timeout=60)
     print(f"Step 2 Result: {res2}", flush=True)
     if not res2 or "SUCCESS" not in res2 and "SKIPPED" not in res2:
         print("Step 2 Failed. Stopping campaign process.")
         return False
-    time.sleep(5)
+    page.wait_until(STEP3_READY_JS, timeout=TIMER.timeout("step2", 15))
+    TIMER.record("step2", started)
     
     # STEP 3: Details
     print("Step 3 execution...")
+    started = time.time()
     
     raw_desc = (campaign.get('description') or "").strip()
     if len(raw_desc) < 200:
@@ -448,12 +465,10 @@ def process_campaign(ws, campaign):
     desc = campaign['title'] + "\n\n" + raw_desc + policy_clause
     
     js3 = f"""
-    (async function() {{
+    (async function() {{{WAIT_FOR_JS}
         try {{
-            let attempts = 0;
-            let titleInput = null;
-            while (attempts < 40) {{
-                titleInput = document.querySelector('input[placeholder*="Title"]') || 
+            const titleInput = await waitFor(() =>
+                             document.querySelector('input[placeholder*="Title"]') || 
                              document.querySelector('input[formcontrolname="title"]') ||
                              document.querySelector('input[id*="mat-input"]') ||
                              Array.from(document.querySelectorAll('input')).find(i => {{
@@ -463,11 +478,7 @@ def process_campaign(ws, campaign):
                              Array.from(document.querySelectorAll('mat-label')).find(l => {{
                                  const lt = (l.innerText || "").toLowerCase();
                                  return lt.includes('title') || lt.includes('titel') || lt.includes('titre');
-                             }})?.closest('mat-form-field, .mat-mdc-form-field')?.querySelector('input');
-                if (titleInput) break;
-                attempts++;
-                await new Promise(r => setTimeout(r, 1000));
-            }}
+                             }})?.closest('mat-form-field, .mat-mdc-form-field')?.querySelector('input'), 40000);
             
             if (!titleInput) {{
                 const availableInputs = Array.from(document.querySelectorAll('input, textarea')).map(i => i.placeholder || i.getAttribute('formcontrolname') || i.id).join(', ');
@@ -519,146 +530,105 @@ def process_campaign(ws, campaign):
         }}
     }})()
     """
-    res3 = run_js(ws, js3, timeout=60)
+    res3 = run_js(page, js3, timeout=60)
     print(f"Step 3 Details: {res3}")
     if not res3 or "SUCCESS" not in res3:
         print("Step 3 Failed. Stopping campaign process.")
         return False
+    TIMER.record("step3", started)
     
     # Image Upload
     if final_image_path and os.path.exists(final_image_path):
         print(f"Uploading image: {final_image_path}")
         try:
-            # We need a new requestId for each call
-            MSG_ID += 1
-            id1 = MSG_ID
-            ws.send(json.dumps({"id": id1, "method": "DOM.getDocument"}))
-            # Drain until we get result
-            doc_res = None
-            start_u = time.time()
-            ws.settimeout(2)
-            while time.time() - start_u < 10:
-                try:
-                    r = json.loads(ws.recv())
-                    if r.get('id') == id1:
-                        doc_res = r
-                        break
-                except: continue
-            
-            if doc_res:
-                root = doc_res['result']['root']
-                MSG_ID += 1
-                id2 = MSG_ID
-                ws.send(json.dumps({
-                    "id": id2, 
-                    "method": "DOM.querySelector", 
-                    "params": {"nodeId": root['nodeId'], "selector": "input[type='file']"}
-                }))
-                # Drain
-                node_res = None
-                while time.time() - start_u < 15:
-                    try:
-                        r = json.loads(ws.recv())
-                        if r.get('id') == id2:
-                            node_res = r
-                            break
-                    except: continue
-                
-                if node_res and 'nodeId' in node_res.get('result', {}):
-                    nid = node_res['result']['nodeId']
-                    # Wrap in block to avoid redeclaration if run multiple times
-                    run_js(ws, "{ const f = document.querySelector('input[type=\"file\"]'); if(f) f.style.display='block'; }")
-                    MSG_ID += 1
-                    id3 = MSG_ID
-                    ws.send(json.dumps({
-                        "id": id3,
-                        "method": "DOM.setFileInputFiles",
-                        "params": {"files": [final_image_path], "nodeId": nid}
-                    }))
-                    # Final drain for upload confirmation
-                    while time.time() - start_u < 20:
-                        try:
-                            r = json.loads(ws.recv())
-                            if r.get('id') == id3: break
-                        except: continue
-                    
-                    ws.settimeout(60) # Restore
-                    run_js(ws, "{ const f = document.querySelector('input[type=\"file\"]'); if(f) f.dispatchEvent(new Event('change', { bubbles: true })); }")
-                    print("Image upload command sent. Waiting for upload process...", flush=True)
-                    time.sleep(10) # Wait for backend processing of image
+            # Make the hidden input reachable, set the file, then let the page see the change
+            run_js(page, "{ const f = document.querySelector('input[type=\"file\"]'); if(f) f.style.display='block'; }")
+            # Armed before the file is set, so the upload request cannot be missed
+            upload = page.watch_requests(is_upload_request)
+            started = time.time()
+            if page.set_file_input("input[type='file']", [final_image_path]):
+                run_js(page, "{ const f = document.querySelector('input[type=\"file\"]'); if(f) f.dispatchEvent(new Event('change', { bubbles: true })); }")
+                print("Image upload command sent. Waiting for upload request...", flush=True)
+                upload_timeout = TIMER.timeout("upload", 30)
+                finished = upload.wait(timeout=upload_timeout)
+                if finished is None:
+                    TIMER.miss("upload", upload_timeout)
+                    print("No upload request finished in time; continuing.", flush=True)
                 else:
-                    ws.settimeout(60)
-                    print("File input not found.")
+                    print(f"Upload finished: HTTP {finished['status']} {'(failed)' if finished['failed'] else ''}", flush=True)
+                    TIMER.record("upload", started)
             else:
-                ws.settimeout(60)
-                print("Document root not found.")
+                upload.close()
+                print("File input not found.")
         except Exception as e:
             print(f"Image Error: {e}")
     
     # Final click
     print("Step 4: Executing final click...", flush=True)
+    started = time.time()
     js_final = """
-    (async function() {
+    (async function() {""" + WAIT_FOR_JS + """
+        const findBtn = (enabledOnly) => {
+             const btns = Array.from(document.querySelectorAll('button'));
+             // Prioritize buttons in panels or dialogs
+             const prioritized = btns.filter(b => b.closest('mat-dialog-container, .right-panel, .drawer, .modal'));
+             return (prioritized.length > 0 ? prioritized : btns).find(b => {
+                const t = (b.innerText || "").toLowerCase();
+                return (t.includes('finish') || t.includes('publish') || t.includes('save') || t.includes('create') || t.includes('confirm')) && !(enabledOnly && b.disabled);
+             });
+        };
         window.scrollTo(0, document.body.scrollHeight);
-        await new Promise(r => setTimeout(r, 1000));
+        // The last section renders once scrolled into view
+        await waitFor(() => findBtn() || document.querySelector('mat-slide-toggle, mat-button-toggle, mat-switch, .mdc-switch, mat-checkbox'), 1000);
         
         // Handle new two-state switches (Public/Private, Publish/Draft)
+        const isChecked = t => t.classList.contains('mat-checked') || t.classList.contains('mat-button-toggle-checked') ||
+                               t.getAttribute('aria-checked') === 'true' || (t.querySelector('input') && t.querySelector('input').checked);
         const toggles = Array.from(document.querySelectorAll('mat-slide-toggle, mat-button-toggle, mat-switch, .mdc-switch'));
         for (let t of toggles) {
             const label = (t.innerText || t.getAttribute('aria-label') || "").toLowerCase();
-            const isChecked = t.classList.contains('mat-checked') || t.classList.contains('mat-button-toggle-checked') || (t.querySelector('input') && t.querySelector('input').checked);
+            const wasChecked = isChecked(t);
             
-            if ((label.includes('private') || label.includes('draft')) && isChecked) {
-                t.click();
-                await new Promise(r => setTimeout(r, 500));
-            } else if ((label.includes('public') || label.includes('publish') || label.includes('online')) && !isChecked) {
+            if (((label.includes('private') || label.includes('draft')) && wasChecked) ||
+                ((label.includes('public') || label.includes('publish') || label.includes('online')) && !wasChecked)) {
                 t.click();
-                await new Promise(r => setTimeout(r, 500));
+                await waitFor(() => isChecked(t) !== wasChecked, 500);
             }
         }
 
         // Find and click all checkboxes (Agreement, etc.)
+        const isTicked = ch => ch.checked || ch.classList.contains('mat-checkbox-checked') || ch.classList.contains('mat-mdc-checkbox-checked') ||
+                               !!(ch.querySelector && ch.querySelector('input:checked'));
         const checks = document.querySelectorAll('mat-checkbox:not(.mat-checkbox-checked), input[type="checkbox"]:not(:checked)');
         for (let ch of checks) {
+            if (isTicked(ch)) continue;  // Ticked through its mat-checkbox already
             ch.click();
-            await new Promise(r => setTimeout(r, 500));
+            await waitFor(() => isTicked(ch), 500);
         }
 
-        const findAndClickBtn = () => {
-             const btns = Array.from(document.querySelectorAll('button'));
-             // Prioritize buttons in panels or dialogs
-             const prioritized = btns.filter(b => b.closest('mat-dialog-container, .right-panel, .drawer, .modal'));
-             const target = (prioritized.length > 0 ? prioritized : btns).find(b => {
-                const t = (b.innerText || "").toLowerCase();
-                return (t.includes('finish') || t.includes('publish') || t.includes('save') || t.includes('create') || t.includes('confirm')) && !b.disabled;
-             });
-             if (target) {
-                 target.click();
-                 return true;
-             }
-             return false;
-        };
-
-        let attempts = 0;
-        while (attempts < 10) {
-            if (findAndClickBtn()) return "SUCCESS_CLICKED";
-            attempts++;
-            await new Promise(r => setTimeout(r, 1500));
-        }
-        return "BUTTON_NOT_FOUND_OR_DISABLED";
+        // Click as soon as the button is enabled
+        const clicked = await waitFor(() => {
+            const target = findBtn(true);
+            if (target) {
+                target.click();
+                return true;
+            }
+            return false;
+        }, 15000);
+        return clicked ? "SUCCESS_CLICKED" : "BUTTON_NOT_FOUND_OR_DISABLED";
     })()
     """
-    res_final = run_js(ws, js_final)
+    res_final = run_js(page, js_final)
     print(f"Final click result: {res_final}")
     
     # VERIFICATION: Check if URL changed/contains evidence of success
-    final_url = None
-    start_v = time.time()
-    while time.time() - start_v < 20:
-        final_url = run_js(ws, "window.location.href")
-        if final_url and "fundraising/start" not in final_url:
-            break
-        time.sleep(2)
+    try:
+        final_url = page.wait_until(LEFT_START_JS, timeout=TIMER.timeout("submit", 20)) or run_js(page, "window.location.href")
+    except Exception as e:
+        print(f"URL check failed: {e}", flush=True)
+        final_url = None
+    TIMER.record("submit", started)
+    campaign['step_timings'] = dict(TIMER.current)
         
     print(f"Final URL after save: {final_url}")
     
@@ -670,7 +640,7 @@ def process_campaign(ws, campaign):
     if "fundraising/start" in final_url:
         print("STILL ON START PAGE - Submission likely failed or was blocked by validation.", flush=True)
         # Extract visible errors and element states
-        diag = run_js(ws, """
+        diag = run_js(page, """
             (function() {
                 const getButtons = () => Array.from(document.querySelectorAll('button')).map(b => ({
                     text: (b.innerText || "").trim(),
@@ -717,24 +687,64 @@ def process_campaign(ws, campaign):
     
     return True
 
-def normalize_title(t):
-    import re
-    # Remove special characters, handle non-breaking spaces, lowercase everything
-    t = t.replace('\u00a0', ' ').lower()
-    t = re.sub(r'[^a-z0-9 ]', '', t)
-    return " ".join(t.split())
-
-def check_for_double(title, existing_campaigns):
-    target = normalize_title(title)
-    for existing in existing_campaigns:
-        ext = normalize_title(existing.get('title', ''))
-        # Check for high similarity or containment
-        if target == ext or target in ext or ext in target:
-            return True
-    return False
-
-def main():
-    BATCH_JSON = os.path.join(os.getcwd(), 'data', 'raneen_batch.json')
+def check_for_double(title, existing_index):
+    """Best known duplicate of `title` (exact, truncated, contained or near, see TitleIndex), or None"""
+    match = existing_index.find(title)
+    if match:
+        print(f"Double ({match.kind}, {match.score:.2f}): '{title}' ~ '{match.title}'")
+    return match
+
+def campaign_key(c):
+    return str(c.get('chuffed_id') or c.get('id') or c['title'])
+
+def apply_journal(campaigns, journal):
+    """
+    Folds checkpointed statuses from an interrupted run back into the batch.
+    A campaign caught mid-creation may already exist on Whydonate, so it is
+    parked as 'needs_verification' instead of being created a second time.
+    """
+    state = journal.replay()
+    interrupted = 0
+    for c in campaigns:
+        entry = state.get(campaign_key(c))
+        if not entry:
+            continue
+        c.update(entry)
+        if c['status'] == 'in_progress':
+            c['status'] = 'needs_verification'
+            interrupted += 1
+    if interrupted:
+        print(f"{interrupted} campaigns were interrupted mid-creation; marked needs_verification.")
+    return bool(state)
+
+def create_with_retries(page, c):
+    """True on success, "ERROR_LOGIN" / "DEAD" when the session is unusable, else False"""
+    res = False
+    for attempt in range(3):
+        if attempt > 0:
+            print(f"RETRY {attempt} for '{c['title']}' - Refreshing page...", flush=True)
+            try:
+                page.reload(timeout=30)
+            except Exception as e:
+                print(f"Reload failed: {e}", flush=True)
+        
+        # PRE-FLIGHT CHECK
+        conn_status = check_connection(page)
+        if conn_status == "DEAD":
+            print("!!! CONNECTION DEAD !!!", flush=True)
+            return "DEAD"
+        elif conn_status == "LOGIN_REQUIRED":
+            print("!!! LOGIN REQUIRED !!!", flush=True)
+            return "ERROR_LOGIN"
+        
+        res = process_campaign(page, c)
+        if res is True or res == "ERROR_LOGIN":
+            return res
+        
+        print(f"Attempt {attempt+1} failed.", flush=True)
+    return res
+
+def main(tabs=DEFAULT_TABS, min_interval=MIN_START_INTERVAL):
     MAX_BATCH = 9999
     existing_file = "data/whydonate_all_campaigns.json"
     
@@ -747,77 +757,106 @@ def main():
     if os.path.exists(existing_file):
         with open(existing_file, 'r', encoding='utf-8') as f:
             existing_campaigns = json.load(f)
+    existing_index = TitleIndex(existing_campaigns)
     print(f"Loaded {len(existing_campaigns)} existing campaigns to check for doubles.")
 
     with open(BATCH_JSON, 'r', encoding='utf-8') as f:
         campaigns = json.load(f)
 
-    ws = get_socket()
-    if not ws:
+    # Resume: statuses checkpointed by a previous (possibly crashed) run win
+    journal = BatchJournal(JOURNAL_PATH)
+    if apply_journal(campaigns, journal):
+        write_json_atomic(BATCH_JSON, campaigns)
+        journal.clear()
+
+    queued = []
+    for c in campaigns:
+        if c.get('status') != 'pending_migration':
+            continue
+        match = None if c.get('double_checked') else check_for_double(c['title'], existing_index)
+        if match and match.kind in STRICT_KINDS:
+            print(f"Found double for: {c['title']}. Marking as already_exists.")
+            c['status'] = 'already_exists'
+            journal.record(campaign_key(c), 'already_exists')
+            continue
+        if match:
+            # Similar wording only: a person decides, not the script
+            print(f"Possible double for: {c['title']}. Marking as needs_review "
+                  f"(set 'double_checked': true and status pending_migration to create it).")
+            c['status'] = 'needs_review'
+            c['possible_double'] = match.title
+            journal.record(campaign_key(c), 'needs_review', possible_double=match.title)
+            continue
+        queued.append(c)
+    queued = queued[:MAX_BATCH]
+    if queued:
+        # Synced here, not by the first tab that needs a picture while the others wait on the lock
+        media_catalog()
+    print(f"Starting creation for {len(queued)} campaigns on {tabs} tabs "
+          f"(one start every {min_interval}s at most)...", flush=True)
+
+    try:
+        browser = CDPBrowser(CDP_URL)
+    except Exception as e:
+        print(f"Socket error: {e}")
         print("Please open Chrome with remote debugging on port 9222 and navigate to whydonate.com")
         return
 
-    count = 0
-    # Process all remaining pending campaigns
-    total_pending = len([c for c in campaigns if c.get('status') == 'pending_migration'])
-    print(f"Starting full creation for {total_pending} remaining campaigns...", flush=True)
-    
-    for c in campaigns: # Changed 'campaign' to 'c' to match the instruction's retry block
-        if c.get('status') == 'pending_migration':
-            # Check for doubles
-            if check_for_double(c['title'], existing_campaigns):
-                print(f"Found double for: {c['title']}. Marking as already_exists.")
-                c['status'] = 'already_exists'
-                with open(BATCH_JSON, 'w', encoding='utf-8') as f:
-                    json.dump(campaigns, f, indent=2)
-                continue
-            if count >= MAX_BATCH: break
-        
-            # Attempt with retry and refresh
-            success = False
-            for attempt in range(3):
-                res = False # Initialize
-                if attempt > 0:
-                    print(f"RETRY {attempt} for '{c['title']}' - Refreshing page...", flush=True)
-                    ws.send(json.dumps({"id": 8888, "method": "Page.reload"}))
-                    time.sleep(10)
-                
-                # PRE-FLIGHT CHECK
-                conn_status = check_connection(ws)
-                if conn_status == "DEAD":
-                    print("!!! CONNECTION DEAD !!!", flush=True)
-                    break 
-                elif conn_status == "LOGIN_REQUIRED":
-                    print("!!! LOGIN REQUIRED !!!", flush=True)
-                    break
-                
-                res = process_campaign(ws, c)
-                if res is True:
-                    success = True
-                    break
-                elif res == "ERROR_LOGIN":
-                    break
-                
-                print(f"Attempt {attempt+1} failed.", flush=True)
-            
-            if success:
-                c['status'] = 'created_initial'
-                c['processed_at'] = datetime.now().isoformat()
-                count += 1
-                with open(BATCH_JSON, 'w', encoding='utf-8') as f:
-                    json.dump(campaigns, f, indent=2)
-                print(f"SUCCESS: Campaign created. Finished {count}/{total_pending}. Waiting 15s...")
-                time.sleep(15)
-            elif res == "ERROR_LOGIN": # This condition is already handled inside the loop, but keeping it for consistency with the instruction's provided block.
-                print("FAILURE: Login required. Stopping.")
-                break
-                with open(batch_file, 'w', encoding='utf-8') as f:
-                    json.dump(campaigns, f, indent=2)
-                # Continue to next to see if it's a general issue or specific to this record
-                time.sleep(5)
-                continue 
-
-    ws.close()
+    stop = threading.Event()
+    done = []
+
+    def open_tab(index):
+        try:
+            page = browser.new_page(START_URL)
+            page.enable("Page", "Runtime")
+            return page
+        except Exception as e:
+            print(f"Could not open tab {index}: {e}", flush=True)
+            return None
+
+    def close_tab(page):
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def process(page, c):
+        # Checkpoint before touching the site: a crash from here on is "interrupted"
+        journal.record(campaign_key(c), 'in_progress')
+        return create_with_retries(page, c)
+
+    def on_result(c, res):
+        key = campaign_key(c)
+        if res is True:
+            c['status'] = 'created_initial'
+            c['processed_at'] = datetime.now().isoformat()
+            journal.record(key, 'created_initial', processed_at=c['processed_at'],
+                           step_timings=c.get('step_timings'))
+            done.append(c)
+            print(f"SUCCESS: Campaign created. Finished {len(done)}/{len(queued)}. "
+                  f"Timings: {c.get('step_timings')}", flush=True)
+            return
+        # Not created: back to pending so the next run picks it up again
+        journal.record(key, 'pending_migration', last_error=str(res))
+        if isinstance(res, Exception):
+            print(f"ERROR on '{c['title']}': {res}", flush=True)
+        if res in ("ERROR_LOGIN", "DEAD"):
+            print("FAILURE: Session unusable. Stopping all tabs.", flush=True)
+            stop.set()
+
+    try:
+        run_pool(queued, open_tab, process, workers=tabs, min_interval=min_interval,
+                 on_result=on_result, close_worker=close_tab, stop=stop)
+    finally:
+        # The journal holds every status (in_progress and last_error included);
+        # fold it into the batch before writing, and only drop it once written
+        apply_journal(campaigns, journal)
+        write_json_atomic(BATCH_JSON, campaigns)
+        journal.clear()
+        browser.close()
+    print(f"Created {len(done)}/{len(queued)} campaigns.")
 
 if __name__ == "__main__":
-    main()
+    # python batch_create_campaigns.py [tabs] [min_interval_seconds]
+    main(tabs=int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TABS,
+         min_interval=float(sys.argv[2]) if len(sys.argv) > 2 else MIN_START_INTERVAL)
@@ -1,28 +1,40 @@
-
+import os
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import numpy as np
 
+SAMPLE_SIZE = (200, 200)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif')
+
+def _load_sample(image_path):
+    """Decodes the image straight to ~SAMPLE_SIZE: JPEGs via DCT draft scaling, others via reduce()."""
+    with Image.open(image_path) as img:
+        # For JPEG this picks the largest 1/2, 1/4 or 1/8 scale still >= SAMPLE_SIZE,
+        # so a 12MP photo is never fully decoded
+        img.draft('RGB', SAMPLE_SIZE)
+        img = img.convert('RGB')
+        return np.asarray(img.resize(SAMPLE_SIZE, reducing_gap=2.0)) # Downsample for speed
+
 def check_for_blood(image_path, threshold=0.05):
     """
     Scans an image for 'blood-red' pixel density.
     Returns (is_flagged, percentage_detected)
     """
     try:
-        img = Image.open(image_path).convert('RGB')
-        img = img.resize((200, 200)) # Downsample for speed
-        data = np.array(img)
+        data = _load_sample(image_path)
         
         reds = data[:, :, 0]
         greens = data[:, :, 1]
         blues = data[:, :, 2]
         
-        # Heuristic: High Red (>100), Low Green/Blue (<60), and Red significantly dominant
-        # This covers wet blood (bright red) and dried blood (dark red)
-        blood_mask = (reds > 80) & (greens < 60) & (blues < 60) & (reds > (greens.astype(np.int16) + blues.astype(np.int16)))
+        # Heuristic: High Red (>80), Low Green/Blue (<60), and Red significantly dominant
+        # This covers wet blood (bright red) and dried blood (dark red).
+        # greens + blues stays in uint8: it can only wrap when one of them is >= 60,
+        # and those pixels are already excluded by the low-channel test.
+        low_channels = (greens < 60) & (blues < 60)
+        blood_mask = low_channels & (reds > 80) & (reds > greens + blues)
         
-        blood_pixel_count = np.sum(blood_mask)
-        total_pixels = data.shape[0] * data.shape[1]
-        ratio = blood_pixel_count / total_pixels
+        ratio = np.count_nonzero(blood_mask) / blood_mask.size
         
         return ratio > threshold, ratio
         
@@ -30,8 +42,42 @@ def check_for_blood(image_path, threshold=0.05):
         print(f"Error scanning {image_path}: {e}")
         return False, 0.0
 
+def _check_one(args):
+    path, threshold = args
+    is_flagged, ratio = check_for_blood(path, threshold)
+    return path, bool(is_flagged), float(ratio)
+
+def check_many(paths, workers=None, threshold=0.05):
+    """
+    Screens many images on a process pool.
+    Returns [(path, is_flagged, ratio), ...] in the order of `paths`.
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) < 2:
+        return [_check_one((p, threshold)) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_check_one, [(p, threshold) for p in paths], chunksize=16))
+
+def iter_images(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "thumbs"]
+        for name in filenames:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) > 1:
+    import time
+    if len(sys.argv) > 1 and os.path.isdir(sys.argv[1]):
+        # Batch re-screen: python blood_detect.py data/onboarding_submissions/media [workers]
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        start = time.time()
+        results = check_many(iter_images(sys.argv[1]), workers=workers)
+        for path, flagged, pct in results:
+            if flagged:
+                print(f"FLAGGED {path} ({pct:.2%})")
+        print(f"Scanned {len(results)} images in {time.time() - start:.1f}s, "
+              f"{sum(1 for r in results if r[1])} flagged.")
+    elif len(sys.argv) > 1:
         flagged, pct = check_for_blood(sys.argv[1])
         print(f"Flagged: {flagged} ({pct:.2%})")
@@ -1,6 +1,10 @@
 import os
+import sys
 from pathlib import Path
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.media_catalog import MediaCatalog
+
 missing = [
     '972567243079', '+0797172654', '+970567419045', 
     '+972599197456', '0592115058', '0595843932', 
@@ -10,6 +14,8 @@ missing = [
 media_dir = Path('data/onboarding_submissions/media')
 
 print(f"Searching for images in {media_dir}...")
+catalog = MediaCatalog()
+catalog.sync(media_dir)
 
 found_map = {}
 
@@ -17,31 +23,12 @@ for m in missing:
     clean = m.replace('+', '').replace('viral_', '')
     print(f"Target: {m} (Clean: {clean})")
     
-    found = False
-    for root, dirs, files in os.walk(media_dir):
-        # Check folder name
-        if clean in Path(root).name:
-            for f in files:
-                if any(f.lower().endswith(ext) for ext in ['.jpg', '.png', '.jpeg']):
-                    path = os.path.join(root, f)
-                    print(f"  ✓ Found in folder: {path}")
-                    found_map[m] = str(Path(path).absolute())
-                    found = True
-                    break
-        if found: break
-        
-        # Check filename
-        for f in files:
-            if clean in f:
-                if any(f.lower().endswith(ext) for ext in ['.jpg', '.png', '.jpeg']):
-                    path = os.path.join(root, f)
-                    print(f"  ✓ Found in filename: {path}")
-                    found_map[m] = str(Path(path).absolute())
-                    found = True
-                    break
-        if found: break
-
-    if not found:
+    # Folder and file names are indexed: phone numbers match on their last 9 digits
+    matches = catalog.find(clean, root=media_dir, max_qr=None)
+    if matches:
+        print(f"  ✓ Found: {matches[0].path}")
+        found_map[m] = matches[0].path
+    else:
         print("  ✗ No match found")
 
 print("\nFinal Discovery Map:")
@@ -1,9 +1,13 @@
 
 import os
+import sys
 import json
 import csv
 import re
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.media_catalog import QR_THRESHOLD, MediaCatalog
+
 # Paths
 gaza_pics_path = r"C:\Users\gaelf\Pictures\GAZA"
 unified_path = "data/campaigns_unified.json"
@@ -21,9 +25,14 @@ if os.path.exists(media_map_path):
         for row in reader:
             existing_mapped_folders.add(row['Folder'])
 
-# 2. Get all folders from the actual directory
+# 2. Get all folders from the actual directory (empty and image-less folders included)
 actual_folders = [d for d in os.listdir(gaza_pics_path) if os.path.isdir(os.path.join(gaza_pics_path, d))]
 
+# Image details from the media catalog (re-reads only files changed since the last run)
+catalog = MediaCatalog()
+catalog.sync(gaza_pics_path)
+folder_media = catalog.folders(gaza_pics_path)
+
 # 3. Correlation Logic
 discovery = []
 
@@ -35,9 +44,10 @@ for folder_name in actual_folders:
     full_path = os.path.join(gaza_pics_path, folder_name)
     files = os.listdir(full_path)
     file_count = len(files)
+    media = folder_media.get(folder_name, [])
     
-    # Clue 1: QR Codes often have indices or dates
-    qr_codes = [f for f in files if "qr-code" in f.lower()]
+    # Clue 1: QR codes (images by look or name, other files such as PDFs by name)
+    qr_codes = [m.path for m in media if m.qr_score >= QR_THRESHOLD] or [f for f in files if "qr-code" in f.lower()]
     
     # Clue 2: Name components
     # Extract names like "Abdallah (Ismael)" -> ["abdallah", "ismael"]
@@ -7,19 +7,13 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 import scripts.final_dump_fixed as d
-import re
+from src.utils.ods_reader import find_sheet
 
 if __name__ == "__main__":
-    with open('temp_total2/content.xml', 'r', encoding='utf-8', errors='ignore') as f:
-        xml_data = f.read()
+    xml_data = d.CONTENT_PATH
 
     # Find sheet name matching "Noor"
-    sheet_names = re.findall(r'table:name="([^"]*)"', xml_data)
-    noor_sheet = None
-    for name in sheet_names:
-        if 'noor' in name.lower():
-            noor_sheet = name
-            break
+    noor_sheet = find_sheet(d.workbook_index(xml_data).sheet_names(), 'noor')
             
     if not noor_sheet: exit()
 
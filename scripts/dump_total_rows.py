@@ -7,16 +7,14 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 import final_dump_fixed as d
-import re
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 if __name__ == "__main__":
-    with open('temp_total2/content.xml', 'r', encoding='utf-8', errors='ignore') as f:
-        xml_data = f.read()
+    xml_data = d.CONTENT_PATH
 
     # Find first sheet name
-    sheet_names = re.findall(r'table:name="([^"]*)"', xml_data)
+    sheet_names = d.workbook_index(xml_data).sheet_names()
     if not sheet_names:
         print("No sheets found")
         exit()
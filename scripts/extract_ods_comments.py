@@ -1,8 +1,8 @@
-from odf.opendocument import load
-from odf.table import Table, TableRow, TableCell
-from odf.text import P
-from odf.office import Annotation
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.workbook_cache import WorkbookCache
 
 ODS_FILE = "total2_copy.ods"
 
@@ -12,39 +12,21 @@ def extract_comments():
         return
 
     try:
-        doc = load(ODS_FILE)
+        workbooks = WorkbookCache()
+        annotations = workbooks.annotations(ODS_FILE)
         print(f"Loaded {ODS_FILE}")
-        
+
         found_any = False
-        for sheet in doc.spreadsheet.getElementsByType(Table):
-            sheet_name = sheet.getAttribute("name")
+        for sheet_name in workbooks.sheets(ODS_FILE):
             print(f"\nChecking Sheet: {sheet_name}")
-            
-            rows = sheet.getElementsByType(TableRow)
-            for r_idx, row in enumerate(rows):
-                cells = row.getElementsByType(TableCell)
-                for c_idx, cell in enumerate(cells):
-                    # Annotations/Comments are usually in office:annotation
-                    annotations = cell.getElementsByType(Annotation)
-                    if annotations:
-                        # Get cell value for context
-                        cell_val = ""
-                        ps = cell.getElementsByType(P)
-                        if ps:
-                            cell_val = "".join([node.firstChild.data for node in ps if node.firstChild and hasattr(node.firstChild, 'data')])
-                        
-                        for ann in annotations:
-                            # Get the text inside the annotation
-                            ann_ps = ann.getElementsByType(P)
-                            comment_text = " ".join(["".join([n.firstChild.data for n in p.childNodes if n.firstChild and hasattr(n.firstChild, 'data')]) for p in ann_ps])
-                            
-                            if comment_text.strip():
-                                print(f"  [Cell {r_idx+1},{c_idx+1}] Value: '{cell_val}' | Comment: {comment_text}")
-                                found_any = True
-                                
+            for ann in annotations:
+                if ann.sheet == sheet_name and ann.text.strip():
+                    print(f"  [Cell {ann.cell}] Value: '{ann.value}' | Comment: {ann.text.replace(chr(10), ' ')}")
+                    found_any = True
+
         if not found_any:
             print("No comments/annotations found in any sheet.")
-            
+
     except Exception as e:
         print(f"Error reading ODS comments: {e}")
 
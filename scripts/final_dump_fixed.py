@@ -1,147 +1,69 @@
-import re
 import os
+import sys
 
-def idx_to_col(idx):
-    col = ""
-    while idx >= 0:
-        idx, rem = divmod(idx, 26)
-        col = chr(65 + rem) + col
-        idx -= 1
-    return col
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.ods_reader import idx_to_col
+from src.utils.workbook_cache import WorkbookCache
+from src.utils.workbook_index import WorkbookIndex
 
-def dump_headers(data, sheet_name):
-    # Try different name variations
-    names_to_try = [
-        sheet_name,
-        sheet_name.replace("'", "&apos;"),
-    ]
-    
-    sheet_match = None
-    for name in names_to_try:
-        pattern = f'table:name="{name}"'
-        sheet_match = re.search(pattern, data)
-        if sheet_match: break
-    
-    if not sheet_match: return None
+CONTENT_PATH = 'temp_total2/content.xml'
+
+# Whole-sheet reads: parsed once per workbook version, then served from data/cache/workbooks.sqlite
+WORKBOOKS = WorkbookCache()
+# Single-row / A1 reads: byte offsets of every sheet and row, built on first use per source
+_INDEXES = {}
 
-    start = sheet_match.start()
-    end = data.find('</table:table>', start)
-    table_xml = data[start:end]
-    rows = list(re.finditer(r'<table:table-row.*?>(.*?)</table:table-row>', table_xml, re.DOTALL))
-    if len(rows) > 0:
-        row_content = rows[0].group(1)
-        cell_pattern = re.compile(r'<(table:table-cell|table:covered-table-cell).*?(/|>(.*?)</\1)>', re.DOTALL)
-        cell_matches = cell_pattern.finditer(row_content)
-        row_data = {}
-        curr_col = 0
-        for cm in cell_matches:
-            cell_xml = cm.group(0)
-            rep_match = re.search(r'table:number-columns-repeated="(\d+)"', cell_xml)
-            rep_count = int(rep_match.group(1)) if rep_match else 1
-            p_match = re.search(r'<text:p>(.*?)</text:p>', cell_xml)
-            val = p_match.group(1) if p_match else ""
-            for i in range(rep_count):
-                if val: row_data[idx_to_col(curr_col + i)] = val
-            curr_col += rep_count
-        return row_data
+def workbook_index(source):
+    if source not in _INDEXES:
+        _INDEXES[source] = WorkbookIndex(source)
+    return _INDEXES[source]
+
+def resolve_sheet(source, sheet_name):
+    """Exact sheet name, falling back to a case-insensitive match ('Main' -> 'MAIN')"""
+    names = workbook_index(source).sheet_names()
+    if sheet_name in names:
+        return sheet_name
+    for name in names:
+        if name.lower() == sheet_name.lower():
+            return name
     return None
 
-def get_row_values(data, sheet_name, row_idx):
-    names_to_try = [
-        sheet_name,
-        sheet_name.replace("'", "&apos;"),
-    ]
-    sheet_match = None
-    for name in names_to_try:
-        pattern = f'table:name="{name}"'
-        sheet_match = re.search(pattern, data)
-        if sheet_match: break
-    if not sheet_match: return None
+def sheet_rows(source, sheet_name):
+    name = resolve_sheet(source, sheet_name)
+    if not name: return None
+    return WORKBOOKS.read_sheet(source, name)
 
-    start = sheet_match.start()
-    end = data.find('</table:table>', start)
-    table_xml = data[start:end]
-    rows = list(re.finditer(r'<table:table-row.*?>(.*?)</table:table-row>', table_xml, re.DOTALL))
-    
-    if len(rows) < row_idx: return None
+def _row(source, sheet_name, row_idx):
+    name = resolve_sheet(source, sheet_name)
+    if not name: return None, None
+    return name, workbook_index(source).row(name, row_idx)
 
-    row_content = rows[row_idx-1].group(1)
-    cell_pattern = re.compile(r'<(table:table-cell|table:covered-table-cell).*?(/|>(.*?)</\1)>', re.DOTALL)
-    cell_matches = cell_pattern.finditer(row_content)
-    
-    curr_col = 0
-    results = {}
-    for cm in cell_matches:
-        cell_xml = cm.group(0)
-        rep_match = re.search(r'table:number-columns-repeated="(\d+)"', cell_xml)
-        rep_count = int(rep_match.group(1)) if rep_match else 1
-        val = ""
-        v_match = re.search(r'office:value="([^"]*)"', cell_xml)
-        if v_match: val = v_match.group(1)
-        else:
-            p_match = re.search(r'<text:p>(.*?)</text:p>', cell_xml)
-            if p_match: val = p_match.group(1)
-        
-        for i in range(rep_count):
-            col_id = idx_to_col(curr_col + i)
-            if val.strip():
-                results[col_id] = val
-            curr_col += rep_count
-    return results
+def dump_headers(source, sheet_name):
+    _, row = _row(source, sheet_name, 1)
+    if not row: return None
+    return {cell.col: cell.text for cell in row.cells if cell.text}
 
-def dump_row(data, sheet_name, row_idx, headers):
-    names_to_try = [
-        sheet_name,
-        sheet_name.replace("'", "&apos;"),
-    ]
-    sheet_match = None
-    for name in names_to_try:
-        pattern = f'table:name="{name}"'
-        sheet_match = re.search(pattern, data)
-        if sheet_match: break
-    if not sheet_match: return
+def get_row_values(source, sheet_name, row_idx):
+    name, row = _row(source, sheet_name, row_idx)
+    if name is None: return None
+    return row.values() if row else {}
 
-    start = sheet_match.start()
-    end = data.find('</table:table>', start)
-    table_xml = data[start:end]
-    rows = list(re.finditer(r'<table:table-row.*?>(.*?)</table:table-row>', table_xml, re.DOTALL))
-    
-    if len(rows) < row_idx:
+def dump_row(source, sheet_name, row_idx, headers):
+    name, row = _row(source, sheet_name, row_idx)
+    if name is None: return
+    if row is None:
         print(f"Sheet {sheet_name} row {row_idx} not found")
         return
 
-    row_content = rows[row_idx-1].group(1)
-    cell_pattern = re.compile(r'<(table:table-cell|table:covered-table-cell).*?(/|>(.*?)</\1)>', re.DOTALL)
-    cell_matches = cell_pattern.finditer(row_content)
-    
-    curr_col = 0
     results = []
-    for cm in cell_matches:
-        cell_xml = cm.group(0)
-        rep_match = re.search(r'table:number-columns-repeated="(\d+)"', cell_xml)
-        rep_count = int(rep_match.group(1)) if rep_match else 1
-        val = ""
-        v_match = re.search(r'office:value="([^"]*)"', cell_xml)
-        if v_match: val = v_match.group(1)
-        else:
-            p_match = re.search(r'<text:p>(.*?)</text:p>', cell_xml)
-            if p_match: val = p_match.group(1)
-        
-        for i in range(rep_count):
-            col_id = idx_to_col(curr_col + i)
-            if val.strip():
-                label = headers.get(col_id, col_id)
-                results.append(f"{col_id}({label}): {val}")
-            curr_col += rep_count
+    for col_id, val in row.values().items():
+        label = headers.get(col_id, col_id)
+        results.append(f"{col_id}({label}): {val}")
     print(f"\n--- {sheet_name} ROW {row_idx} ---")
     for r in results:
         print(f"  {r}")
 
 if __name__ == "__main__":
-    content_path = 'temp_total2/content.xml'
-    with open(content_path, 'r', encoding='utf-8', errors='ignore') as f:
-        xml_data = f.read()
-    
     targets = [
         ("Let's draw a smile (Ahmed's daughter)", 21),
         ("Rania", 164),
@@ -151,10 +73,10 @@ if __name__ == "__main__":
         ("Mahmoud Basem", 492),
         ("Samirah", 350)
     ]
-    
-    main_headers = dump_headers(xml_data, "Main")
-    
+
+    main_headers = dump_headers(CONTENT_PATH, "Main")
+
     for s, r in targets:
-        h = dump_headers(xml_data, s)
+        h = dump_headers(CONTENT_PATH, s)
         if not h: h = main_headers # Fallback to Main headers if sheet headers not found
-        dump_row(xml_data, s, r, h)
+        dump_row(CONTENT_PATH, s, r, h)
@@ -1,7 +1,6 @@
 import sys
 import os
 import io
-import re
 
 # Add current directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,6 +8,7 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 import scripts.final_dump_fixed as d
+from src.utils.ods_reader import find_sheet
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
@@ -33,21 +33,14 @@ def get_all_debts():
     
     # 2. Process Noor Sheet (Rows 2-70)
     try:
-        with open('temp_total2/content.xml', 'r', encoding='utf-8', errors='ignore') as f:
-            xml_data = f.read()
+        source = d.CONTENT_PATH
+        index = d.workbook_index(source)
+        noor_sheet = find_sheet(index.sheet_names(), 'noor')
 
-        # Find sheet name matching "Noor"
-        sheet_names = re.findall(r'table:name="([^"]*)"', xml_data)
-        noor_sheet = None
-        for name in sheet_names:
-            if 'noor' in name.lower():
-                noor_sheet = name
-                break
-                
         if noor_sheet:
-            for i in range(2, 71): # Rows 2 to 70 (User specified)
-                row_vals = d.get_row_values(xml_data, noor_sheet, i)
-                if not row_vals: continue
+            # Rows 2 to 70 (User specified), read straight from their indexed offsets
+            for row in index.row_range(noor_sheet, 2, 70):
+                row_vals = row.values()
                 
                 try:
                     amt = float(row_vals.get('E', '0').replace(',', ''))
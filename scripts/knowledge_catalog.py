@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+import threading
+import time
+
+class KnowledgeCatalog:
+    """
+    In-memory view of the Knowledge Items under ki_root.
+    A polling watcher stats the tree every poll_interval seconds and reloads
+    only when an mtime changes, so requests never touch the disk.
+    """
+
+    def __init__(self, ki_root, poll_interval=5, on_change=None):
+        self.ki_root = ki_root
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.signature = None
+        self.listing = []
+        self.items = {}           # ki_id -> {"content": [...], "etag": str, "last_modified": float}
+        self.etag = None
+        self.last_modified = None
+        self.root_exists = False
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    @property
+    def exists(self):
+        return self.root_exists
+
+    def _artifacts_dir(self, ki_id):
+        ki_base = os.path.join(self.ki_root, ki_id)
+        artifacts_path = os.path.join(ki_base, 'artifacts')
+        return artifacts_path if os.path.exists(artifacts_path) else ki_base
+
+    def _scan_signature(self):
+        """(path, mtime) pairs of every metadata and artifact file -- stat only, no reads"""
+        entries = []
+        if not os.path.isdir(self.ki_root):
+            return tuple(entries)
+        for ki_dir in sorted(os.listdir(self.ki_root)):
+            ki_full_path = os.path.join(self.ki_root, ki_dir)
+            if not os.path.isdir(ki_full_path): continue
+            for folder in {ki_full_path, self._artifacts_dir(ki_dir)}:
+                for entry in os.scandir(folder):
+                    if entry.is_file() and entry.name.endswith(('.json', '.md', '.txt')):
+                        entries.append((entry.path, entry.stat().st_mtime))
+        return tuple(sorted(entries))
+
+    def _load_listing(self):
+        ki_list = []
+        for ki_dir in sorted(os.listdir(self.ki_root)):
+            metadata_path = os.path.join(self.ki_root, ki_dir, 'metadata.json')
+            if not os.path.exists(metadata_path): continue
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                try:
+                    meta = json.load(f)
+                except Exception:
+                    continue
+            ki_list.append({
+                "id": ki_dir,
+                "title": meta.get("title", ki_dir),
+                "summary": meta.get("summary", ""),
+                "created": meta.get("created_at")
+            })
+        return ki_list
+
+    @staticmethod
+    def _etag(payload):
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def reload(self):
+        """Rebuilds the listing if the tree changed. Returns True when it did."""
+        signature = self._scan_signature()
+        root_exists = os.path.isdir(self.ki_root)
+        if signature == self.signature and root_exists == self.root_exists:
+            return False
+        listing = self._load_listing() if root_exists else []
+        with self.lock:
+            self.root_exists = root_exists
+            self.signature = signature
+            self.listing = listing
+            self.items = {}   # Item contents are re-read lazily on next request
+            self.etag = self._etag(listing)
+            self.last_modified = max((m for _, m in signature), default=time.time())
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"Knowledge Catalog on_change Error: {e}")
+        return True
+
+    def get_item(self, ki_id):
+        """Artifacts of one Knowledge Item, or None if it does not exist."""
+        with self.lock:
+            cached = self.items.get(ki_id)
+            signature = self.signature
+        if cached is not None:
+            return cached
+
+        artifacts_path = self._artifacts_dir(ki_id)
+        if not ki_id or not os.path.exists(artifacts_path):
+            return None
+        content = []
+        last_modified = 0.0
+        # Only markdown and text files are shared with the collective
+        for file in sorted(os.listdir(artifacts_path)):
+            file_path = os.path.join(artifacts_path, file)
+            if not file.endswith(('.md', '.txt')) or os.path.isdir(file_path): continue
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content.append({"name": file, "content": f.read()})
+            last_modified = max(last_modified, os.path.getmtime(file_path))
+
+        item = {"content": content, "etag": self._etag(content), "last_modified": last_modified or time.time()}
+        with self.lock:
+            # Don't cache a read that raced with a reload
+            if self.signature == signature:
+                self.items[ki_id] = item
+        return item
+
+    # --- watcher ---
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Knowledge Catalog Watch Error: {e}")
+
+    def start_watching(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="knowledge-watch", daemon=True)
+            self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import math
+import threading
+import time
+from collections import Counter
+
+TOKEN = re.compile(r"\w+")
+# Arabic diacritics / tatweel are dropped so vocalized and plain spellings match
+ARABIC_MARKS = re.compile("[\u0610-\u061A\u0640\u064B-\u065F\u0670\u06D6-\u06ED]")
+CHUNK_CHARS = 1200
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(ROOT_DIR, "data", "cache", "knowledge_index.json")
+
+def tokenize(text):
+    return TOKEN.findall(ARABIC_MARKS.sub("", text).casefold())
+
+def chunk_markdown(text, max_chars=CHUNK_CHARS):
+    """Splits a document on blank lines, packing paragraphs into ~max_chars chunks."""
+    chunks, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        if current and len(current) + len(para) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+def ki_artifact_files(ki_root):
+    """Yields every .md artifact of every Knowledge Item under ki_root."""
+    if not os.path.isdir(ki_root):
+        return
+    for ki_folder in os.listdir(ki_root):
+        ki_base = os.path.join(ki_root, ki_folder)
+        if not os.path.isdir(ki_base): continue
+        arts_path = os.path.join(ki_base, 'artifacts') if os.path.exists(os.path.join(ki_base, 'artifacts')) else ki_base
+        for file in os.listdir(arts_path):
+            if file.endswith('.md'):
+                yield os.path.join(arts_path, file)
+
+class KnowledgeIndex:
+    """
+    BM25 index over Knowledge Item artifacts, chunked by paragraph.
+    Persisted to disk; on refresh only files whose mtime changed are re-read.
+    """
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, ki_root, cache_path=DEFAULT_CACHE_PATH, refresh_interval=30):
+        self.ki_root = ki_root
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.files = {}       # path -> {"mtime": float, "chunks": [chunk_id, ...]}
+        self.chunks = {}      # chunk_id -> {"file": path, "text": str, "length": int}
+        self.postings = {}    # term -> {chunk_id: tf}
+        self.total_length = 0
+        self.next_id = 0
+        self.last_refresh = 0.0
+        self._load()
+        self.refresh(force=True)
+
+    # --- maintenance ---
+    def _add_file(self, path, mtime, chunk_texts):
+        ids = []
+        for text in chunk_texts:
+            cid = self.next_id
+            self.next_id += 1
+            tf = Counter(tokenize(f"{os.path.basename(path)}\n{text}"))
+            length = sum(tf.values())
+            self.chunks[cid] = {"file": path, "text": text, "length": length}
+            self.total_length += length
+            for term, count in tf.items():
+                self.postings.setdefault(term, {})[cid] = count
+            ids.append(cid)
+        self.files[path] = {"mtime": mtime, "chunks": ids}
+
+    def _remove_file(self, path):
+        for cid in self.files.pop(path, {}).get("chunks", []):
+            chunk = self.chunks.pop(cid)
+            self.total_length -= chunk["length"]
+            for term in set(tokenize(f"{os.path.basename(path)}\n{chunk['text']}")):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(cid, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def refresh(self, force=False):
+        """Re-indexes added/changed files and drops deleted ones. Returns True if anything changed."""
+        now = time.time()
+        if not force and now - self.last_refresh < self.refresh_interval:
+            return False
+        changed = False
+        with self.lock:
+            self.last_refresh = now
+            seen = set()
+            for path in ki_artifact_files(self.ki_root):
+                seen.add(path)
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                known = self.files.get(path)
+                if known and known["mtime"] == mtime:
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                except Exception as e:
+                    print(f"Knowledge Index Error ({path}): {e}")
+                    continue
+                self._remove_file(path)
+                self._add_file(path, mtime, chunk_markdown(text))
+                changed = True
+            for path in [p for p in self.files if p not in seen]:
+                self._remove_file(path)
+                changed = True
+            if changed:
+                self._save()
+        return changed
+
+    # --- persistence ---
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("ki_root") != self.ki_root:
+                return
+            for path, entry in data.get("files", {}).items():
+                self._add_file(path, entry["mtime"], entry["chunks"])
+        except Exception as e:
+            print(f"Knowledge Index cache ignored: {e}")
+            self.files, self.chunks, self.postings = {}, {}, {}
+            self.total_length = 0
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        data = {
+            "ki_root": self.ki_root,
+            "files": {path: {"mtime": entry["mtime"], "chunks": [self.chunks[c]["text"] for c in entry["chunks"]]}
+                      for path, entry in self.files.items()}
+        }
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    # --- query ---
+    def search(self, query, top_k=6):
+        """Returns the top_k chunks by BM25 score as dicts {file, text, score}."""
+        self.refresh()
+        with self.lock:
+            n = len(self.chunks)
+            if not n:
+                return []
+            avgdl = self.total_length / n
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings: continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for cid, tf in postings.items():
+                    length = self.chunks[cid]["length"]
+                    denom = tf + self.K1 * (1 - self.B + self.B * length / avgdl)
+                    scores[cid] = scores.get(cid, 0.0) + idf * tf * (self.K1 + 1) / denom
+            best = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+            return [{"file": os.path.basename(self.chunks[cid]["file"]), "text": self.chunks[cid]["text"], "score": score}
+                    for cid, score in best]
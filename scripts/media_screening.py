@@ -0,0 +1,106 @@
+import os
+import glob
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from blood_detect import check_for_blood, IMAGE_EXTENSIONS
+
+# Verdicts after which a file is no longer waiting on the pool
+FINAL_SCREENING = ("done", "skipped", "error")
+
+class ScreeningPool:
+    """
+    Bounded background pool that screens uploaded media after the request has
+    been acknowledged, then records the verdict in the submission JSON.
+    """
+
+    def __init__(self, max_workers=2, thumbnail_size=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screening")
+        self.thumbnail_size = thumbnail_size
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, json_path):
+        with self._locks_guard:
+            return self._locks.setdefault(json_path, threading.Lock())
+
+    def write_submission(self, json_path, submission_data):
+        with self._lock_for(json_path):
+            self._write(json_path, submission_data)
+
+    @staticmethod
+    def _write(json_path, data):
+        # Atomic replace: the status endpoint may be reading concurrently
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, json_path)
+
+    def submit(self, json_path, file_path):
+        return self.executor.submit(self._screen, json_path, file_path)
+
+    def resume_pending(self, submissions_dir):
+        """Re-queues files still 'pending' in saved submissions (e.g. the server stopped mid-screening)"""
+        queued = 0
+        for json_path in glob.glob(os.path.join(submissions_dir, "*_submission.json")):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Screening Resume Error ({json_path}): {e}")
+                continue
+            for entry in data.get("files", []):
+                if entry.get("screening") == "pending" and entry.get("path"):
+                    self.submit(json_path, entry["path"])
+                    queued += 1
+        if queued:
+            print(f"DEBUG: Re-queued {queued} files left pending screening")
+        return queued
+
+    def _make_thumbnail(self, file_path):
+        folder = os.path.join(os.path.dirname(file_path), "thumbs")
+        os.makedirs(folder, exist_ok=True)
+        thumb_path = os.path.join(folder, os.path.splitext(os.path.basename(file_path))[0] + ".jpg")
+        with Image.open(file_path) as img:
+            img.draft('RGB', (self.thumbnail_size, self.thumbnail_size))
+            img = img.convert('RGB')
+            img.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            img.save(thumb_path, "JPEG", quality=80)
+        return thumb_path
+
+    def _analyze(self, file_path):
+        result = {"screening": "done"}
+        if file_path.lower().endswith(IMAGE_EXTENSIONS):
+            is_flagged, blood_density = check_for_blood(file_path)
+            result.update({"is_flagged": bool(is_flagged), "blood_density": float(blood_density)})
+            if self.thumbnail_size:
+                try:
+                    result["thumbnail"] = self._make_thumbnail(file_path)
+                except Exception as e:
+                    print(f"Thumbnail Error ({file_path}): {e}")
+        else:
+            result.update({"is_flagged": False, "blood_density": 0.0, "screening": "skipped"})
+        return result
+
+    def _screen(self, json_path, file_path):
+        # Runs on the pool: nothing may escape, or the entry would stay 'pending' forever
+        try:
+            result = self._analyze(file_path)
+        except Exception as e:
+            print(f"Screening Error ({file_path}): {e}")
+            result = {"screening": "error", "error": str(e)}
+
+        try:
+            with self._lock_for(json_path):
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for entry in data.get("files", []):
+                    if entry.get("path") == file_path:
+                        entry.update(result)
+                if all(entry.get("screening") in FINAL_SCREENING for entry in data.get("files", [])):
+                    data["screening_status"] = "complete"
+                self._write(json_path, data)
+        except Exception as e:
+            print(f"Screening Record Error ({json_path}): {e}")
+        return result
@@ -1,40 +1,52 @@
-import re
 import os
+import re
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.workbook_cache import WorkbookCache
 
 def search_ods(xml_path):
     if not os.path.exists(xml_path):
         print(f"File not found: {xml_path}")
         return
 
-    with open(xml_path, 'r', encoding='utf-8', errors='ignore') as f:
-        # Read file in chunks to avoid memory issues if it was even larger, 
-        # but 37MB is fine to read at once.
-        content = f.read()
-
+    workbooks = WorkbookCache()
     print("--- SHEET NAMES ---")
-    sheet_names = re.findall(r'table:name="([^"]*)"', content)
-    for name in sheet_names:
+    for name in workbooks.sheets(xml_path):
         print(name)
 
-    print("\n--- SEARCH: '5536' ---")
-    for match in re.finditer(r'[^<]{0,50}5536[^>]{0,50}', content):
-        print(f"Context: ...{match.group(0)}...")
-
-    print("\n--- SEARCH: 'rebuild his life' ---")
-    for match in re.finditer(r'[^<]{0,100}rebuild his life[^>]{0,100}', content):
-        print(f"Context: ...{match.group(0)}...")
-
-    print("\n--- SEARCH: 'USDT' ---")
-    # Search for USDT specifically in annotations or text:p
-    for match in re.finditer(r'[^<]{0,50}USDT[^>]{0,50}', content, re.IGNORECASE):
-        print(f"Context: ...{match.group(0)}...")
+    searches = [
+        ("'5536'", re.compile(r'5536')),
+        ("'rebuild his life'", re.compile(r'rebuild his life')),
+        # Search for USDT specifically in cell text or annotations
+        ("'USDT'", re.compile(r'USDT', re.IGNORECASE)),
+    ]
+    targets = ["AB164", "AB410", "AB895", "AB21", "AB492", "AB111", "AG350"]
+    found = {label: [] for label, _ in searches}
+    target_hits = {t: [] for t in targets}
+
+    # Single pass over the materialized rows feeds every search
+    for row in workbooks.iter_rows(xml_path):
+        for cell in row.cells:
+            ref = f"{cell.col}{row.index}"
+            texts = [cell.text, cell.raw_value or ""]
+            if cell.annotation:
+                texts.append(cell.annotation.text)
+            for label, pattern in searches:
+                if any(pattern.search(t) for t in texts):
+                    found[label].append(f"{row.sheet}!{ref}: {cell.text[:100]}")
+            if ref in target_hits:
+                target_hits[ref].append(f"{row.sheet}: {cell.raw_value or cell.text}")
+
+    for label, _ in searches:
+        print(f"\n--- SEARCH: {label} ---")
+        for hit in found[label]:
+            print(f"Context: ...{hit}...")
 
     print("\n--- TARGET CELLS CHECK ---")
-    # Try to find specific row/cell markers if possible
-    # This is harder without a full parser but let's look for literals
-    for target in ["AB164", "AB410", "AB895", "AB21", "AB492", "AB111", "AG350"]:
-        if target in content:
-            print(f"Found literal '{target}' in XML")
+    for target in targets:
+        for hit in target_hits[target]:
+            print(f"{target} in {hit}")
 
 if __name__ == "__main__":
     search_ods('temp_total2/content.xml')
@@ -1,11 +1,16 @@
 import os
 import json
+import hmac
+import secrets
 import datetime
+from urllib.parse import quote
 import requests
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from blood_detect import check_for_blood
+from media_screening import ScreeningPool
+from knowledge_index import KnowledgeIndex
+from knowledge_catalog import KnowledgeCatalog
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -36,12 +41,43 @@ if not os.path.exists(KI_PATH):
     if os.path.exists(potential_brain):
         KI_PATH = potential_brain
 
+# Retrieval index for /api/chat, built once and refreshed incrementally on mtime change
+ACTIVE_KI_PATH = KI_PATH if os.path.exists(KI_PATH) else 'docs/ki_archive'
+KNOWLEDGE_INDEX = KnowledgeIndex(ACTIVE_KI_PATH)
+CHAT_TOP_K = int(os.getenv("CHAT_TOP_K", "6"))
+
+# Cached Knowledge listing for the public brain page, kept fresh by a polling watcher
+KNOWLEDGE_CATALOG = KnowledgeCatalog(KI_PATH, poll_interval=int(os.getenv("KI_POLL_SECONDS", "5")),
+                                     on_change=(lambda: KNOWLEDGE_INDEX.refresh(force=True)) if ACTIVE_KI_PATH == KI_PATH else None)
+KNOWLEDGE_CATALOG.start_watching()
+
+def conditional_json(payload, etag, last_modified):
+    """JSON response carrying ETag / Last-Modified; answers 304 when the client copy is current."""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.last_modified = datetime.datetime.fromtimestamp(last_modified, tz=datetime.timezone.utc)
+    response.cache_control.no_cache = True  # Always revalidate, but allow 304s
+    return response.make_conditional(request)
+
 DATA_DIR = "data/onboarding_submissions"
 UPLOAD_FOLDER = os.path.join(DATA_DIR, "media")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB limit
 
+def submission_key(beneficiary_id):
+    """The id as a single path component; names keep their spaces and non-ASCII letters."""
+    return beneficiary_id.replace("/", "_").replace("\\", "_").strip(". ") or "unknown"
+
+def submission_path(beneficiary_id):
+    return os.path.join(DATA_DIR, f"{submission_key(beneficiary_id)}_submission.json")
+
+# Uploads are acknowledged immediately; blood screening runs on a bounded pool
+SCREENING = ScreeningPool(max_workers=int(os.getenv("SCREENING_WORKERS", "2")),
+                          thumbnail_size=int(os.getenv("THUMBNAIL_SIZE", "320")) or None)
+# Files still 'pending' from before a restart would otherwise never get a verdict
+SCREENING.resume_pending(DATA_DIR)
+
 # --- IDENTITY & ROLES ---
 # Cloudflare Access transmits identity via 'Cf-Access-Authenticated-User-Email'
 def get_user_identity():
@@ -164,55 +200,21 @@ def whoami():
 # @login_required - Public Access Enabled for Transparency
 def list_knowledge():
     """Lists available Knowledge Items (Distilled Intelligence)."""
-    if not os.path.exists(KI_PATH):
+    if not KNOWLEDGE_CATALOG.exists:
         return jsonify({"error": "Knowledge path not found", "path": KI_PATH}), 404
     
-    ki_list = []
-    # Walk through folders in knowledge/brain
-    for ki_dir in os.listdir(KI_PATH):
-        ki_full_path = os.path.join(KI_PATH, ki_dir)
-        if not os.path.isdir(ki_full_path): continue
-        
-        metadata_path = os.path.join(ki_full_path, 'metadata.json')
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                try:
-                    meta = json.load(f)
-                    ki_list.append({
-                        "id": ki_dir,
-                        "title": meta.get("title", ki_dir),
-                        "summary": meta.get("summary", ""),
-                        "created": meta.get("created_at")
-                    })
-                except:
-                    continue
-    return jsonify(ki_list)
+    with KNOWLEDGE_CATALOG.lock:
+        listing, etag, last_modified = KNOWLEDGE_CATALOG.listing, KNOWLEDGE_CATALOG.etag, KNOWLEDGE_CATALOG.last_modified
+    return conditional_json(listing, etag, last_modified)
 
 @app.route('/api/knowledge/<ki_id>', methods=['GET'])
 # @login_required - Public Access Enabled
 def get_knowledge_item(ki_id):
     """Reads a specific Knowledge Item's distilled artifacts."""
-    ki_base = os.path.join(KI_PATH, secure_filename(ki_id))
-    artifacts_path = os.path.join(ki_base, 'artifacts')
-    
-    if not os.path.exists(artifacts_path):
-        # Check if requested ID is actually in the base folder
-        artifacts_path = ki_base 
-        if not os.path.exists(artifacts_path):
-            return jsonify({"error": "Knowledge Item not found"}), 404
-    
-    content = []
-    # Only allow reading markdown and text files for the collective
-    for file in os.listdir(artifacts_path):
-        if file.endswith('.md') or file.endswith('.txt'):
-            file_path = os.path.join(artifacts_path, file)
-            if os.path.isdir(file_path): continue
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content.append({
-                    "name": file,
-                    "content": f.read()
-                })
-    return jsonify(content)
+    item = KNOWLEDGE_CATALOG.get_item(secure_filename(ki_id))
+    if item is None:
+        return jsonify({"error": "Knowledge Item not found"}), 404
+    return conditional_json(item["content"], item["etag"], item["last_modified"])
 
 # --- THE VOICE: AI CHAT ---
 @app.route('/api/chat', methods=['POST'])
@@ -222,23 +224,16 @@ def chat_with_brain():
     data = request.json
     user_query = data.get("query", "")
     mode = data.get("mode", "local") # "local" or "relay"
+    stream = bool(data.get("stream", False)) # Local mode only: send tokens as they arrive
     
     if not user_query:
         return jsonify({"error": "Empty Query"}), 400
 
-    # 1. Build Context from Knowledge Items
+    # 1. Build Context from the most relevant Knowledge Item chunks
     context = ""
     try:
-        active_ki_path = KI_PATH if os.path.exists(KI_PATH) else 'docs/ki_archive'
-        for ki_folder in os.listdir(active_ki_path):
-            ki_base = os.path.join(active_ki_path, ki_folder)
-            if not os.path.isdir(ki_base): continue
-            
-            arts_path = os.path.join(ki_base, 'artifacts') if os.path.exists(os.path.join(ki_base, 'artifacts')) else ki_base
-            for file in os.listdir(arts_path):
-                if file.endswith('.md'):
-                    with open(os.path.join(arts_path, file), 'r', encoding='utf-8') as f:
-                        context += f"\n--- DOCUMENT: {file} ---\n{f.read()}\n"
+        for hit in KNOWLEDGE_INDEX.search(user_query, top_k=CHAT_TOP_K):
+            context += f"\n--- DOCUMENT: {hit['file']} ---\n{hit['text']}\n"
     except Exception as e:
         print(f"Chat Context Error: {e}")
 
@@ -258,6 +253,32 @@ def chat_with_brain():
     prompt = f"SYSTEM: You are 'Noor', the sovereign intelligence of the Gaza Resilience project. Answer based ONLY on context below.\n\nCONTEXT:\n{full_context[:12000]}\n\nUSER: {user_query}"
 
     # 3. Local Execution (Gemma 3)
+    if mode == "local" and stream:
+        try:
+            upstream = requests.post('http://127.0.0.1:11434/api/generate',
+                json={"model": "gemma3:latest", "prompt": prompt, "stream": True}, timeout=30, stream=True)
+            upstream.raise_for_status()
+        except Exception as e:
+            print(f"Local AI Failure: {e}")
+            return jsonify({"error": "Local Model heartbeat flatlined. Switch to Relay mode."}), 503
+
+        def relay_tokens():
+            # Ollama emits one JSON object per line; forward the text as plain chunks
+            try:
+                for line in upstream.iter_lines():
+                    if not line: continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"): break
+            except Exception as e:
+                print(f"Local AI Stream Failure: {e}")
+            finally:
+                upstream.close()
+
+        return Response(stream_with_context(relay_tokens()), mimetype='text/plain; charset=utf-8',
+                        headers={"X-Source": "local_gemma", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
     if mode == "local":
         try:
             res = requests.post('http://127.0.0.1:11434/api/generate', 
@@ -328,7 +349,7 @@ def check_scope(beneficiary_id):
 @app.route('/submission/<beneficiary_id>', methods=['GET'])
 @admin_required # Strict PII protection
 def get_submission(beneficiary_id):
-    json_path = os.path.join(DATA_DIR, f"{beneficiary_id}_submission.json")
+    json_path = submission_path(beneficiary_id)
     if os.path.exists(json_path):
         with open(json_path, 'r', encoding='utf-8') as f:
             return jsonify(json.load(f)), 200
@@ -362,32 +383,64 @@ def upload_file():
         "display_name": request.form.get('display_name', ''),
         "personal_wallet": request.form.get('personal_wallet', ''),
         "files": [],
-        "timestamp": datetime.datetime.now().isoformat()
+        "timestamp": datetime.datetime.now().isoformat(),
+        "status_key": secrets.token_urlsafe(16)  # Lets the uploader poll screening progress
     }
     
     files = request.files.getlist('files')
-    beneficiary_folder = os.path.join(app.config['UPLOAD_FOLDER'], beneficiary_id)
+    beneficiary_folder = os.path.join(app.config['UPLOAD_FOLDER'], submission_key(beneficiary_id))
     os.makedirs(beneficiary_folder, exist_ok=True)
     
+    saved_paths = []
     for file in files:
         if file.filename:
             filename = secure_filename(file.filename)
             file_path = os.path.join(beneficiary_folder, filename)
-            file.save(file_path)
-            
-            is_flagged, blood_density = check_for_blood(file_path)
+            file.save(file_path)  # Copied to disk in chunks, never decoded here
+            saved_paths.append(file_path)
             submission_data["files"].append({
                 "path": file_path,
-                "is_flagged": bool(is_flagged),
-                "blood_density": float(blood_density)
+                "screening": "pending",
+                "is_flagged": None,
+                "blood_density": None
             })
+    submission_data["screening_status"] = "pending" if saved_paths else "complete"
     
     os.makedirs(DATA_DIR, exist_ok=True)
-    json_path = os.path.join(DATA_DIR, f"{beneficiary_id}_submission.json")
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(submission_data, f, indent=2)
+    json_path = submission_path(beneficiary_id)
+    SCREENING.write_submission(json_path, submission_data)
     
-    return jsonify({"status": "success"}), 200
+    for file_path in saved_paths:
+        SCREENING.submit(json_path, file_path)
+    
+    return jsonify({
+        "status": "success",
+        "screening_status": submission_data["screening_status"],
+        "status_url": f"/upload/status/{quote(submission_key(beneficiary_id), safe='')}?key={submission_data['status_key']}"
+    }), 200
+
+@app.route('/upload/status/<beneficiary_id>', methods=['GET'])
+def upload_status(beneficiary_id):
+    """Screening progress of a submission, for admins or the uploader holding its status key."""
+    json_path = submission_path(beneficiary_id)
+    data = {}
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    expected = data.get("status_key", "")
+    key = request.args.get("key", "")
+    allowed = get_user_role() == "ADMIN" or bool(expected) and hmac.compare_digest(key.encode("utf-8"), expected.encode("utf-8"))
+    if not data or not allowed:
+        # Same answer for a wrong key and an unknown id, so ids cannot be probed
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({
+        "screening_status": data.get("screening_status", "complete"),
+        "files": [{
+            "name": os.path.basename(entry.get("path", "")),
+            "screening": entry.get("screening", "done"),
+            "is_flagged": entry.get("is_flagged")
+        } for entry in data.get("files", [])]
+    }), 200
 
 if __name__ == '__main__':
     print(f"DUNYA دنيا Sovereign Intelligence starting on http://0.0.0.0:5000")
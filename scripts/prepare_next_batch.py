@@ -1,18 +1,10 @@
 
 import json
 import os
+import sys
 
-def normalize(t):
-    import re
-    if not t: return ""
-    t = str(t).replace('\u00a0', ' ').lower()
-    t = re.sub(r'[^a-z0-9 ]', '', t)
-    return " ".join(t.split())
-
-def is_similar(t1, t2):
-    s1 = normalize(t1)
-    s2 = normalize(t2)
-    return s1 == s2 or s1 in s2 or s2 in s1
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.title_index import STRICT_KINDS, TitleIndex
 
 def main():
     chuffed = json.load(open('data/chuffed_campaigns.json', encoding='utf-8'))
@@ -25,17 +17,17 @@ def main():
         batch_data = json.load(open(batch_file, encoding='utf-8'))
         batch_created = [c for c in batch_data if c.get('status') == 'created_initial']
     
-    existing_titles = [c.get('title', '') for c in existing] + [c.get('title', '') for c in batch_created]
-    
+    existing_index = TitleIndex(existing + batch_created)
     missing = []
     for c in chuffed:
-        found = False
-        for ext in existing_titles:
-            if is_similar(c['title'], ext):
-                found = True
-                break
-        if not found:
-            missing.append(c)
+        match = existing_index.find(c['title'])
+        if match and match.kind in STRICT_KINDS:
+            continue
+        if match:
+            # Near matches stay in: flagged for a person to check, not silently dropped
+            print(f"REVIEW: '{c['title']}' ~ '{match.title}' ({match.score:.2f})")
+            c['possible_double'] = match.title
+        missing.append(c)
             
     print(f"Total Chuffed: {len(chuffed)}")
     print(f"Known on Whydonate (Scraped): {len(existing)}")
@@ -1,13 +1,12 @@
 
 import os
 import json
-import csv
 import glob
 import sys
 
 # Move to the project root to import our utils
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from src.utils.currency_converter import CurrencyConverter
+from src.utils.donation_store import LAUNCHGOOD, DonationStore
 
 REPORTS_DIR = "data/reports/chuffed"
 LG_REPORTS_DIR = "data/reports/launchgood"
@@ -60,35 +59,29 @@ def reconcile():
         if campaign['id'] not in ledger[internal_name]["campaigns"]:
             ledger[internal_name]["campaigns"].append(campaign['id'])
 
-    # 3. Process LaunchGood (Umbrella) CSVs for attribution
-    lg_csv_files = glob.glob(os.path.join(LG_REPORTS_DIR, "*.csv"))
+    # 3. Process LaunchGood (Umbrella) CSVs for attribution (via the donation fact store)
+    store = DonationStore()
+    for csv_path in glob.glob(os.path.join(LG_REPORTS_DIR, "*.csv")):
+        store.ingest(csv_path, LAUNCHGOOD)
+    store.prune()
     unassigned_pool_eur = 0.0
-    for csv_path in lg_csv_files:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    amount = float(row.get('Amount', 0))
-                    currency = row.get('Currency', 'EUR')
-                    comment = row.get('Comment', '').upper()
-                    
-                    gross_eur = CurrencyConverter.convert_to_eur(amount, currency)
-                    fx_fee = CurrencyConverter.get_fee(amount, currency)
-                    
-                    # Attribution Check
-                    assigned = False
-                    for internal_name in ledger:
-                        if internal_name.upper() in comment:
-                            ledger[internal_name]["launchgood_raised_eur"] += gross_eur
-                            ledger[internal_name]["raised_gross_eur"] += gross_eur
-                            ledger[internal_name]["stripe_fx_fees_eur"] += fx_fee
-                            assigned = True
-                            break
-                    
-                    if not assigned:
-                        unassigned_pool_eur += (gross_eur - fx_fee)
-                except:
-                    continue
+    for fact in store.donations(kind=LAUNCHGOOD):
+        comment = (fact.reference or '').upper()
+        gross_eur = fact.amount_eur
+        fx_fee = fact.fx_fee_eur
+
+        # Attribution Check
+        assigned = False
+        for internal_name in ledger:
+            if internal_name.upper() in comment:
+                ledger[internal_name]["launchgood_raised_eur"] += gross_eur
+                ledger[internal_name]["raised_gross_eur"] += gross_eur
+                ledger[internal_name]["stripe_fx_fees_eur"] += fx_fee
+                assigned = True
+                break
+
+        if not assigned:
+            unassigned_pool_eur += (gross_eur - fx_fee)
 
     # 4. Process Completed Payouts
     PAYOUTS_FILE = "data/payouts_completed.json"
@@ -0,0 +1,32 @@
+import glob
+import io
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.workbook_cache import WorkbookCache
+
+DEFAULT_WORKBOOKS = sorted(glob.glob("GGF/*.ods")) + [p for p in ("temp_total2/content.xml", "temp_daily/content.xml") if os.path.exists(p)]
+
+def search(query, workbooks=None, sheet=None, author=None, limit=50):
+    """Comments matching `query` across workbooks; each workbook is indexed once per version"""
+    return WorkbookCache().search_annotations(query, sources=workbooks or DEFAULT_WORKBOOKS,
+                                              sheet=sheet, author=author, limit=limit)
+
+if __name__ == "__main__":
+    import argparse
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description="Full-text search over spreadsheet cell comments")
+    parser.add_argument("query", nargs="?", default="", help="Words to find (prefix match, all required); empty lists every comment")
+    parser.add_argument("--workbook", action="append", help="Workbook (.ods or content.xml); repeatable. Default: GGF/*.ods")
+    parser.add_argument("--sheet", help="Only this sheet", default=None)
+    parser.add_argument("--author", help="Comment author contains", default=None)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    hits = search(args.query, args.workbook, args.sheet, args.author, args.limit)
+    for hit in hits:
+        print(f"[{hit.workbook} | {hit.sheet}!{hit.cell}] {hit.author or '?'} {hit.date or ''}")
+        print(f"  Value: {hit.value} | Comment: {hit.text.replace(chr(10), ' | ')}")
+    print(f"{len(hits)} comment(s) found.")
@@ -1,33 +1,29 @@
-import requests
-import json
-import websocket
-import time
+import os
+import sys
 
-CDP_URL = "http://127.0.0.1:9222/json"
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.cdp_client import CDPBrowser
+
+CDP_URL = "http://127.0.0.1:9222"
 
 def diagnose():
     try:
-        r = requests.get(CDP_URL).json()
-        target = next((t for t in r if t['type'] == 'page' and 'whydonate.com' in t.get('url', '')), None)
-        if not target:
-            print("WhyDonate page not found.")
-            return
-            
-        ws = websocket.create_connection(target['webSocketDebuggerUrl'].replace('localhost', '127.0.0.1'))
-        
-        def run_js(script):
-            msg_id = 999
-            ws.send(json.dumps({"id": msg_id, "method": "Runtime.evaluate", "params": {"expression": script, "returnByValue": True}}))
-            while True:
-                res = json.loads(ws.recv())
-                if res.get('id') == msg_id: return res['result'].get('result', {}).get('value')
-
-        print(f"URL: {run_js('window.location.href')}")
-        print(f"Title: {run_js('document.title')}")
-        print(f"Step text: {run_js('document.body.innerText.match(/Step (\\\\d)\\\\/4/)?.[0]')}")
-        print(f"H1: {run_js('document.querySelector(\"h1\")?.innerText')}")
+        with CDPBrowser(CDP_URL) as browser:
+            page = browser.page(lambda t: 'whydonate.com' in t.get('url', ''))
+            if not page:
+                print("WhyDonate page not found.")
+                return
 
-        ws.close()
+            # Independent reads: issue all four before waiting on any
+            queries = {
+                "URL": "window.location.href",
+                "Title": "document.title",
+                "Step text": 'document.body.innerText.match(/Step (\\d)\\/4/)?.[0]',
+                "H1": 'document.querySelector("h1")?.innerText',
+            }
+            results = page.evaluate_many(list(queries.values()), await_promise=False)
+            for label, value in zip(queries, results):
+                print(f"{label}: {value}")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -1,6 +1,5 @@
 import json
 import csv
-import re
 import os
 import sys
 import html
@@ -9,6 +8,8 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from scripts.orphan_donation_audit import build_phone_mapping, cleanup_match_key
+from src.utils.ods_reader import NUMERIC_TYPES, StyleTable
+from src.utils.workbook_cache import WorkbookCache
 
 # Threshhold for temporal split
 THRESHOLD_DATE = datetime(2025, 10, 31)
@@ -16,8 +17,8 @@ THRESHOLD_DATE = datetime(2025, 10, 31)
 DATA_DIR = 'data'
 TOTAL2_XML = 'temp_total2/content.xml'
 DAILY_XML = 'temp_daily/content.xml'
-TOTAL2_STYLES = 'temp_total2/styles.xml'
-DAILY_STYLES = 'temp_daily/styles.xml'
+
+WORKBOOKS = WorkbookCache()
 
 def is_paid_color(hex_color):
     if not hex_color or not hex_color.startswith('#'): return False
@@ -34,73 +35,26 @@ def is_paid_color(hex_color):
     except:
         return False
 
-def get_paid_styles(styles_xml_path, content_xml_path):
-    """Identifies style names that indicate a paid status."""
-    paid_styles = set(['Good'])
-    
-    def extract_from_file(path):
-        if not os.path.exists(path): return
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            xml = f.read()
-        blocks = re.findall(r'<style:style style:name="([^"]+)"[^>]*>(.*?)</style:style>', xml, re.DOTALL)
-        for name, content in blocks:
-            color_match = re.search(r'fo:background-color="([^"]+)"', content)
-            if color_match and is_paid_color(color_match.group(1)):
-                paid_styles.add(name)
-                
-    extract_from_file(styles_xml_path)
-    extract_from_file(content_xml_path)
-    return paid_styles
+def get_paid_styles(source):
+    """Identifies style names that indicate a paid status (backgrounds resolved through parent styles)."""
+    return WORKBOOKS.style_table(source).select(is_paid_color) | {'Good'}
+
+def extract_rows_with_status(source, sheet_names, paid_styles):
+    """Extracts rows and determines 'Paid' status based on cell styles (all sheets in one pass)."""
+    ods_rows = [row for row in WORKBOOKS.iter_rows(source, sheets=sheet_names) if row.index != 1] # Skip header
+    paid_flags = StyleTable.flag_rows(ods_rows, paid_styles)
 
-def extract_rows_with_status(xml_data, sheet_name, paid_styles):
-    """Extracts rows and determines 'Paid' status based on cell styles."""
-    match = re.search(f'table:name="{sheet_name}"', xml_data)
-    if not match: return []
-    
-    start = match.start()
-    end = xml_data.find('</table:table>', start)
-    sheet_xml = xml_data[start:end]
-    
     rows = []
-    row_pattern = re.compile(r'<table:table-row.*?>(.*?)</table:table-row>', re.DOTALL)
-    cell_pattern = re.compile(r'<(table:table-cell|table:covered-table-cell).*?(/|>(.*?)</\1)>', re.DOTALL)
-    
-    for r_idx, r_match in enumerate(row_pattern.finditer(sheet_xml)):
-        if r_idx == 0: continue # Skip header
-        
-        row_content = r_match.group(1)
-        curr_col = 0
+    for row, is_paid in zip(ods_rows, paid_flags):
         row_data = {}
-        is_paid = False
-        
-        for c_match in cell_pattern.finditer(row_content):
-            cell_xml = c_match.group(0)
-            
-            # Extract style
-            style_match = re.search(r'table:style-name="([^"]+)"', cell_xml)
-            style_name = style_match.group(1) if style_match else None
-            
-            if style_name in paid_styles:
-                is_paid = True
-            
-            rep_match = re.search(r'table:number-columns-repeated="(\d+)"', cell_xml)
-            rep_count = int(rep_match.group(1)) if rep_match else 1
-            
-            val = ""
-            v_match = re.search(r'office:value="([^"]*)"', cell_xml)
-            if v_match: val = v_match.group(1)
-            else:
-                p_match = re.search(r'<text:p>(.*?)</text:p>', cell_xml)
-                if p_match: val = p_match.group(1)
-            
-            if val.strip():
-                row_data[curr_col] = val.strip()
-            
-            curr_col += rep_count
-            if curr_col > 60: break
+        for cell in row.cells:
+            val = cell.raw_value if cell.value_type in NUMERIC_TYPES and cell.raw_value is not None else cell.text
+            if cell.column <= 60 and val.strip():
+                row_data[cell.column] = val.strip()
             
         if row_data:
             row_data['is_paid'] = is_paid
+            row_data['sheet'] = row.sheet
             rows.append(row_data)
     return rows
 
@@ -117,43 +71,41 @@ def run_split_audit():
     phone_map = build_phone_mapping()
     
     # Load styles
-    paid_styles_total2 = get_paid_styles(TOTAL2_STYLES, TOTAL2_XML)
-    paid_styles_daily = get_paid_styles(DAILY_STYLES, DAILY_XML)
+    paid_styles_total2 = get_paid_styles(TOTAL2_XML) if os.path.exists(TOTAL2_XML) else frozenset()
+    paid_styles_daily = get_paid_styles(DAILY_XML) if os.path.exists(DAILY_XML) else frozenset()
     
     pre_31_unpaid = []
     post_31_all = []
     
     # 1. Process Total2.ods (Legacy)
     if os.path.exists(TOTAL2_XML):
-        xml = open(TOTAL2_XML, 'r', encoding='utf-8', errors='ignore').read()
         sheets = ['noor', 'Rania', 'Mohammed  Suhail', 'Ibtisam', 'Fayez', 'Amani', 'Zina', 'Hala', 'Samirah', 'Mahmoud Basem']
-        for s in sheets:
-            rows = extract_rows_with_status(xml, s, paid_styles_total2)
-            for r in rows:
-                ts = parse_ods_date(r.get(11))
-                title = r.get(0) or r.get(1, "Unknown")
-                amt = r.get(4, "0")
-                phone = phone_map.get(cleanup_match_key(title), "Unmapped")
-                
-                event = {
-                    "Timestamp": str(ts) if ts else "N/A",
-                    "Campaign": html.unescape(title),
-                    "Amount": amt,
-                    "Status": "Paid" if r['is_paid'] else "Unpaid",
-                    "WhatsApp": phone,
-                    "Source": f"Total2:{s}"
-                }
-                
-                if ts and ts < THRESHOLD_DATE:
-                    if not r['is_paid']:
-                        pre_31_unpaid.append(event)
-                elif ts and ts >= THRESHOLD_DATE:
-                    post_31_all.append(event)
+        rows = extract_rows_with_status(TOTAL2_XML, sheets, paid_styles_total2)
+        for r in rows:
+            s = r['sheet']
+            ts = parse_ods_date(r.get(11))
+            title = r.get(0) or r.get(1, "Unknown")
+            amt = r.get(4, "0")
+            phone = phone_map.get(cleanup_match_key(title), "Unmapped")
+            
+            event = {
+                "Timestamp": str(ts) if ts else "N/A",
+                "Campaign": html.unescape(title),
+                "Amount": amt,
+                "Status": "Paid" if r['is_paid'] else "Unpaid",
+                "WhatsApp": phone,
+                "Source": f"Total2:{s}"
+            }
+            
+            if ts and ts < THRESHOLD_DATE:
+                if not r['is_paid']:
+                    pre_31_unpaid.append(event)
+            elif ts and ts >= THRESHOLD_DATE:
+                post_31_all.append(event)
 
     # 2. Process Daily.ods (Payments)
     if os.path.exists(DAILY_XML):
-        xml = open(DAILY_XML, 'r', encoding='utf-8', errors='ignore').read()
-        rows = extract_rows_with_status(xml, 'Payments', paid_styles_daily)
+        rows = extract_rows_with_status(DAILY_XML, 'Payments', paid_styles_daily)
         for r in rows:
             ts = parse_ods_date(r.get(11))
             title = r.get(0) or r.get(1, "Unknown")
@@ -1,41 +1,40 @@
-import re
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.workbook_cache import WorkbookCache
 
 content_path = 'temp_total2/content.xml'
-with open(content_path, 'r', encoding='utf-8', errors='ignore') as f:
-    data = f.read()
+workbooks = WorkbookCache()
+
+def annotations_mentioning(terms):
+    """
+    Comments containing any of the terms, in workbook (sheet, row, column) order.
+    Plain substring match on the cached comments, not the FTS index: the
+    index matches word prefixes only, so '5536' would miss '15536.12'.
+    """
+    terms = [t.lower() for t in terms]
+    return [ann for ann in workbooks.annotations(content_path) if any(t in ann.text.lower() for t in terms)]
+
+hits = []
+for row in workbooks.iter_rows(content_path):
+    for cell in row.cells:
+        ref = f"{row.sheet}!{cell.col}{row.index}"
+        if '5536.12' in (cell.raw_value or '') or '5536,12' in cell.text or '5536.12' in cell.text:
+            hits.append((ref, cell))
 
 print("--- SEARCHING FOR '5536.12' ---")
-for m in re.finditer(r'5536\.12|5536,12', data):
-    print(f"Found at {m.start()}")
-    print(f"Context: {data[max(0, m.start()-200):m.end()+200]}")
+for ref, cell in hits:
+    print(f"Found at {ref}")
+    print(f"Context: value={cell.raw_value} text={cell.text} style={cell.style}")
 
 print("\n--- DUMPING ALL ANNOTATIONS ---")
-for m in re.finditer(r'<office:annotation.*?</office:annotation>', data, re.DOTALL):
-    ann_xml = m.group(0)
-    # Get sheet name
-    table_name_match = re.findall(r'table:name="(.*?)"', data[:m.start()])
-    table_name = table_name_match[-1] if table_name_match else "Unknown"
-    
-    # Get text
-    p_texts = re.findall(r'<text:p>(.*?)</text:p>', ann_xml)
-    ann_text = " | ".join(p_texts)
-    
-    # Get cell context (walk back to previous cell start)
-    cell_context = data[max(0, m.start()-500):m.start()]
-    
-    if any(x in ann_text.lower() for x in ['rania', 'ibtisam', 'fayez', 'debt', 'gross', '5536']):
-         print(f"Sheet: {sheet} | Text: {ann_text}")
-         print(f"Cell Context: {cell_context[-300:]}")
-         print("-" * 50)
+for ann in annotations_mentioning(['rania', 'ibtisam', 'fayez', 'debt', 'gross', '5536']):
+    print(f"Sheet: {ann.sheet} | Text: {ann.text.replace(chr(10), ' | ')}")
+    print(f"Cell Context: {ann.sheet}!{ann.cell} = {ann.value}")
+    print("-" * 50)
 
 # Also dump ALL annotations mentioning Rania, Ibtisam, Fayez regardless of cell
 print("\n--- ANY ANNOTATION MENTIONING TARGET NAMES ---")
-for m in re.finditer(r'<office:annotation.*?</office:annotation>', data, re.DOTALL):
-    ann_xml = m.group(0)
-    p_texts = re.findall(r'<text:p>(.*?)</text:p>', ann_xml)
-    ann_text = " | ".join(p_texts)
-    if any(x in ann_text.lower() for x in ['rania', 'ibtisam', 'fayez']):
-        table_name_match = re.findall(r'table:name="(.*?)"', data[:m.start()])
-        sheet = table_name_match[-1] if table_name_match else "Unknown"
-        print(f"Sheet: {sheet} | Comment: {ann_text}")
+for ann in annotations_mentioning(['rania', 'ibtisam', 'fayez']):
+    print(f"Sheet: {ann.sheet} | Comment: {ann.text.replace(chr(10), ' | ')}")
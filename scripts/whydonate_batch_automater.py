@@ -1,85 +1,85 @@
 import re
 import requests
 import json
-import websocket
 import time
 import os
 import sys
 import traceback
 from PIL import Image
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.cdp_client import CDPBrowser
+
 # Configure UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-CDP_URL = "http://127.0.0.1:9222/json"
+CDP_URL = "http://127.0.0.1:9222"
 
 class WhyDonateAutomator:
-    global_msg_id = 100
-
     def __init__(self, cdp_url=CDP_URL):
         self.cdp_url = cdp_url
-        self.ws = None
+        self.browser = None
+        self.page = None
 
     def connect(self):
         try:
-            r = requests.get(self.cdp_url)
-            tabs = r.json()
+            self.browser = CDPBrowser(self.cdp_url)
             # Prefer existing WhyDonate tabs
-            target_tab = next((t for t in tabs if "whydonate.com" in t.get('url', '')), tabs[0])
-            self.ws = websocket.create_connection(target_tab['webSocketDebuggerUrl'])
-            return True
+            self.page = self.browser.page(lambda t: "whydonate.com" in t.get('url', '')) or self.browser.page()
+            return self.page is not None
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
 
-    def send_cdp(self, method, params=None):
-        WhyDonateAutomator.global_msg_id += 1
-        msg = {"id": WhyDonateAutomator.global_msg_id, "method": method, "params": params or {}}
-        self.ws.send(json.dumps(msg))
-        return WhyDonateAutomator.global_msg_id
-
-    def recv_until_id(self, msg_id, timeout=10):
-        start = time.time()
-        while time.time() - start < timeout:
-            res = json.loads(self.ws.recv())
-            if res.get('id') == msg_id: return res
-        return None
+    def send_cdp(self, method, params=None, wait=True, timeout=10):
+        """Result of a CDP command (None on error/timeout); wait=False pipelines it instead"""
+        if not wait:
+            self.page.send_nowait(method, params)
+            return None
+        try:
+            return self.page.send(method, params, timeout=timeout)
+        except Exception as e:
+            print(f"DEBUG: {method} failed: {e}", flush=True)
+            return None
 
     def run_js(self, js):
-        mid = self.send_cdp("Runtime.evaluate", {"expression": js, "returnByValue": True})
-        res = self.recv_until_id(mid)
-        return res.get('result', {}).get('result', {}).get('value')
+        try:
+            return self.page.evaluate(js, await_promise=False, timeout=10)
+        except Exception:
+            return None
 
     def take_screenshot(self, filename):
-        mid = self.send_cdp("Page.captureScreenshot", {"format": "png"})
-        res = self.recv_until_id(mid)
-        if res and 'result' in res:
+        res = self.send_cdp("Page.captureScreenshot", {"format": "png"})
+        if res and 'data' in res:
             import base64
             with open(filename, "wb") as f:
-                f.write(base64.b64decode(res['result']['data']))
+                f.write(base64.b64decode(res['data']))
             print(f"Screenshot saved to {filename}")
 
-    def type_string(self, text):
-        for char in text:
-            self.send_cdp("Input.dispatchKeyEvent", {"type": "char", "text": char})
-            time.sleep(0.05)
+    def fill_field(self, selector, text, clear=True, force_editable=False):
+        """Enters text into a form field and verifies it; False if the field is missing or kept another value"""
+        started = time.time()
+        try:
+            strategy = self.page.fill(selector, text, clear=clear, force_editable=force_editable)
+        except Exception as e:
+            print(f"DEBUG: fill failed for {selector}: {e}", flush=True)
+            return False
+        if strategy is None:
+            print(f"DEBUG: Field {selector} not found or rejected the text.", flush=True)
+            return False
+        print(f"DEBUG: Filled {len(text)} chars via {strategy} in {time.time() - started:.2f}s", flush=True)
+        return True
 
     def press_key(self, key, code):
-        self.send_cdp("Input.dispatchKeyEvent", {"type": "keyDown", "key": key, "windowsVirtualKeyCode": code})
-        self.send_cdp("Input.dispatchKeyEvent", {"type": "keyUp", "key": key, "windowsVirtualKeyCode": code})
+        self.send_cdp("Input.dispatchKeyEvent", {"type": "keyDown", "key": key, "windowsVirtualKeyCode": code}, wait=False)
+        self.send_cdp("Input.dispatchKeyEvent", {"type": "keyUp", "key": key, "windowsVirtualKeyCode": code}, wait=False)
 
     def upload_file(self, selector, file_path):
         try:
-            res = self.send_cdp("DOM.getDocument")
-            doc = self.recv_until_id(res)
-            node_res = self.send_cdp("DOM.querySelector", {"nodeId": doc['result']['root']['nodeId'], "selector": selector})
-            node = self.recv_until_id(node_res)
-            if node and 'result' in node:
-                self.send_cdp("DOM.setFileInputFiles", {"files": [file_path], "nodeId": node['result']['nodeId']})
-                return True
+            return self.page.set_file_input(selector, [file_path])
         except: pass
         return False
 
@@ -129,12 +129,7 @@ class WhyDonateAutomator:
         # 2. Fill Address
         location = "Porto, Portugal"
         print(f"DEBUG: Typing Location: {location}", flush=True)
-        self.run_js("""
-            const i = document.querySelector('input[formcontrolname="address"], input[placeholder*="address"]');
-            if (i) { i.focus(); i.value = ''; i.dispatchEvent(new Event('input', {bubbles:true})); }
-        """)
-        time.sleep(1)
-        self.type_string(location)
+        self.fill_field('input[formcontrolname="address"], input[placeholder*="address"]', location)
         time.sleep(3)
         
         # 3. Select from Dropdown
@@ -184,12 +179,7 @@ class WhyDonateAutomator:
         raw_name = item['title'].replace("Help ", "").split("&")[0].split("and")[0].split("with")[0].strip()
         name = raw_name[:40].strip()
         print(f"DEBUG: Typing Beneficiary Name: {name}...", flush=True)
-        self.run_js("""
-            const i = document.querySelector('input[formcontrolname="name"], input[placeholder*="Name"]');
-            if (i) { i.focus(); i.value = ''; i.dispatchEvent(new Event('input', {bubbles:true})); }
-        """)
-        time.sleep(1)
-        self.type_string(name)
+        self.fill_field('input[formcontrolname="name"], input[placeholder*="Name"]', name)
         time.sleep(3)
         
         # 3. Click Next
@@ -212,15 +202,9 @@ class WhyDonateAutomator:
         ts = datetime.now().strftime("%H%M%S")
         slug = f"f-{item['bid']}-{ts}"[:70] 
         
-        self.run_js(f"""
-            (function() {{
-                const t = document.querySelector('input[formcontrolname=\"title\"], input.fundraiserTitle');
-                if (t) {{ t.focus(); t.value = {json.dumps(title)}; t.dispatchEvent(new Event('input', {{bubbles:true}})); }}
-                const u = document.querySelector('input[formcontrolname=\"custom_url\"], input.linkUrl');
-                if (u) {{ u.focus(); u.removeAttribute('readonly'); u.value = {json.dumps(slug)}; u.dispatchEvent(new Event('input', {{bubbles:true}})); }}
-            }})()
-        """)
-        time.sleep(2)
+        self.fill_field('input[formcontrolname="title"], input.fundraiserTitle', title)
+        # The page renders the custom URL field readonly
+        self.fill_field('input[formcontrolname="custom_url"], input.linkUrl', slug, force_editable=True)
 
         # 1. Fill Story
         description = item.get('campaign_description') or item.get('description') or item.get('story') or "Help support this campaign. We need your support to rebuild lives."
@@ -230,24 +214,9 @@ class WhyDonateAutomator:
         self.run_js("const s = document.getElementById('createFundraiserStoryDescription'); if(s) s.click();")
         time.sleep(2)
         
-        story_res = self.run_js(f"""
-            (function() {{
-                const ta = document.querySelector('textarea.createFundraiserStory, textarea[formcontrolname=\"description\"]');
-                if (ta) {{
-                    ta.focus();
-                    ta.value = {json.dumps(description)};
-                    ta.dispatchEvent(new Event('input', {{bubbles:true}}));
-                    return "STORY_SET_TEXTAREA";
-                }}
-                const editor = document.querySelector('.ql-editor');
-                if (editor) {{
-                    editor.innerHTML = '<p>' + {json.dumps(description)} + '</p>';
-                    editor.dispatchEvent(new Event('input', {{bubbles:true}}));
-                    return "STORY_SET_QL";
-                }}
-                return "STORY_NOT_FOUND";
-            }})()
-        """)
+        filled = self.fill_field('textarea.createFundraiserStory, textarea[formcontrolname="description"], .ql-editor',
+                                 description)
+        story_res = "STORY_SET" if filled else "STORY_NOT_FOUND"
         print(f"DEBUG: Story filling result: {story_res}", flush=True)
         time.sleep(2)
         
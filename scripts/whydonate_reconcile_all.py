@@ -1,43 +1,24 @@
-import requests
 import json
-import websocket
 import time
 import os
+import sys
 
-CDP_URL = "http://localhost:9222/json"
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.cdp_client import CDPBrowser
+from src.utils.title_index import TitleIndex
 
-MSG_ID = 1
+CDP_URL = "http://127.0.0.1:9222"
 
-def normalize_title(t):
-    import re
-    if not t: return ""
-    t = str(t).replace('\u00a0', ' ').lower()
-    t = re.sub(r'[^a-z0-9 ]', '', t)
-    return " ".join(t.split())
-
-def run_js(ws, js, timeout=60):
-    global MSG_ID
-    MSG_ID += 1
-    this_id = MSG_ID
-    msg = json.dumps({
-        "id": this_id,
-        "method": "Runtime.evaluate",
-        "params": {"expression": js, "returnByValue": True, "awaitPromise": True}
-    })
-    ws.send(msg)
-    start_t = time.time()
-    while time.time() - start_t < timeout:
-        try:
-            res = json.loads(ws.recv())
-            if res.get('id') == this_id:
-                return res.get('result', {}).get('result', {}).get('value')
-        except: continue
-    return None
+def run_js(page, js, timeout=60):
+    try:
+        return page.evaluate(js, timeout=timeout)
+    except Exception:
+        return None
 
 def main():
     try:
-        r = requests.get(CDP_URL).json()
-        tabs = [t for t in r if 'whydonate.com' in t.get('url', '') and t['type'] == 'page']
+        browser = CDPBrowser(CDP_URL)
+        tabs = [t for t in browser.pages() if 'whydonate.com' in t.get('url', '')]
         
         # Priority 1: Already on fundraisers list
         target = next((t for t in tabs if 'fundraisers' in t.get('url', '').lower()), None)
@@ -51,32 +32,25 @@ def main():
         if not target and tabs:
             target = tabs[0]
         
-        if not target:
+        if target:
+            print(f"Connecting to: {target['url']}")
+            page = browser.page(lambda t: t['targetId'] == target['targetId'])
+        else:
             print("Whydonate tab not found. Opening fundraisers dashboard...")
-            requests.put(f"{CDP_URL}/new?https://whydonate.com/en/dashboard/fundraisers/")
-            time.sleep(5)
-            r = requests.get(CDP_URL).json()
-            target = next((t for t in r if 'whydonate.com' in t.get('url', '') and t['type'] == 'page'), None)
+            page = browser.new_page("https://whydonate.com/en/dashboard/fundraisers/")
+            target = {'url': run_js(page, "window.location.href") or ''}
 
-        if not target:
-            print("Failed to open or find Whydonate tab.")
-            return
-
-        print(f"Connecting to: {target['url']}")
-        ws = websocket.create_connection(target['webSocketDebuggerUrl'])
-        ws.settimeout(60)
-        
         # Check if login is required
         current_url = target['url']
         if "login" in current_url.lower() or "dashboard" not in current_url.lower():
             print(f"Navigating to fundraisers dashboard (Current: {current_url})...")
-            run_js(ws, "window.location.href = 'https://whydonate.com/en/dashboard/fundraisers/'")
+            run_js(page, "window.location.href = 'https://whydonate.com/en/dashboard/fundraisers/'")
             time.sleep(5)
             
         # Wait up to 60s for the dashboard to load (handling potential login)
         print("Waiting for dashboard to be ready...")
         for _ in range(12):
-            url = run_js(ws, "window.location.href")
+            url = run_js(page, "window.location.href")
             if url and "dashboard" in url.lower() and "login" not in url.lower():
                 print(f"Dashboard reached: {url}")
                 break
@@ -90,9 +64,9 @@ def main():
         
         # Scroll and Load All
         for i in range(30):
-            run_js(ws, "window.scrollTo(0, document.body.scrollHeight);")
+            run_js(page, "window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(2)
-            btn_clicked = run_js(ws, """
+            btn_clicked = run_js(page, """
                 (function() {
                     const btns = Array.from(document.querySelectorAll('button'));
                     const viewMore = btns.find(b => b.innerText.includes('View more') || b.innerText.includes('Toon meer'));
@@ -107,18 +81,18 @@ def main():
         # Scrape titles and relative paths
         print("Scraping cards...")
         # Save HTML for inspection
-        html_src = run_js(ws, "document.documentElement.outerHTML")
+        html_src = run_js(page, "document.documentElement.outerHTML")
         with open("whydonate_dashboard_debug.html", "w", encoding='utf-8') as f:
             f.write(html_src)
         print("Saved dashboard source to whydonate_dashboard_debug.html")
 
         # Wait for cards to appear
         for _ in range(10):
-            has_cards = run_js(ws, "!!document.querySelector('mat-card-title, .title-text, h3, .campaign-title')")
+            has_cards = run_js(page, "!!document.querySelector('mat-card-title, .title-text, h3, .campaign-title')")
             if has_cards: break
             time.sleep(2)
 
-        data = run_js(ws, """
+        data = run_js(page, """
             (function() {
                 const cards = Array.from(document.querySelectorAll('mat-card, .fundraising-card, .campaign-card, .card, .ng-star-inserted'));
                 return cards.map(card => {
@@ -137,7 +111,7 @@ def main():
         
         if not data:
             print("No data found with mat-card. Trying generic link extraction...")
-            data = run_js(ws, """
+            data = run_js(page, """
                 Array.from(document.querySelectorAll('a[href*="/fundraising/"]'))
                     .map(a => ({ title: a.innerText.trim(), url: a.href }))
                     .filter(x => x.title.length > 5)
@@ -158,25 +132,37 @@ def main():
             # Extract list from dict if needed
             campaigns_list = unified_data.get('campaigns', []) if isinstance(unified_data, dict) else unified_data
             
-            # Map by normalized title
-            wd_map = {normalize_title(item['title']): item['url'] for item in data}
+            # Index scraped titles once. URLs are only assigned on a unique exact,
+            # truncated or contained title match: near matches can be another family with the same names
+            wd_index = TitleIndex(data)
             
             updated_count = 0
+            claimed = {}
             for camp in campaigns_list:
-                norm = normalize_title(camp.get('title', ''))
-                if norm in wd_map:
-                    # Update or add Whydonate info
-                    if 'whydonate' not in camp:
-                        camp['whydonate'] = {}
-                    camp['whydonate']['url'] = wd_map[norm]
-                    camp['whydonate']['status'] = 'active'
-                    updated_count += 1
+                title = camp.get('title', '')
+                match = wd_index.find_unique(title)
+                if not match:
+                    near = wd_index.find(title)
+                    if near:
+                        print(f"REVIEW: '{title}' ~ '{near.title}' ({near.kind}, {near.score:.2f}); not linked.")
+                    continue
+                url = match.value['url']
+                if url in claimed:
+                    print(f"REVIEW: {url} matches both '{claimed[url]}' and '{title}'; not linked twice.")
+                    continue
+                claimed[url] = title
+                # Update or add Whydonate info
+                if 'whydonate' not in camp:
+                    camp['whydonate'] = {}
+                camp['whydonate']['url'] = url
+                camp['whydonate']['status'] = 'active'
+                updated_count += 1
             
             with open(unified_path, 'w', encoding='utf-8') as f:
                 json.dump(unified_data, f, indent=2)
             print(f"Reconciliation complete. Updated {updated_count} records in unified database.")
         
-        ws.close()
+        browser.close()
     except Exception as e:
         print(f"Reconciliation Error: {e}")
 
@@ -22,3 +22,21 @@ class Settings:
     @property
     def fallback_order(self) -> List[str]:
         return self.config.get("fallback_order", ["ollama"])
+
+    @property
+    def generation_config(self) -> Dict[str, Any]:
+        return self.config.get("generation") or {}
+
+    @property
+    def cache_config(self) -> Dict[str, Any]:
+        return self.config.get("cache") or {}
+
+    @property
+    def failover_config(self) -> Dict[str, Any]:
+        return self.config.get("failover") or {}
+
+    def get_http_config(self, provider_name: str) -> Dict[str, Any]:
+        """Global `http` settings, overridden by the provider's own `http` block"""
+        http = dict(self.config.get("http") or {})
+        http.update(self.get_provider_config(provider_name).get("http") or {})
+        return http
@@ -0,0 +1,59 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional
+from .base import AIResponse, BatchResult
+
+class AsyncBaseProvider(ABC):
+    """Asyncio counterpart of BaseProvider, with bounded concurrent batch generation"""
+    
+    @abstractmethod
+    async def agenerate(self, prompt: str, **kwargs) -> AIResponse:
+        """Generate a response from the AI model"""
+        pass
+
+    @abstractmethod
+    async def ais_available(self) -> bool:
+        """Check if the provider is running and accessible"""
+        pass
+
+    async def agenerate_many(self, prompts: List[str], concurrency: int = 4, **kwargs) -> List[BatchResult]:
+        """
+        Runs up to `concurrency` generations at once.
+        Results come back in input order; a failed prompt yields an error entry
+        instead of aborting the batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run_one(index: int, prompt: str) -> BatchResult:
+            async with semaphore:
+                try:
+                    return BatchResult(index=index, response=await self.agenerate(prompt, **kwargs))
+                except Exception as e:
+                    return BatchResult(index=index, error=str(e))
+        
+        return list(await asyncio.gather(*(run_one(i, p) for i, p in enumerate(prompts))))
+
+class AsyncProviderAdapter(AsyncBaseProvider):
+    """
+    Exposes a blocking provider (anything with generate / is_available) to asyncio
+    by running its calls on a dedicated thread pool, one thread per server slot.
+    """
+    
+    def __init__(self, provider, max_workers: int = 4):
+        self.provider = provider
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ai-gen")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def agenerate(self, prompt: str, **kwargs) -> AIResponse:
+        return await self._run(self.provider.generate, prompt, **kwargs)
+
+    async def ais_available(self) -> bool:
+        return await self._run(self.provider.is_available)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
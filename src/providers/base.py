@@ -1,5 +1,6 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 from pydantic import BaseModel, Field
 
 class AIResponse(BaseModel):
@@ -11,6 +12,16 @@ class AIResponse(BaseModel):
     generation_time: Optional[float] = None
     raw_response: Optional[Dict[str, Any]] = None
 
+class BatchResult(BaseModel):
+    """Outcome of one prompt in a batch; exactly one of response / error is set"""
+    index: int
+    response: Optional[AIResponse] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class BaseProvider(ABC):
     """Abstract base for all AI providers"""
     
@@ -18,6 +29,14 @@ class BaseProvider(ABC):
     def generate(self, prompt: str, **kwargs) -> AIResponse:
         """Generate a response from the AI model"""
         pass
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield content chunks as the model produces them.
+
+        Providers without a native streaming endpoint fall back to a single
+        chunk holding the full completion.
+        """
+        yield self.generate(prompt, **kwargs).content
     
     @abstractmethod
     def is_available(self) -> bool:
@@ -28,3 +47,25 @@ class BaseProvider(ABC):
     def list_models(self) -> List[str]:
         """List available models for this provider"""
         pass
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Request / connection reuse counters of the provider's HTTP pool"""
+        session = getattr(self, "session", None)
+        return session.connection_stats() if session is not None else {}
+
+def iter_openai_sse(response) -> Iterator[str]:
+    """Yields delta contents from an OpenAI-compatible SSE (`data: {...}`) stream"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        choices = chunk.get("choices") or [{}]
+        delta = choices[0].get("delta", {}).get("content")
+        if delta:
+            yield delta
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Optional
+from .base import BaseProvider
+
+class ProviderHealth:
+    """
+    Cached availability probe plus circuit breaker for a single provider.
+    
+    The breaker opens after `failure_threshold` consecutive failures and stays
+    open for `reset_timeout` seconds; after that a single trial request is let
+    through (half-open) and its outcome closes or re-opens the breaker.
+    State changes are locked: concurrent callers (generate_many) share it.
+    """
+    
+    def __init__(self, provider: BaseProvider, failure_threshold: int = 3,
+                 reset_timeout: float = 60.0, health_ttl: float = 30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.health_ttl = health_ttl
+        
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._available: Optional[bool] = None
+        self._checked_at = 0.0
+        # When the half-open trial request was handed out (None: no trial running)
+        self._trial_started: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def is_available(self) -> bool:
+        """Provider's own is_available(), re-probed at most once per health_ttl"""
+        with self._lock:
+            now = time.monotonic()
+            if self._available is None or now - self._checked_at >= self.health_ttl:
+                self._available = self.provider.is_available()
+                self._checked_at = now
+            return self._available
+
+    def allows_request(self, trial: bool = True) -> bool:
+        """
+        Whether a request may be sent now. In half-open state only one caller
+        gets the trial; `trial=False` just asks without taking it.
+        """
+        with self._lock:
+            state = self.state
+            if state == "open":
+                return False
+            if state == "closed":
+                return self.is_available()
+            now = time.monotonic()
+            # A trial whose caller never reported back (abandoned stream) expires like an open breaker
+            if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                return False
+            # The probe decides whether the trial request is worth sending
+            self._checked_at = 0.0
+            if not self.is_available():
+                self.opened_at = now
+                return False
+            if trial:
+                self._trial_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_started = None
+            self._available = True
+            self._checked_at = time.monotonic()
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._available = None
+            if self.state == "half_open" or self._trial_started is not None \
+                    or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_started = None
@@ -1,33 +1,37 @@
-import requests
 import time
-from typing import List, Optional, Dict, Any
-from .base import BaseProvider, AIResponse
+from typing import List, Optional, Dict, Any, Iterator
+from .session import PooledSession
+from .base import BaseProvider, AIResponse, iter_openai_sse
 
 class LMStudioProvider(BaseProvider):
     """Implementation for LM Studio AI backend (OpenAI-compatible)"""
     
-    def __init__(self, host: str = "localhost", port: int = 1234, default_model: Optional[str] = None):
+    def __init__(self, host: str = "localhost", port: int = 1234, default_model: Optional[str] = None, http_config: Optional[Dict[str, Any]] = None):
         self.base_url = f"http://{host}:{port}/v1"
         self.default_model = default_model
+        self.session = PooledSession(http_config)
 
-    def generate(self, prompt: str, **kwargs) -> AIResponse:
-        model = kwargs.get("model", self.default_model)
-        # If no model is specified, LM Studio usually uses the currently loaded one
-        
-        start_time = time.time()
-        
-        payload = {
+    def _build_payload(self, prompt: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        return {
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "model": model,
+            "model": kwargs.get("model", self.default_model),
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 2048),
-            "stream": False
+            "stream": stream
         }
+
+    def generate(self, prompt: str, **kwargs) -> AIResponse:
+        model = kwargs.get("model", self.default_model)
+        # If no model is specified, LM Studio usually uses the currently loaded one
+        
+        start_time = time.time()
+        
+        payload = self._build_payload(prompt, stream=False, **kwargs)
         
         try:
-            response = requests.post(f"{self.base_url}/chat/completions", json=payload)
+            response = self.session.post(f"{self.base_url}/chat/completions", json=payload)
             response.raise_for_status()
             data = response.json()
             
@@ -46,16 +50,27 @@ class LMStudioProvider(BaseProvider):
         except Exception as e:
             raise RuntimeError(f"LM Studio generation failed: {str(e)}")
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yields content deltas from the OpenAI-compatible SSE stream"""
+        payload = self._build_payload(prompt, stream=True, **kwargs)
+        
+        try:
+            with self.session.post(f"{self.base_url}/chat/completions", json=payload, stream=True) as response:
+                response.raise_for_status()
+                yield from iter_openai_sse(response)
+        except Exception as e:
+            raise RuntimeError(f"LM Studio streaming failed: {str(e)}")
+
     def is_available(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/models")
+            response = self.session.get(f"{self.base_url}/models", timeout=self.session.timeout[0])
             return response.status_code == 200
         except:
             return False
 
     def list_models(self) -> List[str]:
         try:
-            response = requests.get(f"{self.base_url}/models")
+            response = self.session.get(f"{self.base_url}/models")
             response.raise_for_status()
             models_data = response.json().get("data", [])
             return [m["id"] for m in models_data]
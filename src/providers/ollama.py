@@ -1,34 +1,38 @@
-import requests
+import json
 import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
+from .session import PooledSession
 from .base import BaseProvider, AIResponse
 
 class OllamaProvider(BaseProvider):
     """Implementation for Ollama AI backend"""
     
-    def __init__(self, host: str = "localhost", port: int = 11434, default_model: str = "gemma3:4b"):
+    def __init__(self, host: str = "localhost", port: int = 11434, default_model: str = "gemma3:4b", http_config: Optional[Dict[str, Any]] = None):
         self.base_url = f"http://{host}:{port}/api"
         self.default_model = default_model
+        self.session = PooledSession(http_config)
 
-    def generate(self, prompt: str, **kwargs) -> AIResponse:
-        model = kwargs.get("model", self.default_model)
-        system = kwargs.get("system", "")
-        
-        start_time = time.time()
-        
-        payload = {
-            "model": model,
+    def _build_payload(self, prompt: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        return {
+            "model": kwargs.get("model", self.default_model),
             "prompt": prompt,
-            "system": system,
-            "stream": False,
+            "system": kwargs.get("system", ""),
+            "stream": stream,
             "options": {
                 "temperature": kwargs.get("temperature", 0.7),
                 "num_predict": kwargs.get("max_tokens", 2048)
             }
         }
+
+    def generate(self, prompt: str, **kwargs) -> AIResponse:
+        model = kwargs.get("model", self.default_model)
+        
+        start_time = time.time()
+        
+        payload = self._build_payload(prompt, stream=False, **kwargs)
         
         try:
-            response = requests.post(f"{self.base_url}/generate", json=payload)
+            response = self.session.post(f"{self.base_url}/generate", json=payload)
             response.raise_for_status()
             data = response.json()
             
@@ -45,16 +49,36 @@ class OllamaProvider(BaseProvider):
         except Exception as e:
             raise RuntimeError(f"Ollama generation failed: {str(e)}")
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yields tokens from Ollama's NDJSON stream as they are generated"""
+        payload = self._build_payload(prompt, stream=True, **kwargs)
+        
+        try:
+            with self.session.post(f"{self.base_url}/generate", json=payload, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+        except Exception as e:
+            raise RuntimeError(f"Ollama streaming failed: {str(e)}")
+
     def is_available(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url.replace('/api', '')}")
+            response = self.session.get(f"{self.base_url.replace('/api', '')}", timeout=self.session.timeout[0])
             return response.status_code == 200
         except:
             return False
 
     def list_models(self) -> List[str]:
         try:
-            response = requests.get(f"{self.base_url}/tags")
+            response = self.session.get(f"{self.base_url}/tags")
             response.raise_for_status()
             models = response.json().get("models", [])
             return [m["name"] for m in models]
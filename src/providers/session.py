@@ -0,0 +1,83 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Dict, Any, Optional, Tuple
+
+DEFAULT_HTTP_CONFIG = {
+    "pool_size": 10,
+    "keep_alive": True,
+    "connect_timeout": 5.0,
+    "read_timeout": 300.0,
+}
+
+class _ConnectionCounter:
+    """Thread-safe tally of requests sent and sockets opened"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def add(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+def _counting_pool(pool_cls, counter: _ConnectionCounter):
+    """Subclasses a urllib3 pool so every (re)connect of a socket is counted"""
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            super().connect()
+            counter.add("connections_opened")
+
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": CountingConnection})
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, counter: _ConnectionCounter, **kwargs):
+        self.counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.counter),
+            "https": _counting_pool(HTTPSConnectionPool, self.counter),
+        }
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a sized connection pool and default timeouts.
+    Keeps connections to the local model server open between generations.
+    """
+    
+    def __init__(self, http_config: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.http_config = {**DEFAULT_HTTP_CONFIG, **(http_config or {})}
+        self._counter = _ConnectionCounter()
+        pool_size = int(self.http_config["pool_size"])
+        
+        adapter = _CountingAdapter(self._counter, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        
+        if not self.http_config["keep_alive"]:
+            self.headers["Connection"] = "close"
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (float(self.http_config["connect_timeout"]), float(self.http_config["read_timeout"]))
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self._counter.add("requests")
+        return super().request(method, url, **kwargs)
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Requests sent vs. sockets opened; the difference was served by kept-alive connections"""
+        requests_sent = self._counter.requests
+        connections_opened = self._counter.connections_opened
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0),
+        }
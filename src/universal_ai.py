@@ -1,48 +1,188 @@
-from typing import Optional, Dict, Any, Tuple
-import yaml
+from typing import Optional, Dict, Any, Tuple, Iterator, List
+import asyncio
+import os
+import threading
 from .providers.ollama import OllamaProvider
 from .providers.lm_studio import LMStudioProvider
 from .providers.gpt4all import GPT4AllProvider
 from .config.settings import Settings
-from .providers.base import AIResponse
+from .providers.base import AIResponse, BatchResult
+from .providers.async_base import AsyncProviderAdapter
+from .providers.health import ProviderHealth
 from .utils.validator import ResponseValidator, ValidationResult
 from .utils.liquidity import LiquidityManager
+from .utils.response_cache import ROOT_DIR, ResponseCache
+from .utils.prompt_registry import PromptRegistry
 
 class UniversalAI:
-    def __init__(self, provider_name: Optional[str] = None):
+    def __init__(self, provider_name: Optional[str] = None, failover: bool = True):
         self.settings = Settings()
         self.provider_name = provider_name or self.settings.default_provider
         self.provider = self._init_provider(self.provider_name)
         self.validator = ResponseValidator()
         self.liquidity = LiquidityManager()
+        
+        # Primary provider first, then the rest of fallback_order
+        self.fallback_chain = [self.provider_name]
+        if failover:
+            self.fallback_chain += [n for n in self.settings.fallback_order if n != self.provider_name]
+        # None marks a fallback name that could not be built
+        self._health: Dict[str, Optional[ProviderHealth]] = {}
+        self._health_lock = threading.Lock()
+        self.cache = self._init_cache()
+        self.prompts = PromptRegistry()
+
+    def _init_cache(self) -> Optional[ResponseCache]:
+        cfg = self.settings.cache_config
+        if not cfg.get("enabled", True):
+            return None
+        return ResponseCache(
+            # config.yaml paths are relative to the project root, not the working directory
+            path=os.path.join(ROOT_DIR, cfg.get("path", "data/cache/responses.sqlite")),
+            ttl_seconds=float(cfg.get("ttl_seconds", 7 * 24 * 3600)),
+            max_entries=int(cfg.get("max_entries", 5000))
+        )
 
     def _init_provider(self, name: str):
         config = self.settings.get_provider_config(name)
+        http_config = self.settings.get_http_config(name)
         if name == "ollama":
             return OllamaProvider(
                 host=config.get("host", "localhost"),
                 port=config.get("port", 11434),
-                default_model=config.get("default_model", "gemma3:latest")
+                default_model=config.get("default_model", "gemma3:latest"),
+                http_config=http_config
             )
         elif name == "lm_studio":
             return LMStudioProvider(
                 host=config.get("host", "localhost"),
                 port=config.get("port", 1234),
-                default_model=config.get("default_model")
+                default_model=config.get("default_model"),
+                http_config=http_config
             )
         elif name == "gpt4all":
             return GPT4AllProvider(
                 host=config.get("host", "localhost"),
                 port=config.get("port", 4891),
-                default_model=config.get("default_model", "mistral-7b-instruct")
+                default_model=config.get("default_model", "mistral-7b-instruct"),
+                http_config=http_config
             )
         raise ValueError(f"Provider {name} not implemented yet")
 
+    def _get_health(self, name: str) -> Optional[ProviderHealth]:
+        """Lazily builds providers of the fallback chain; None if the name is unknown"""
+        with self._health_lock:
+            if name not in self._health:
+                try:
+                    provider = self.provider if name == self.provider_name else self._init_provider(name)
+                except ValueError as e:
+                    print(f"DEBUG: Skipping fallback provider: {e}")
+                    self._health[name] = None
+                    return None
+                cfg = self.settings.failover_config
+                self._health[name] = ProviderHealth(
+                    provider,
+                    failure_threshold=int(cfg.get("failure_threshold", 3)),
+                    reset_timeout=float(cfg.get("reset_timeout", 60)),
+                    health_ttl=float(cfg.get("health_ttl", 30))
+                )
+            return self._health[name]
+
+    def _candidates(self, trial: bool = True) -> Iterator[Tuple[str, ProviderHealth]]:
+        """
+        Providers in fallback order whose breaker admits a request and health
+        probe passes. Lazy: a provider is only probed (or handed its half-open
+        trial) once every provider before it has failed.
+        """
+        for name in self.fallback_chain:
+            health = self._get_health(name)
+            if health is not None and health.allows_request(trial):
+                yield name, health
+
     def generate(self, prompt: str, **kwargs) -> AIResponse:
-        return self.provider.generate(prompt, **kwargs)
+        """Generates with the first healthy provider, failing over along fallback_order"""
+        errors = []
+        for name, health in self._candidates():
+            try:
+                response = health.provider.generate(prompt, **kwargs)
+            except Exception as e:
+                health.record_failure()
+                errors.append(f"{name}: {e}")
+                continue
+            health.record_success()
+            return response
+        raise RuntimeError(f"No healthy provider in {self.fallback_chain}. Errors: {'; '.join(errors) or 'all unavailable'}")
 
-    def run_validated_prompt(self, template_path: str, variables: Dict[str, Any]) -> Tuple[AIResponse, ValidationResult]:
-        """Loads prompt, fills variables (including liquidity), generates response, and validates it"""
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yields response chunks as soon as the provider emits them.
+        
+        Fails over only until the first chunk is out; a stream that breaks
+        midway raises, since the caller has already consumed partial output.
+        """
+        errors = []
+        for name, health in self._candidates():
+            started = False
+            try:
+                for chunk in health.provider.generate_stream(prompt, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                health.record_failure()
+                if started:
+                    raise
+                errors.append(f"{name}: {e}")
+                continue
+            health.record_success()
+            return
+        raise RuntimeError(f"No healthy provider in {self.fallback_chain}. Errors: {'; '.join(errors) or 'all unavailable'}")
+
+    def is_available(self) -> bool:
+        """True if at least one provider of the fallback chain can take requests"""
+        return any(True for _ in self._candidates(trial=False))
+
+    def default_concurrency(self) -> int:
+        """generation.concurrency from config.yaml, else the server's OLLAMA_NUM_PARALLEL, else 4"""
+        configured = self.settings.generation_config.get("concurrency")
+        if configured:
+            return int(configured)
+        return int(os.environ.get("OLLAMA_NUM_PARALLEL") or 4)
+
+    async def agenerate_many(self, prompts: List[str], concurrency: Optional[int] = None, **kwargs) -> List[BatchResult]:
+        """Async form of generate_many for callers already inside an event loop"""
+        concurrency = concurrency or self.default_concurrency()
+        adapter = AsyncProviderAdapter(self, max_workers=concurrency)
+        try:
+            return await adapter.agenerate_many(prompts, concurrency=concurrency, **kwargs)
+        finally:
+            adapter.close()
+
+    def generate_many(self, prompts: List[str], concurrency: Optional[int] = None, **kwargs) -> List[BatchResult]:
+        """
+        Generates a batch of prompts concurrently (with failover per prompt).
+        Returns one BatchResult per prompt, in input order.
+        """
+        return asyncio.run(self.agenerate_many(prompts, concurrency=concurrency, **kwargs))
+
+    def provider_status(self) -> Dict[str, str]:
+        """Circuit breaker state per provider of the fallback chain"""
+        status = {}
+        for name in self.fallback_chain:
+            health = self._get_health(name)
+            status[name] = health.state if health else "unknown"
+        return status
+
+    def connection_stats(self) -> Dict[str, int]:
+        """HTTP connection reuse counters for the active provider"""
+        return self.provider.connection_stats()
+
+    def run_validated_prompt(self, template_path: str, variables: Dict[str, Any], bypass_cache: bool = False,
+                             **kwargs) -> Tuple[AIResponse, ValidationResult]:
+        """Loads prompt, fills variables (including liquidity), generates response, and validates it.
+        
+        Responses are served from the on-disk cache when the same formatted prompt,
+        provider, model and options were generated before; `bypass_cache` forces a
+        fresh generation (which then refreshes the cache entry).
+        """
         
         # Inject Liquidity Calculations
         if "goal_amount" in variables:
@@ -55,39 +195,33 @@ class UniversalAI:
                 "liq_public_note": self.liquidity.get_public_context(variables["goal_amount"])
             })
 
-        with open(template_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split template from config
-        parts = content.split("### Validation Configuration")
-        template = parts[0].strip()
-        
-        # Extract instructions section only for prompt
-        # We assume the section starts with '### Instructions'
-        instructions_parts = template.split("### Instructions")
-        if len(instructions_parts) > 1:
-            prompt_text = instructions_parts[-1].strip()
-        else:
-            prompt_text = template # Fallback
-            
-        formatted_prompt = prompt_text.format(**variables)
+        compiled = self.prompts.get(template_path)
+        formatted_prompt = compiled.format(variables)
         
-        response = self.generate(formatted_prompt)
-        
-        # Load rules
-        rules = {}
-        if len(parts) > 1:
-            rules = yaml.safe_load(parts[1])
+        response = self._generate_cached(formatted_prompt, bypass_cache, **kwargs)
         
         # Replace variables in rules
-        processed_rules = self._process_rules(rules, variables)
+        processed_rules = compiled.render_rules(variables)
         
         validation = self.validator.validate(response, processed_rules)
         return response, validation
 
-    def _process_rules(self, rules: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
-        """Replaces {var} in rules with actual values"""
-        rules_str = yaml.dump(rules)
-        for k, v in variables.items():
-            rules_str = rules_str.replace(f"{{{k}}}", str(v))
-        return yaml.safe_load(rules_str)
+    def _generate_cached(self, prompt: str, bypass_cache: bool = False, **kwargs) -> AIResponse:
+        if self.cache is None:
+            return self.generate(prompt, **kwargs)
+        
+        options = {k: v for k, v in kwargs.items() if k != "model"}
+        model = kwargs.get("model", self.provider.default_model)
+        key = self.cache.make_key(prompt, self.provider_name, model, options)
+        
+        if not bypass_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = self.generate(prompt, **kwargs)
+        # Only cache what the primary provider produced, so a failover answer
+        # never masquerades as the primary model's output on reruns
+        if response.provider == self.provider_name:
+            self.cache.put(key, response)
+        return response
@@ -0,0 +1,135 @@
+"""
+Runs a batch of items over a pool of workers (browser tabs, sessions...)
+fed from one shared queue, with a shared start-rate limit and a per-item
+checkpoint journal so an interrupted batch resumes without redoing work.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+class RateLimiter:
+    """Spaces `wait()` returns at least `interval` seconds apart, across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, stop: Optional[threading.Event] = None):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+
+class BatchJournal:
+    """
+    Append-only JSONL log of item status changes. Every record is flushed and
+    fsynced before `record` returns, so a crash loses at most the item in
+    flight; `replay` folds the log back into {key: latest fields}.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, key: str, status: str, **fields):
+        entry = {"key": key, "status": status, "at": time.time(), **fields}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a+b") as f:
+                if f.tell() and not self._ends_with_newline(f):
+                    line = "\n" + line  # Close a torn line from a crash so this record stays whole
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _ends_with_newline(f) -> bool:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        state: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash mid-write
+                key = entry.pop("key")
+                entry.pop("at", None)
+                state.setdefault(key, {}).update(entry)
+        return state
+
+    def clear(self):
+        """Drop the log once its state has been folded into the batch file."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+def run_pool(items: Iterable[Any], open_worker: Callable[[int], Any], process: Callable[[Any, Any], Any],
+             workers: int = 2, min_interval: float = 0.0,
+             on_result: Optional[Callable[[Any, Any], None]] = None,
+             close_worker: Optional[Callable[[Any], None]] = None,
+             stop: Optional[threading.Event] = None) -> List[Tuple[Any, Any]]:
+    """
+    Processes `items` on `workers` threads, each owning the resource returned
+    by open_worker(index) (None means that worker could not start). Item starts
+    are rate-limited across all workers. An exception from `process` becomes
+    that item's result. on_result(item, result) runs under a lock; setting
+    `stop` lets the in-flight items finish and leaves the rest queued.
+    Returns [(item, result), ...] in completion order.
+    """
+    pending: "queue.Queue[Any]" = queue.Queue()
+    for item in items:
+        pending.put(item)
+    stop = stop or threading.Event()
+    limiter = RateLimiter(min_interval)
+    results: List[Tuple[Any, Any]] = []
+    lock = threading.Lock()
+
+    def worker(index: int):
+        resource = open_worker(index)
+        if resource is None:
+            print(f"DEBUG: Worker {index} could not start")
+            return
+        try:
+            while not stop.is_set():
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    return
+                limiter.wait(stop)
+                if stop.is_set():
+                    return
+                try:
+                    result = process(resource, item)
+                except Exception as e:
+                    result = e
+                with lock:
+                    results.append((item, result))
+                    if on_result:
+                        on_result(item, result)
+        finally:
+            if close_worker:
+                close_worker(resource)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"batch-worker-{i}", daemon=True)
+               for i in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,596 @@
+"""
+Chrome DevTools Protocol Client
+One asyncio client per browser: a reader task routes every response to the
+future of the request that sent it and every event to its subscribers, so
+commands can be pipelined and several tabs share a single connection
+(flattened Target sessions).
+
+Scripts that are not async use CDPBrowser / CDPPage, which run the same
+client on a background event loop and expose blocking calls.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import requests
+
+CDP_URL = "http://127.0.0.1:9222"
+
+EventCallback = Callable[[Dict[str, Any]], Any]
+
+class CDPError(RuntimeError):
+    """Error reply to a CDP command, or a JavaScript exception from Runtime.evaluate"""
+
+    def __init__(self, method: str, error: Dict[str, Any]):
+        self.method = method
+        self.error = error
+        super().__init__(f"{method}: {error.get('message') or error.get('text') or error}")
+
+class CDPDisconnected(ConnectionError):
+    """The browser connection closed while commands were still waiting"""
+
+def _json_base(url: str) -> str:
+    # Accepts the legacy ".../json" endpoint the scripts used as well as the bare host
+    url = url.rstrip("/")
+    return url[:-len("/json")] if url.endswith("/json") else url
+
+def list_targets(cdp_url: str = CDP_URL) -> List[Dict[str, Any]]:
+    """HTTP /json target list (id, type, url, title, webSocketDebuggerUrl)"""
+    return requests.get(f"{_json_base(cdp_url)}/json", timeout=10).json()
+
+# Resolves with the value of CONDITION once it is truthy, re-checking on every DOM
+# mutation instead of polling; resolves null after TIMEOUT_MS
+WAIT_UNTIL_JS = """
+new Promise(resolve => {
+    const check = () => { try { return (CONDITION); } catch (e) { return null; } };
+    const first = check();
+    if (first) { resolve(first); return; }
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        const value = check();
+        if (value) { observer.disconnect(); clearTimeout(timer); resolve(value); }
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(() => { observer.disconnect(); resolve(check() || null); }, TIMEOUT_MS);
+})
+"""
+
+# Text entry (CDPTab.fill). SELECTOR / TEXT are JSON literals.
+# Focuses the field, selects its content (so typing replaces it) and returns
+# the value it held, or null when no element matches
+FOCUS_FIELD_JS = """
+(() => {
+    const el = document.querySelector(SELECTOR);
+    if (!el) return null;
+    const previous = el.isContentEditable ? el.innerText : (el.value || "");
+    if (FORCE_EDITABLE) el.removeAttribute('readonly');
+    el.scrollIntoView({block: 'center'});
+    el.focus();
+    if (CLEAR) {
+        if (el.isContentEditable) {
+            const range = document.createRange();
+            range.selectNodeContents(el);
+            const selection = window.getSelection();
+            selection.removeAllRanges();
+            selection.addRange(range);
+        } else if (el.select) {
+            el.select();
+        }
+    }
+    return previous;
+})()
+"""
+FIELD_VALUE_JS = """
+(() => {
+    const el = document.querySelector(SELECTOR);
+    return el ? (el.isContentEditable ? el.innerText : el.value) : null;
+})()
+"""
+# Fallback for fields that ignore synthetic typing: set the value through the
+# prototype's native setter (bypassing framework wrappers) and announce it
+# with the events Angular / Material form controls listen to
+SET_FIELD_JS = """
+(() => {
+    const el = document.querySelector(SELECTOR);
+    if (!el) return false;
+    if (el.isContentEditable) {
+        el.innerText = TEXT;
+    } else {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, TEXT);
+    }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return true;
+})()
+"""
+
+def _same_text(actual: Optional[str], expected: str) -> bool:
+    """Field contents match, ignoring whitespace reflow (rich-text editors wrap lines in paragraphs)"""
+    return actual is not None and " ".join(actual.split()) == " ".join(expected.split())
+
+class _Subscription:
+    __slots__ = ("event", "callback", "session_id")
+
+    def __init__(self, event: str, callback: EventCallback, session_id: Optional[str]):
+        self.event = event
+        self.callback = callback
+        self.session_id = session_id
+
+class CDPClient:
+    """
+    Asyncio CDP connection to the browser endpoint.
+
+    The websocket itself is websocket-client's blocking socket: the reader
+    task waits for frames on a dedicated thread, while writes (small, local)
+    go out immediately from the loop in the order commands were issued.
+    """
+
+    def __init__(self, ws, loop: asyncio.AbstractEventLoop):
+        self._ws = ws
+        self._loop = loop
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._methods: Dict[int, str] = {}
+        self._subscriptions: Dict[str, List[_Subscription]] = {}
+        self._send_lock = threading.Lock()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdp-reader")
+        self._closed = False
+        self._reader = loop.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, cdp_url: str = CDP_URL, timeout: float = 10) -> "CDPClient":
+        """Connect to the browser-level websocket advertised by /json/version"""
+        import websocket
+
+        loop = asyncio.get_running_loop()
+        base = _json_base(cdp_url)
+
+        def open_socket():
+            info = requests.get(f"{base}/json/version", timeout=timeout).json()
+            url = info["webSocketDebuggerUrl"].replace("localhost", "127.0.0.1")
+            # suppress_origin: recent Chrome rejects unknown Origin headers on the debugger socket
+            ws = websocket.create_connection(url, timeout=timeout, suppress_origin=True)
+            ws.settimeout(None)
+            return ws
+
+        return cls(await loop.run_in_executor(None, open_socket), loop)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                raw = await self._loop.run_in_executor(self._io, self._ws.recv)
+                if not raw:
+                    break
+                self._dispatch(json.loads(raw))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not self._closed:
+                print(f"DEBUG: CDP connection lost: {e}")
+        finally:
+            self._fail_pending(CDPDisconnected("Browser connection closed"))
+
+    def _dispatch(self, message: Dict[str, Any]):
+        msg_id = message.get("id")
+        if msg_id is not None:
+            future = self._pending.pop(msg_id, None)
+            method = self._methods.pop(msg_id, "?")
+            if future is None or future.done():
+                return
+            if "error" in message:
+                future.set_exception(CDPError(method, message["error"]))
+            else:
+                future.set_result(message.get("result", {}))
+            return
+
+        event = message.get("method")
+        session_id = message.get("sessionId")
+        params = message.get("params", {})
+        for sub in list(self._subscriptions.get(event, ())) + list(self._subscriptions.get("*", ())):
+            if sub.session_id is not None and sub.session_id != session_id:
+                continue
+            try:
+                result = sub.callback(dict(params, _event=event) if sub.event == "*" else params)
+                if asyncio.iscoroutine(result):
+                    self._loop.create_task(result)
+            except Exception as e:
+                print(f"DEBUG: CDP event handler for {event} failed: {e}")
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        self._methods.clear()
+
+    def _write(self, payload: str):
+        with self._send_lock:
+            self._ws.send(payload)
+
+    def send_nowait(self, method: str, params: Optional[Dict[str, Any]] = None,
+                    session_id: Optional[str] = None) -> asyncio.Future:
+        """Queue a command and return the future of its result (await it, or don't)"""
+        if self._closed:
+            raise CDPDisconnected("Client is closed")
+        msg_id = next(self._ids)
+        message: Dict[str, Any] = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = self._loop.create_future()
+        # A fire-and-forget command must not log "exception never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[msg_id] = future
+        self._methods[msg_id] = method
+        self._write(json.dumps(message))
+        return future
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        """Send one command and wait for its own response; other traffic is routed meanwhile"""
+        future = self.send_nowait(method, params, session_id)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"{method} got no response within {timeout}s") from None
+
+    def on(self, event: str, callback: EventCallback, session_id: Optional[str] = None) -> Callable[[], None]:
+        """Subscribe to an event ("*" for all); returns an unsubscribe function"""
+        sub = _Subscription(event, callback, session_id)
+        self._subscriptions.setdefault(event, []).append(sub)
+
+        def unsubscribe():
+            subs = self._subscriptions.get(event, [])
+            if sub in subs:
+                subs.remove(sub)
+        return unsubscribe
+
+    async def wait_for(self, event: str, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                       session_id: Optional[str] = None, timeout: Optional[float] = 30) -> Dict[str, Any]:
+        """Params of the next `event` matching `predicate`"""
+        future = self._loop.create_future()
+
+        def check(params):
+            if not future.done() and (predicate is None or predicate(params)):
+                future.set_result(params)
+
+        unsubscribe = self.on(event, check, session_id)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            unsubscribe()
+
+    async def targets(self, type_: Optional[str] = "page") -> List[Dict[str, Any]]:
+        infos = (await self.send("Target.getTargets"))["targetInfos"]
+        return [t for t in infos if type_ is None or t.get("type") == type_]
+
+    async def attach(self, target_id: str) -> "CDPTab":
+        result = await self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        return CDPTab(self, result["sessionId"], target_id)
+
+    async def new_tab(self, url: str = "about:blank") -> "CDPTab":
+        result = await self.send("Target.createTarget", {"url": url})
+        return await self.attach(result["targetId"])
+
+    async def find_tab(self, match: Callable[[Dict[str, Any]], bool]) -> Optional["CDPTab"]:
+        """Attach to the first page target whose info (url, title, ...) satisfies `match`"""
+        for info in await self.targets():
+            if match(info):
+                return await self.attach(info["targetId"])
+        return None
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._reader.cancel()
+        await self._loop.run_in_executor(None, self._ws.close)
+        self._fail_pending(CDPDisconnected("Client is closed"))
+        self._io.shutdown(wait=False)
+
+class CDPTab:
+    """One attached page; every call carries the tab's flattened session id"""
+
+    def __init__(self, client: CDPClient, session_id: str, target_id: str):
+        self.client = client
+        self.session_id = session_id
+        self.target_id = target_id
+
+    def send_nowait(self, method: str, params: Optional[Dict[str, Any]] = None) -> asyncio.Future:
+        return self.client.send_nowait(method, params, self.session_id)
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = 60) -> Dict[str, Any]:
+        return await self.client.send(method, params, self.session_id, timeout)
+
+    def on(self, event: str, callback: EventCallback) -> Callable[[], None]:
+        return self.client.on(event, callback, self.session_id)
+
+    async def wait_for(self, event: str, predicate=None, timeout: Optional[float] = 30) -> Dict[str, Any]:
+        return await self.client.wait_for(event, predicate, self.session_id, timeout)
+
+    async def enable(self, *domains: str):
+        """Enable several domains in one round trip"""
+        await asyncio.gather(*(self.send(f"{domain}.enable") for domain in domains))
+
+    async def evaluate(self, expression: str, await_promise: bool = True, timeout: Optional[float] = 60) -> Any:
+        """Value of a JavaScript expression; raises CDPError on a JS exception"""
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        }, timeout=timeout)
+        if "exceptionDetails" in result:
+            raise CDPError("Runtime.evaluate", result["exceptionDetails"])
+        return result.get("result", {}).get("value")
+
+    async def navigate(self, url: str, wait: bool = True, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        """Page.navigate; with `wait`, returns once the new document fired its load event"""
+        if not wait:
+            return await self.send("Page.navigate", {"url": url}, timeout=timeout)
+        await self.send("Page.enable")
+        loaded = asyncio.ensure_future(self.wait_for("Page.loadEventFired", timeout=timeout))
+        try:
+            result = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+            await loaded
+            return result
+        finally:
+            loaded.cancel()
+
+    async def reload(self, timeout: Optional[float] = 60):
+        """Page.reload, returning once the reloaded document fired its load event"""
+        await self.send("Page.enable")
+        loaded = asyncio.ensure_future(self.wait_for("Page.loadEventFired", timeout=timeout))
+        try:
+            await self.send("Page.reload", timeout=timeout)
+            await loaded
+        finally:
+            loaded.cancel()
+
+    async def wait_until(self, condition: str, timeout: float = 30) -> Any:
+        """
+        Value of the JavaScript expression `condition` as soon as it is truthy
+        (checked on every DOM mutation), or None after `timeout` seconds.
+        A navigation during the wait re-arms the observer in the new document.
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return None
+            expression = WAIT_UNTIL_JS.replace("CONDITION", condition).replace("TIMEOUT_MS", str(int(remaining * 1000)))
+            try:
+                return await self.evaluate(expression, await_promise=True, timeout=remaining + 5)
+            except CDPError as e:
+                # "Execution context was destroyed" / "Cannot find context": the page navigated
+                if "context" not in str(e).lower():
+                    raise
+                await asyncio.sleep(0.1)
+
+    async def insert_text(self, text: str):
+        """Type `text` into the focused element: one Input.insertText, real input events"""
+        await self.send("Input.insertText", {"text": text})
+
+    async def fill(self, selector: str, text: str, clear: bool = True,
+                   force_editable: bool = False) -> Optional[str]:
+        """
+        Enter `text` into the input, textarea or contenteditable matching
+        `selector` (replacing its content unless `clear` is False) and check
+        the field holds it afterwards. Tries Input.insertText first, then the
+        native value setter. Returns the strategy that worked ("insertText" or
+        "setter"), or None when the field is missing or rejected both.
+        `force_editable` drops a readonly attribute first; only for fields the
+        page locks until some other interaction (e.g. a custom URL).
+        """
+        fill_js = lambda js: js.replace("SELECTOR", json.dumps(selector))
+        focus_js = (fill_js(FOCUS_FIELD_JS).replace("FORCE_EDITABLE", "true" if force_editable else "false")
+                    .replace("CLEAR", "true" if clear else "false"))
+        previous = await self.evaluate(focus_js, await_promise=False)
+        if previous is None:
+            return None
+        expected = text if clear else previous + text
+        await self.insert_text(text)
+        if _same_text(await self.evaluate(fill_js(FIELD_VALUE_JS), await_promise=False), expected):
+            return "insertText"
+        await self.evaluate(fill_js(SET_FIELD_JS).replace("TEXT", json.dumps(expected)), await_promise=False)
+        if _same_text(await self.evaluate(fill_js(FIELD_VALUE_JS), await_promise=False), expected):
+            return "setter"
+        return None
+
+    async def watch_requests(self, match: Callable[[Dict[str, Any]], bool]) -> "RequestWatch":
+        """Start recording requests matching `match` (given the Network.requestWillBeSent request)"""
+        await self.send("Network.enable")
+        return RequestWatch(self, match)
+
+    async def query_selector(self, selector: str) -> Optional[int]:
+        """nodeId of the first element matching `selector`, or None"""
+        root = await self.send("DOM.getDocument")
+        node = await self.send("DOM.querySelector", {"nodeId": root["root"]["nodeId"], "selector": selector})
+        return node.get("nodeId") or None
+
+    async def set_file_input(self, selector: str, files: List[str]) -> bool:
+        node_id = await self.query_selector(selector)
+        if not node_id:
+            return False
+        await self.send("DOM.setFileInputFiles", {"files": files, "nodeId": node_id})
+        return True
+
+    async def close(self):
+        await self.client.send("Target.closeTarget", {"targetId": self.target_id})
+
+class RequestWatch:
+    """
+    Network requests of one tab matching a predicate, from the moment the
+    watch was armed; `wait` returns when the first of them has finished
+    loading (Network.loadingFinished / loadingFailed).
+    """
+
+    def __init__(self, tab: CDPTab, match: Callable[[Dict[str, Any]], bool]):
+        self.requests: Dict[str, Dict[str, Any]] = {}
+        self._match = match
+        self._done = asyncio.get_running_loop().create_future()
+        self._unsubscribe = [
+            tab.on("Network.requestWillBeSent", self._on_request),
+            tab.on("Network.responseReceived", self._on_response),
+            tab.on("Network.loadingFinished", lambda p: self._on_finished(p, failed=False)),
+            tab.on("Network.loadingFailed", lambda p: self._on_finished(p, failed=True)),
+        ]
+
+    def _on_request(self, params):
+        request = params.get("request", {})
+        if self._match(request):
+            self.requests[params["requestId"]] = {
+                "url": request.get("url"), "method": request.get("method"),
+                "started": params.get("timestamp"), "status": None,
+            }
+
+    def _on_response(self, params):
+        entry = self.requests.get(params.get("requestId"))
+        if entry is not None:
+            entry["status"] = params.get("response", {}).get("status")
+
+    def _on_finished(self, params, failed: bool):
+        entry = self.requests.get(params.get("requestId"))
+        if entry is None or self._done.done():
+            return
+        entry["failed"] = failed
+        entry["duration"] = (params.get("timestamp") or 0) - (entry["started"] or 0)
+        self._done.set_result(entry)
+
+    async def wait(self, timeout: Optional[float] = 30) -> Optional[Dict[str, Any]]:
+        """The first matching request once finished (url, method, status, failed, duration), or None"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._done), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.close()
+
+    def close(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+class CDPBrowser:
+    """
+    Blocking facade over CDPClient for synchronous scripts: the client lives
+    on a private event loop thread and every call waits for its own result.
+    """
+
+    def __init__(self, cdp_url: str = CDP_URL):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="cdp-loop", daemon=True)
+        self._thread.start()
+        try:
+            self.client: CDPClient = self.run(CDPClient.connect(cdp_url))
+        except Exception:
+            self._stop()
+            raise
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def pages(self) -> List[Dict[str, Any]]:
+        return self.run(self.client.targets())
+
+    def page(self, match: Optional[Callable[[Dict[str, Any]], bool]] = None,
+             open_url: Optional[str] = None) -> Optional["CDPPage"]:
+        """Attach to the first page matching `match`; open `open_url` in a new tab when none does"""
+        tab = self.run(self.client.find_tab(match or (lambda info: True)))
+        if tab is None and open_url:
+            tab = self.run(self.client.new_tab(open_url))
+        return CDPPage(self, tab) if tab else None
+
+    def new_page(self, url: str = "about:blank") -> "CDPPage":
+        return CDPPage(self, self.run(self.client.new_tab(url)))
+
+    def _stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    def close(self):
+        try:
+            self.run(self.client.close(), timeout=10)
+        finally:
+            self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CDPPage:
+    """Blocking view of one CDPTab"""
+
+    def __init__(self, browser: CDPBrowser, tab: CDPTab):
+        self.browser = browser
+        self.tab = tab
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        return self.browser.run(self.tab.send(method, params, timeout))
+
+    def send_nowait(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Pipeline a command without waiting for its reply; order with later calls is kept"""
+        self.browser.loop.call_soon_threadsafe(self.tab.send_nowait, method, params)
+
+    def evaluate(self, expression: str, await_promise: bool = True, timeout: Optional[float] = 60) -> Any:
+        return self.browser.run(self.tab.evaluate(expression, await_promise, timeout))
+
+    def evaluate_many(self, expressions: List[str], await_promise: bool = True,
+                      timeout: Optional[float] = 60) -> List[Any]:
+        """Values of several expressions; all are sent before the first reply is awaited"""
+        async def pipelined():
+            return await asyncio.gather(*(self.tab.evaluate(e, await_promise, timeout) for e in expressions))
+        return self.browser.run(pipelined())
+
+    def enable(self, *domains: str):
+        self.browser.run(self.tab.enable(*domains))
+
+    def navigate(self, url: str, wait: bool = True, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        return self.browser.run(self.tab.navigate(url, wait, timeout))
+
+    def wait_for(self, event: str, predicate=None, timeout: Optional[float] = 30) -> Dict[str, Any]:
+        return self.browser.run(self.tab.wait_for(event, predicate, timeout))
+
+    def reload(self, timeout: Optional[float] = 60):
+        self.browser.run(self.tab.reload(timeout))
+
+    def wait_until(self, condition: str, timeout: float = 30) -> Any:
+        return self.browser.run(self.tab.wait_until(condition, timeout))
+
+    def insert_text(self, text: str):
+        self.browser.run(self.tab.insert_text(text))
+
+    def fill(self, selector: str, text: str, clear: bool = True, force_editable: bool = False) -> Optional[str]:
+        return self.browser.run(self.tab.fill(selector, text, clear, force_editable))
+
+    def watch_requests(self, match: Callable[[Dict[str, Any]], bool]) -> "BlockingRequestWatch":
+        return BlockingRequestWatch(self.browser, self.browser.run(self.tab.watch_requests(match)))
+
+    def on(self, event: str, callback: EventCallback) -> Callable[[], None]:
+        """`callback` runs on the client's loop thread"""
+        return self.tab.on(event, callback)
+
+    def set_file_input(self, selector: str, files: List[str]) -> bool:
+        return self.browser.run(self.tab.set_file_input(selector, files))
+
+    def close(self):
+        self.browser.run(self.tab.close())
+
+class BlockingRequestWatch:
+    """Blocking view of a RequestWatch"""
+
+    def __init__(self, browser: CDPBrowser, watch: RequestWatch):
+        self.browser = browser
+        self.watch = watch
+
+    def wait(self, timeout: Optional[float] = 30) -> Optional[Dict[str, Any]]:
+        return self.browser.run(self.watch.wait(timeout))
+
+    def close(self):
+        self.browser.loop.call_soon_threadsafe(self.watch.close)
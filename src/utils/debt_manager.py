@@ -1,9 +1,10 @@
-import csv
 import os
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Deque, Dict, List, Optional
 from pathlib import Path
 from .currency_converter import CurrencyConverter
+from .donation_store import PRIMARY_CSV, DonationStore
 
 class HistoricalDonation:
     def __init__(self, timestamp: datetime, amount: float, currency: str, shareholder: str, status: str = "unsatisfied"):
@@ -22,70 +23,70 @@ class DebtManager:
     """
     Manages historical debt based on CSV datasets.
     Priority is strictly based on donation timestamp (FIFO).
+
+    Resolution only ever eats the oldest open debts, so every donation before
+    `_head` is resolved and every one from it onwards is open. The head
+    cursor plus running totals (overall and per shareholder) make
+    resolve_debt and the summary queries cost O(debts touched).
     """
     
-    def __init__(self, dataset_path: str):
+    def __init__(self, dataset_path: str, store: Optional[DonationStore] = None):
         self.dataset_path = dataset_path
+        self.store = store
         self.donations: List[HistoricalDonation] = []
         self._load_dataset()
+        self._build_index()
 
     def _load_dataset(self):
         if not os.path.exists(self.dataset_path):
             print(f"DEBUG: Dataset path does not exist: {self.dataset_path}")
             return
 
-        with open(self.dataset_path, mode='r', encoding='utf-8') as f:
-            # Check for Byte Order Mark (BOM) which can happen in Excel-saved CSVs
-            first_char = f.read(1)
-            if first_char != '\ufeff':
-                f.seek(0)
-                
-            reader = csv.DictReader(f)
-            # Log fieldnames for debugging
-            # print(f"DEBUG: CSV Fieldnames found: {reader.fieldnames}")
-            
-            for row in reader:
-                if row.get('Type', '').lower() != 'donation':
-                    continue
-                
-                try:
-                    # Stripping quotes if they weren't handled by DictReader
-                    date_val = row['Created At'].strip('" ')
-                    amount_val = row['Amount'].strip('" ')
-                    
-                    ts = datetime.strptime(date_val, "%d/%m/%Y, %H:%M:%S")
-                    amount = float(amount_val)
-                    
-                    self.donations.append(HistoricalDonation(
-                        timestamp=ts,
-                        amount=amount,
-                        currency=row['Currency'],
-                        shareholder=row['Description']
-                    ))
-                except Exception as e:
-                    # print(f"DEBUG: Failed to parse row: {row}. Error: {e}")
-                    continue
-        
-        # Sort by timestamp (Oldest first for resolution priority)
-        self.donations.sort(key=lambda x: x.timestamp)
-        # print(f"DEBUG: Loaded {len(self.donations)} donations.")
+        # The CSV is ingested into the shared donation fact store (only new rows after the first load)
+        if self.store is None:
+            self.store = DonationStore()
+        self.store.ingest(self.dataset_path, PRIMARY_CSV)
+
+        # Facts come back oldest first (resolution priority); undated rows cannot be queued
+        for fact in self.store.donations(source=self.dataset_path):
+            if fact.donated_at is None:
+                continue
+            self.donations.append(HistoricalDonation(
+                timestamp=fact.donated_at,
+                amount=fact.amount,
+                currency=fact.currency,
+                shareholder=fact.shareholder
+            ))
+
+    def _build_index(self):
+        """Head cursor and running totals over the (timestamp-sorted) donations"""
+        self._head = 0
+        self._total_open = 0.0
+        self._open_by_shareholder: Dict[str, float] = {}
+        # Queue positions of each shareholder's open donations, oldest first
+        self._open_positions: Dict[str, Deque[int]] = {}
+        for i, d in enumerate(self.donations):
+            if d.status == "resolved":
+                continue
+            self._total_open += d.remaining_amount
+            self._open_by_shareholder[d.shareholder] = self._open_by_shareholder.get(d.shareholder, 0.0) + d.remaining_amount
+            self._open_positions.setdefault(d.shareholder, deque()).append(i)
+        while self._head < len(self.donations) and self.donations[self._head].status == "resolved":
+            self._head += 1
 
     def get_total_unsatisfied_debt(self) -> float:
         """Sum of all remaining amounts in EUR"""
-        return sum(d.remaining_amount for d in self.donations if d.status != "resolved")
+        return self._total_open
 
     def get_debts_by_shareholder(self) -> Dict[str, float]:
         """Aggregates total debt per shareholder (campaign description)"""
-        shares = {}
-        for d in self.donations:
-            if d.status == "resolved":
-                continue
-            shares[d.shareholder] = shares.get(d.shareholder, 0.0) + d.remaining_amount
-        return shares
+        # Ordered by each shareholder's oldest open donation, like a FIFO scan
+        order = sorted(self._open_positions, key=lambda name: self._open_positions[name][0])
+        return {name: self._open_by_shareholder[name] for name in order}
 
     def get_priority_queue(self) -> List[HistoricalDonation]:
         """Returns unsatisfied donations sorted by timestamp (FIFO)"""
-        return [d for d in self.donations if d.status != "resolved"]
+        return self.donations[self._head:]
 
     def resolve_debt(self, amount: float) -> List[Dict[str, Any]]:
         """
@@ -95,16 +96,25 @@ class DebtManager:
         resolutions = []
         remaining_to_resolve = amount
         
-        for d in self.get_priority_queue():
+        while self._head < len(self.donations):
             if remaining_to_resolve <= 0:
                 break
+            d = self.donations[self._head]
                 
             applied = min(remaining_to_resolve, d.remaining_amount)
             d.remaining_amount -= applied
             remaining_to_resolve -= applied
+            self._total_open -= applied
+            self._open_by_shareholder[d.shareholder] -= applied
             
             if d.remaining_amount <= 0:
                 d.status = "resolved"
+                self._head += 1
+                positions = self._open_positions[d.shareholder]
+                positions.popleft()
+                if not positions:
+                    del self._open_positions[d.shareholder]
+                    del self._open_by_shareholder[d.shareholder]
             else:
                 d.status = "partially_resolved"
                 
@@ -114,5 +124,8 @@ class DebtManager:
                 "timestamp": d.timestamp.isoformat(),
                 "status": d.status
             })
+
+        if not self._head < len(self.donations):
+            self._total_open = 0.0  # No float residue once everything is paid
             
         return resolutions
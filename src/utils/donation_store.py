@@ -0,0 +1,430 @@
+"""
+Donation Fact Store
+One SQLite table of donation facts fed by every donation source we have:
+the primary Chuffed CSV export, scraped Chuffed reports, LaunchGood CSVs,
+Atomic wallet logs and the donation sheet of the ODS workbooks.
+
+Each source file is ingested once per version: unchanged files (same
+SHA-256) are skipped, append-only CSVs whose previously ingested prefix is
+unchanged only insert the new rows past their row watermark, anything
+else replaces that file's facts.
+"""
+
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .currency_converter import CurrencyConverter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PATH = os.path.join(ROOT_DIR, "data", "cache", "donations.sqlite")
+
+# Source kinds
+PRIMARY_CSV = "primary_csv"
+CHUFFED_REPORT = "chuffed_report"
+LAUNCHGOOD = "launchgood"
+ATOMIC = "atomic"
+WORKBOOK = "workbook"
+
+# Kinds whose files only ever grow by appended rows
+APPEND_ONLY = {PRIMARY_CSV, LAUNCHGOOD, ATOMIC}
+
+BAD_REPORT_TITLES = {"View donation data", "Unknown", "Reports - Per Campaign", "Analytics", ""}
+
+class DonationFact(NamedTuple):
+    source: str                       # Absolute path of the file the fact came from
+    kind: str                         # One of the source kinds above
+    source_row: int                   # 0-based data row (or donation index) inside the source
+    platform: str                     # chuffed | launchgood | atomic
+    campaign: Optional[str]           # Campaign title when the source names it
+    campaign_id: Optional[str]
+    shareholder: Optional[str]        # Who the money is owed to (campaign description for Chuffed)
+    donated_at: Optional[datetime]
+    amount: float                     # In `currency`
+    currency: str
+    amount_eur: Optional[float]       # None when no EUR rate is known (e.g. USDT)
+    fx_fee_eur: float
+    direction: str                    # 'in' or 'out'
+    reference: Optional[str]          # Transaction id / donor comment
+    counterparty: Optional[str]       # Donor or wallet address
+
+FACT_COLUMNS = ", ".join(DonationFact._fields)
+
+def _to_eur(amount: float, currency: str) -> Tuple[float, float]:
+    return CurrencyConverter.convert_to_eur(amount, currency), CurrencyConverter.get_fee(amount, currency)
+
+def _fact(source, kind, row, platform, amount, currency, **fields) -> DonationFact:
+    amount_eur, fee = fields.pop("eur", None) or _to_eur(amount, currency)
+    values = dict(campaign=None, campaign_id=None, shareholder=None, donated_at=None,
+                  direction="in", reference=None, counterparty=None)
+    values.update(fields)
+    return DonationFact(source, kind, row, platform, amount=amount, currency=currency,
+                        amount_eur=amount_eur, fx_fee_eur=fee, **values)
+
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if content.startswith('\ufeff'):
+        content = content[1:]
+    return list(csv.DictReader(io.StringIO(content)))
+
+def parse_primary_csv(path: str) -> Tuple[List[DonationFact], int]:
+    """primary_campaign_dataset.csv: Created At, Type, Currency, Amount, Description"""
+    rows = _read_csv(path)
+    facts = []
+    for i, row in enumerate(rows):
+        if (row.get('Type') or '').lower() != 'donation':
+            continue
+        try:
+            amount = float(row['Amount'].strip('" '))
+        except (KeyError, ValueError, AttributeError):
+            continue
+        # Campaign totals count every donation; only debt FIFO needs the date
+        try:
+            ts = datetime.strptime(row['Created At'].strip('" '), "%d/%m/%Y, %H:%M:%S")
+        except (KeyError, ValueError, AttributeError):
+            ts = None
+        description = (row.get('Description') or '').strip()
+        facts.append(_fact(path, PRIMARY_CSV, i, "chuffed", amount, row.get('Currency') or 'EUR',
+                           campaign=description, shareholder=row.get('Description'), donated_at=ts,
+                           reference=row.get('Payment Method')))
+    return facts, len(rows)
+
+def parse_chuffed_report(path: str) -> Tuple[List[DonationFact], int]:
+    """data/reports/chuffed/<id>.json (scraped donations) or <id>.csv (dashboard export)"""
+    from .normalize_campaigns import parse_currency_string
+
+    filename = os.path.basename(path)
+    facts = []
+    if filename.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        title = (data.get("title") or "").strip()
+        campaign_id = str(data.get("campaign_id") or filename.split(".")[0])
+        donations = data.get("donations", [])
+        for i, d in enumerate(donations):
+            amount_str = str(d.get("Amount") or d.get("amount") or d.get("raw") or "0")
+            amount_eur = parse_currency_string(amount_str)
+            facts.append(_fact(path, CHUFFED_REPORT, i, "chuffed", amount_eur, "EUR", eur=(amount_eur, 0.0),
+                               campaign=None if title in BAD_REPORT_TITLES else title,
+                               campaign_id=campaign_id, counterparty=d.get("name") or d.get("Name")))
+        return facts, len(donations)
+
+    campaign_id = filename.replace(".csv", "")
+    rows = _read_csv(path)
+    for i, row in enumerate(rows):
+        amount_val = row.get("Amount") or row.get("amount") or row.get("Total") or row.get("Total Raised") or 0
+        currency = row.get("Currency") or row.get("currency") or row.get("Symbol") or "EUR"
+        if isinstance(amount_val, str):
+            amount_eur = parse_currency_string(amount_val)
+            facts.append(_fact(path, CHUFFED_REPORT, i, "chuffed", amount_eur, "EUR", eur=(amount_eur, 0.0),
+                               campaign_id=campaign_id))
+        else:
+            facts.append(_fact(path, CHUFFED_REPORT, i, "chuffed", float(amount_val), currency,
+                               campaign_id=campaign_id))
+    return facts, len(rows)
+
+def parse_launchgood_csv(path: str) -> Tuple[List[DonationFact], int]:
+    """data/reports/launchgood/*.csv: Amount, Currency, Comment (attributed later by name)"""
+    rows = _read_csv(path)
+    facts = []
+    for i, row in enumerate(rows):
+        try:
+            amount = float(row.get('Amount', 0))
+        except (TypeError, ValueError):
+            continue
+        facts.append(_fact(path, LAUNCHGOOD, i, "launchgood", amount, row.get('Currency', 'EUR'),
+                           reference=row.get('Comment', '')))
+    return facts, len(rows)
+
+def parse_atomic_date(date_str: str) -> Optional[datetime]:
+    """'24 January 2026 at 22:58:43 WET' -> datetime (timezone suffix dropped)"""
+    try:
+        parts = date_str.strip().split(' ')
+        return datetime.strptime(f"{parts[0]} {parts[1]} {parts[2]} {parts[4]}", '%d %B %Y %H:%M:%S')
+    except (IndexError, ValueError):
+        return None
+
+def parse_atomic_log(path: str) -> Tuple[List[DonationFact], int]:
+    """Atomic wallet history export: one fact per IN and per OUT leg"""
+    rows = _read_csv(path)
+    facts = []
+    for i, row in enumerate(rows):
+        ts = parse_atomic_date(row.get('DATE', ''))
+        if not ts:
+            continue
+        # Two legs per row at most: keep source_row unique per (row, leg)
+        for leg, (direction, amount_key, currency_key, ref_key) in enumerate(
+                (("in", "INAMOUNT", "INCURRENCY", "INTXID"), ("out", "OUTAMOUNT", "OUTCURRENCY", "ORDERID"))):
+            amount = row.get(amount_key)
+            if not amount or amount == '-':
+                continue
+            try:
+                value = float(amount)
+            except ValueError:
+                continue
+            facts.append(_fact(path, ATOMIC, i * 2 + leg, "atomic", value, row.get(currency_key) or "",
+                               eur=(None, 0.0), donated_at=ts, direction=direction,
+                               reference=row.get(ref_key), counterparty=row.get('ADDRESSTO')))
+    return facts, len(rows) * 2
+
+def _header_columns(header: Dict[str, str], wanted: Dict[str, Tuple[str, ...]]) -> Dict[str, Optional[str]]:
+    by_name = {}
+    for col, name in header.items():
+        by_name.setdefault(str(name).strip().lower(), col)
+    return {key: next((by_name[n] for n in names if n in by_name), None) for key, names in wanted.items()}
+
+WORKBOOK_COLUMNS = {
+    "campaign": ("campaign title",),
+    "amount": ("donation", "amount"),
+    "currency": ("currency",),
+    "date": ("date (utc)", "date"),
+    "reference": ("ref donation", "stripe payment id"),
+    "first": ("first name",),
+    "last": ("last name",),
+}
+
+def parse_workbook(path: str, sheet: str = "MAIN", workbooks=None) -> Tuple[List[DonationFact], int]:
+    """Chuffed donation export pasted into a workbook sheet (header row 1)"""
+    from .workbook_cache import WorkbookCache
+
+    rows = (workbooks or WorkbookCache()).read_sheet(path, sheet)
+    if 1 not in rows:
+        return [], 0
+    cols = _header_columns(rows[1].values(), WORKBOOK_COLUMNS)
+    facts = []
+    for index in sorted(rows):
+        if index == 1:
+            continue
+        values = rows[index].values()
+        try:
+            amount = float(values.get(cols["amount"], ""))
+        except (TypeError, ValueError):
+            continue
+        donated_at = None
+        raw_date = values.get(cols["date"]) if cols["date"] else None
+        if raw_date:
+            try:
+                donated_at = datetime.fromisoformat(str(raw_date).rstrip("Z"))
+            except ValueError:
+                pass
+        donor = " ".join(filter(None, (values.get(cols["first"]), values.get(cols["last"])))) or None
+        campaign = values.get(cols["campaign"]) if cols["campaign"] else None
+        facts.append(_fact(path, WORKBOOK, index, "chuffed", amount, (values.get(cols["currency"]) or "EUR").upper(),
+                           campaign=campaign, shareholder=campaign, donated_at=donated_at,
+                           reference=values.get(cols["reference"]), counterparty=donor))
+    return facts, max(rows)
+
+PARSERS: Dict[str, Callable[[str], Tuple[List[DonationFact], int]]] = {
+    PRIMARY_CSV: parse_primary_csv,
+    CHUFFED_REPORT: parse_chuffed_report,
+    LAUNCHGOOD: parse_launchgood_csv,
+    ATOMIC: parse_atomic_log,
+    WORKBOOK: parse_workbook,
+}
+
+def default_sources(root: str = ROOT_DIR) -> List[Tuple[str, str]]:
+    """(kind, path) of every donation source present under the project root"""
+    sources = []
+    primary = os.path.join(root, "primary_campaign_dataset.csv")
+    if os.path.exists(primary):
+        sources.append((PRIMARY_CSV, primary))
+    reports = os.path.join(root, "data", "reports")
+    sources += [(CHUFFED_REPORT, p) for p in sorted(glob.glob(os.path.join(reports, "chuffed", "*.json"))
+                                                  + glob.glob(os.path.join(reports, "chuffed", "*.csv")))]
+    sources += [(LAUNCHGOOD, p) for p in sorted(glob.glob(os.path.join(reports, "launchgood", "*.csv")))]
+    sources += [(ATOMIC, p) for p in sorted(glob.glob(os.path.join(root, "data", "atomic_wallet_log", "*.csv")))]
+    total = os.path.join(root, "GGF", "Total.ods")
+    if os.path.exists(total):
+        sources.append((WORKBOOK, total))
+    return sources
+
+class DonationStore:
+    """
+    SQLite fact table of donations from every platform, indexed by
+    campaign, shareholder, date and platform.
+
+    `ingest(path, kind)` brings one source file up to date; `sync()` does it
+    for everything `default_sources()` finds. Queries return DonationFact
+    tuples or EUR totals and never touch the source files.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " path TEXT PRIMARY KEY, kind TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " hash TEXT NOT NULL, watermark INTEGER NOT NULL, ingested_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS donations ("
+            " source TEXT NOT NULL, kind TEXT NOT NULL, source_row INTEGER NOT NULL, platform TEXT NOT NULL,"
+            " campaign TEXT, campaign_id TEXT, shareholder TEXT, donated_at TEXT,"
+            " amount REAL NOT NULL, currency TEXT NOT NULL, amount_eur REAL, fx_fee_eur REAL NOT NULL,"
+            " direction TEXT NOT NULL, reference TEXT, counterparty TEXT,"
+            " PRIMARY KEY (source, source_row));"
+            "CREATE INDEX IF NOT EXISTS donations_campaign ON donations (campaign, donated_at);"
+            "CREATE INDEX IF NOT EXISTS donations_campaign_id ON donations (campaign_id);"
+            "CREATE INDEX IF NOT EXISTS donations_shareholder ON donations (shareholder, donated_at);"
+            "CREATE INDEX IF NOT EXISTS donations_date ON donations (donated_at);"
+            "CREATE INDEX IF NOT EXISTS donations_platform ON donations (platform, kind, donated_at);"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _digest(path: str, limit: Optional[int] = None) -> str:
+        """SHA-256 of the file, or of its first `limit` bytes"""
+        digest = hashlib.sha256()
+        remaining = limit if limit is not None else float("inf")
+        with open(path, "rb") as f:
+            while remaining > 0:
+                chunk = f.read(int(min(1 << 20, remaining)))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return digest.hexdigest()
+
+    def ingest(self, path: str, kind: str, parser: Optional[Callable] = None) -> int:
+        """Bring the facts of one source file up to date; returns the number of rows inserted"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT size, mtime_ns, hash, watermark FROM sources WHERE path = ?", (path,)).fetchone()
+        if state and state[0] == stat.st_size and state[1] == stat.st_mtime_ns:
+            return 0
+        file_hash = self._digest(path)
+        if state and state[2] == file_hash:
+            self._record(path, kind, stat, file_hash, state[3])
+            return 0
+
+        # Append-only sources keep their facts when the bytes ingested last time are untouched
+        start = 0
+        if state and kind in APPEND_ONLY and stat.st_size > state[0] and self._digest(path, state[0]) == state[2]:
+            start = state[3]
+
+        facts, watermark = (parser or PARSERS[kind])(path)
+        new = [f for f in facts if f.source_row >= start]
+        print(f"DEBUG: Ingesting {len(new)} donation rows from {os.path.basename(path)} "
+              f"({'append' if start else 'full'})")
+        with self._lock:
+            if not start:
+                self._conn.execute("DELETE FROM donations WHERE source = ?", (path,))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO donations ({FACT_COLUMNS}) VALUES ({', '.join('?' * len(DonationFact._fields))})",
+                [f._replace(source=path, donated_at=f.donated_at.isoformat() if f.donated_at else None) for f in new])
+            self._conn.commit()
+        self._record(path, kind, stat, file_hash, watermark)
+        return len(new)
+
+    def _record(self, path, kind, stat, file_hash, watermark):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (path, kind, size, mtime_ns, hash, watermark, ingested_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, kind, stat.st_size, stat.st_mtime_ns, file_hash, watermark, time.time()))
+            self._conn.commit()
+
+    def sync(self, sources: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+        """Ingest every (kind, path) in `sources` (default: all known sources); drop vanished files"""
+        sources = list(default_sources() if sources is None else sources)
+        inserted = sum(self.ingest(path, kind) for kind, path in sources)
+        self.prune()
+        return inserted
+
+    def prune(self) -> int:
+        """Remove the facts of source files that no longer exist"""
+        with self._lock:
+            gone = [p for (p,) in self._conn.execute("SELECT path FROM sources") if not os.path.exists(p)]
+            for path in gone:
+                self._conn.execute("DELETE FROM donations WHERE source = ?", (path,))
+                self._conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+            self._conn.commit()
+        return len(gone)
+
+    @staticmethod
+    def _where(filters: Dict[str, object], start: Optional[datetime], end: Optional[datetime]) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("donated_at >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("donated_at < ?")
+            params.append(end.isoformat())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def donations(self, campaign: Optional[str] = None, shareholder: Optional[str] = None,
+                  platform: Optional[str] = None, kind=None, source: Optional[str] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  direction: Optional[str] = None, currency: Optional[str] = None) -> List[DonationFact]:
+        """Facts matching every given filter, oldest first; `end` is exclusive, `kind` may be a list"""
+        where, params = self._where(
+            {"campaign": campaign, "shareholder": shareholder, "platform": platform, "kind": kind,
+             "source": os.path.abspath(source) if source else None, "direction": direction,
+             "currency": currency}, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {FACT_COLUMNS} FROM donations{where} ORDER BY donated_at, source, source_row",
+                params).fetchall()
+        return [DonationFact(*r[:7], datetime.fromisoformat(r[7]) if r[7] else None, *r[8:]) for r in rows]
+
+    def totals(self, by: str = "campaign", platform: Optional[str] = None, kind=None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, float]:
+        """Sum of amount_eur grouped by campaign, campaign_id, shareholder or platform"""
+        if by not in ("campaign", "campaign_id", "shareholder", "platform"):
+            raise ValueError(f"Cannot group donations by {by!r}")
+        where, params = self._where({"platform": platform, "kind": kind, "direction": "in"}, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {by}, SUM(amount_eur) FROM donations{where} GROUP BY {by}", params).fetchall()
+        return {key: total for key, total in rows if total is not None}
+
+    def campaign_totals(self, kind, source=None) -> List[Tuple[Optional[str], Optional[str], float, int]]:
+        """
+        (campaign, campaign_id, total_eur, donation_count) per campaign of the
+        given source kind(s), optionally only from the given source file(s)
+        """
+        if isinstance(source, str):
+            source = os.path.abspath(source)
+        elif source is not None:
+            source = [os.path.abspath(s) for s in source]
+        where, params = self._where({"kind": kind, "source": source, "direction": "in"}, None, None)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT campaign, campaign_id, SUM(amount_eur), COUNT(*) FROM donations{where}"
+                " GROUP BY campaign, campaign_id", params).fetchall()
+
+    def source_state(self, paths: Optional[Iterable[str]] = None) -> Dict[str, Tuple[str, int]]:
+        """(hash, watermark) of every ingested source file, or of the given ones"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, hash, watermark FROM sources").fetchall()
+        wanted = None if paths is None else {os.path.abspath(p) for p in paths}
+        return {path: (file_hash, watermark) for path, file_hash, watermark in rows
+                if wanted is None or path in wanted}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM donations")
+            self._conn.execute("DELETE FROM sources")
+            self._conn.commit()
@@ -0,0 +1,216 @@
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PATH = os.path.join(ROOT_DIR, "data", "cache", "media.sqlite")
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif')
+SAMPLE_SIZE = (64, 64)
+# Minimum qr_score for an image to count as a QR code / payment card rather than a photo
+QR_THRESHOLD = 0.8
+QR_NAME = re.compile(r"qr|code", re.IGNORECASE)
+WORD = re.compile(r"[a-z0-9]+")
+
+class MediaItem(NamedTuple):
+    path: str                         # Absolute path
+    root: str                         # Catalogued root the file was found under
+    folder: str                       # Folder relative to root ('' for files directly in it)
+    size: int
+    width: Optional[int]
+    height: Optional[int]
+    phash: Optional[str]              # 64-bit difference hash, hex
+    qr_score: float                   # 0..1, see qr_likelihood
+
+def media_tokens(text: str) -> List[str]:
+    """
+    Lookup words of a folder/file name or query: lowercase, accents folded,
+    split on anything non-alphanumeric, single letters dropped. Digit runs of
+    9+ digits are phone-number IDs and keep their last 9 digits, so
+    '+972599197456' and '0599197456' are the same token.
+    """
+    text = "".join(c for c in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(c))
+    tokens = []
+    for word in WORD.findall(text):
+        if word.isdigit() and len(word) >= 9:
+            word = word[-9:]
+        if len(word) > 1 and word not in tokens:
+            tokens.append(word)
+    return tokens
+
+def dhash(gray: Image.Image, size: int = 8) -> str:
+    """Difference hash: brighter-than-right-neighbour bits of a (size+1)x size thumbnail"""
+    pixels = np.asarray(gray.resize((size + 1, size), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = (pixels[:, :-1] > pixels[:, 1:]).flatten()
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):0{size * size // 4}x}"
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+def qr_likelihood(name: str, gray: Image.Image, width: int, height: int) -> float:
+    """
+    How much an image looks like a QR code rather than a photo: QR codes are
+    square, almost only pure black and white pixels, roughly half dark.
+    A 'qr' / 'code' file name is taken at its word.
+    """
+    if QR_NAME.search(name):
+        return 1.0
+    # Nearest-neighbour keeps module edges crisp; interpolation would grey them
+    pixels = np.asarray(gray.resize(SAMPLE_SIZE, Image.Resampling.NEAREST))
+    extreme = np.count_nonzero((pixels < 48) | (pixels > 207)) / pixels.size
+    dark = np.count_nonzero(pixels < 128) / pixels.size
+    squareness = min(width, height) / max(width, height) if width and height else 0.0
+    balance = 1.0 if 0.15 <= dark <= 0.85 else 0.5
+    return round(float(extreme * squareness * balance), 3)
+
+def analyze_image(path: str) -> Tuple[Optional[int], Optional[int], Optional[str], float]:
+    """(width, height, phash, qr_score); Nones and a name-only QR guess for unreadable files"""
+    name = os.path.basename(path)
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            # JPEGs decode straight at 1/2..1/8 scale: a 12MP photo is never fully decoded
+            img.draft("L", SAMPLE_SIZE)
+            gray = img.convert("L")
+            return width, height, dhash(gray), qr_likelihood(name, gray, width, height)
+    except Exception as e:
+        print(f"DEBUG: Could not read image {path}: {e}")
+        return None, None, None, 1.0 if QR_NAME.search(name) else 0.0
+
+class MediaCatalog:
+    """
+    Persistent (SQLite) catalog of campaign images: path, size, dimensions,
+    perceptual hash, QR-likelihood and the lookup tokens of its folder path and
+    file name. `sync(root)` walks a media tree once and only re-reads images
+    whose (size, mtime) changed; lookups by name token or beneficiary ID are
+    then indexed queries instead of directory walks.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " path TEXT PRIMARY KEY, root TEXT NOT NULL, folder TEXT NOT NULL, size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, width INTEGER, height INTEGER, phash TEXT, qr_score REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS media_root ON media (root, folder);"
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " token TEXT NOT NULL, path TEXT NOT NULL, PRIMARY KEY (token, path)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS tokens_path ON tokens (path);"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def iter_images(root: str) -> Iterator[str]:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != "thumbs"]
+            for name in filenames:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(dirpath, name)
+
+    def sync(self, root: str) -> Dict[str, int]:
+        """Bring the catalog of `root` up to date; returns added/updated/removed/unchanged counts"""
+        root = os.path.abspath(root)
+        with self._lock:
+            known = {path: (size, mtime_ns) for path, size, mtime_ns in self._conn.execute(
+                "SELECT path, size, mtime_ns FROM media WHERE root = ?", (root,))}
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = set()
+        for path in self.iter_images(root):
+            path = os.path.abspath(path)
+            seen.add(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            counts["updated" if path in known else "added"] += 1
+            self._store(root, path, stat)
+
+        gone = [path for path in known if path not in seen]
+        if gone:
+            with self._lock:
+                for path in gone:
+                    self._conn.execute("DELETE FROM media WHERE path = ?", (path,))
+                    self._conn.execute("DELETE FROM tokens WHERE path = ?", (path,))
+                self._conn.commit()
+            counts["removed"] = len(gone)
+        if counts["added"] or counts["updated"] or counts["removed"]:
+            print(f"DEBUG: Media catalog {root}: {counts}")
+        return counts
+
+    def _store(self, root: str, path: str, stat: os.stat_result):
+        folder = os.path.relpath(os.path.dirname(path), root)
+        folder = "" if folder == "." else folder
+        width, height, phash, qr_score = analyze_image(path)
+        tokens = media_tokens(f"{folder} {os.path.splitext(os.path.basename(path))[0]}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, root, folder, stat.st_size, stat.st_mtime_ns, width, height, phash, qr_score))
+            self._conn.execute("DELETE FROM tokens WHERE path = ?", (path,))
+            self._conn.executemany("INSERT INTO tokens VALUES (?, ?)", [(t, path) for t in tokens])
+            self._conn.commit()
+
+    def find(self, query: str, root: Optional[str] = None, min_size: int = 0,
+             max_qr: Optional[float] = QR_THRESHOLD) -> List[MediaItem]:
+        """
+        Images whose folder path or file name contains every token of `query`
+        (a beneficiary name, phone number or ID), largest picture first.
+        QR-like images are left out unless `max_qr` is None.
+        """
+        tokens = media_tokens(query)
+        if not tokens:
+            return []
+        sql = ("SELECT m.path, m.root, m.folder, m.size, m.width, m.height, m.phash, m.qr_score FROM media m"
+               " WHERE m.path IN (SELECT path FROM tokens WHERE token IN ({})"
+               " GROUP BY path HAVING COUNT(*) = ?) AND m.size >= ?").format(", ".join("?" * len(tokens)))
+        params: list = [*tokens, len(tokens), min_size]
+        if root is not None:
+            sql += " AND m.root = ?"
+            params.append(os.path.abspath(root))
+        if max_qr is not None:
+            sql += " AND m.qr_score < ?"
+            params.append(max_qr)
+        sql += " ORDER BY COALESCE(m.width * m.height, 0) DESC, m.size DESC, m.path"
+        with self._lock:
+            return [MediaItem(*row) for row in self._conn.execute(sql, params)]
+
+    def items(self, root: Optional[str] = None) -> List[MediaItem]:
+        sql = "SELECT path, root, folder, size, width, height, phash, qr_score FROM media"
+        params: list = []
+        if root is not None:
+            sql += " WHERE root = ?"
+            params.append(os.path.abspath(root))
+        with self._lock:
+            return [MediaItem(*row) for row in self._conn.execute(sql + " ORDER BY path", params)]
+
+    def folders(self, root: str) -> Dict[str, List[MediaItem]]:
+        """Images of `root` grouped by top-level folder"""
+        grouped: Dict[str, List[MediaItem]] = {}
+        for item in self.items(root):
+            grouped.setdefault(item.folder.split(os.sep)[0], []).append(item)
+        return grouped
+
+    def duplicates(self, phash: str, max_distance: int = 5, root: Optional[str] = None) -> List[MediaItem]:
+        """Catalogued images within `max_distance` bits of a perceptual hash (re-used photos)"""
+        return [item for item in self.items(root) if item.phash and hamming(item.phash, phash) <= max_distance]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM media")
+            self._conn.execute("DELETE FROM tokens")
+            self._conn.commit()
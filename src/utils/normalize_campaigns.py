@@ -3,15 +3,24 @@ Campaign Data Normalizer
 Consolidates Chuffed and Whydonate campaigns into a unified database.
 """
 
+import hashlib
 import json
 import os
-import csv
+import re
+import tempfile
 from datetime import datetime
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import Optional, Dict, List
 
 from .currency_converter import CurrencyConverter
+from .donation_store import CHUFFED_REPORT, PRIMARY_CSV, DonationStore, default_sources
 
 DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UNIFIED_PATH = os.path.join(DATA_DIR, "data", "campaigns_unified.json")
+# Which campaign ids the last run added, changed or removed (for downstream scripts)
+CHANGES_PATH = os.path.join(DATA_DIR, "data", "campaigns_unified.changes.json")
+# Source fingerprints and normalized campaigns keyed by input hash, for incremental runs
+STATE_PATH = os.path.join(DATA_DIR, "data", "cache", "consolidate_state.json")
 
 
 def load_chuffed() -> list[dict]:
@@ -38,6 +47,39 @@ def load_whydonate() -> list[dict]:
     return []
 
 
+# Common fundraising stopwords to ignore if they appear as "names"
+NAME_STOPWORDS = frozenset({
+    "HELP", "SUPPORT", "DONATE", "URGENT", "EMERGENCY", "SAVE", "ASSIST", 
+    "EVACUATE", "REBUILD", "ESCAPE", "SURVIVE", "FAMILY", "GAZA", "PALESTINE",
+    "PLEASE", "KINDLY", "FUNDRAISER", "CAMPAIGN", "PROJECT", "THE", "FOR", "TO",
+    "AND", "WITH", "FROM", "OUT", "OF", "IN", "WAR", "GENOCIDE", "FAMILIES", 
+    "NEED", "NEEDS", "YOUR", "MY", "OUR", "CHILDREN", "LIVES", "LIFE",
+    "GAZAS", "PALESTINES", "WARD", "WARDS", "HEART", "HEARTS", "PLEA", "PLEAS"
+})
+
+# Remove common prefixes like "Urgent:" or "Help:"
+TITLE_PREFIX = re.compile(r"^(?:Urgent|Emergency|Please Help|Help|Support)[:\s]+", re.IGNORECASE)
+
+# Name regex: [A-Z][a-zA-Z\-\']+ allows for Al-Masri, O'Neil, etc. Tried in order.
+NAME_PATTERNS = [re.compile(p) for p in (
+    # "Name and/with family/children/wife" context
+    # Matches: "Mohammed and his family", "Fares and family", "The Al-Masri family"
+    r"^([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,3}?)(?:\s+(?:and|with|&)\s+(?:his|her|their|my)?\s*(?:family|children|wife|kids|son|daughter))",
+    
+    # "Help/Support Name to..." context where Help/Support was missed by prefix cleaning
+    r"(?:Help|Support|Evacuate|Save|Assist)\s+([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,3}?)(?:\s+and|\s+family|\s+to|\s+rebuild|\s+escape|\s+survive|$)",
+    
+    # "Name's family" context
+    r"^([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,2}?)['’]s\s+family",
+    
+    # "The X Family" context (appearing anywhere)
+    r"(?:the|The)\s+([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,2}?)\s+[Ff]amily",
+)]
+
+# Punctuation attached to a word
+WORD_PUNCTUATION = re.compile(r"[^\w\.]")
+
+
 def extract_names_from_title(title: str) -> dict:
     """Extract names from campaign title for privacy-aware display.
     
@@ -49,51 +91,37 @@ def extract_names_from_title(title: str) -> dict:
     - display_name: public-safe name (first name + family initial)
     - full_name: complete name as appears in title (private)
     - first_name: extracted first name
+
+    Results are memoized per title; each call returns a fresh dict.
     """
+    return dict(_extract_names(title))
+
+
+def extract_names_many(titles) -> list[dict]:
+    """extract_names_from_title for a batch of titles (repeats are extracted once)."""
+    return [dict(_extract_names(title)) for title in titles]
+
+
+@lru_cache(maxsize=4096)
+def _extract_names(title: str) -> tuple:
     if not title:
-        return {"display_name": "Anonymous", "full_name": None, "first_name": None}
-    
-    import re
-    
-    # Common fundraising stopwords to ignore if they appear as "names"
-    STOPWORDS = {
-        "HELP", "SUPPORT", "DONATE", "URGENT", "EMERGENCY", "SAVE", "ASSIST", 
-        "EVACUATE", "REBUILD", "ESCAPE", "SURVIVE", "FAMILY", "GAZA", "PALESTINE",
-        "PLEASE", "KINDLY", "FUNDRAISER", "CAMPAIGN", "PROJECT", "THE", "FOR", "TO",
-        "AND", "WITH", "FROM", "OUT", "OF", "IN", "WAR", "GENOCIDE", "FAMILIES", 
-        "NEED", "NEEDS", "YOUR", "MY", "OUR", "CHILDREN", "LIVES", "LIFE",
-        "GAZAS", "PALESTINES", "WARD", "WARDS", "HEART", "HEARTS", "PLEA", "PLEAS"
-    }
+        return (("display_name", "Anonymous"), ("full_name", None), ("first_name", None))
+    names = _extract_names_uncached(title)
+    return tuple(names.items())
+
 
+def _extract_names_uncached(title: str) -> dict:
     # Clean up title for processing
-    # Remove common prefixes like "Urgent:" or "Help:"
-    clean_title = re.sub(r"^(?:Urgent|Emergency|Please Help|Help|Support)[:\s]+", "", title, flags=re.IGNORECASE).strip()
+    clean_title = TITLE_PREFIX.sub("", title).strip()
     
     full_name = None
     
-    # Pattern 1: Explicit "X and Y family" structure (most reliable)
-    # Matches: "Mohammed and his family", "Fares and family", "The Al-Masri family"
-    # Name regex: [A-Z][a-zA-Z\-\']+ allows for Al-Masri, O'Neil, etc.
-    patterns = [
-        # "Name and/with family/children/wife" context
-        r"^([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,3}?)(?:\s+(?:and|with|&)\s+(?:his|her|their|my)?\s*(?:family|children|wife|kids|son|daughter))",
-        
-        # "Help/Support Name to..." context where Help/Support was missed by prefix cleaning
-        r"(?:Help|Support|Evacuate|Save|Assist)\s+([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,3}?)(?:\s+and|\s+family|\s+to|\s+rebuild|\s+escape|\s+survive|$)",
-        
-        # "Name's family" context
-        r"^([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,2}?)['’]s\s+family",
-        
-        # "The X Family" context (appearing anywhere)
-        r"(?:the|The)\s+([A-Z][a-zA-Z\-\']+(?:\s+[A-Z][a-zA-Z\-\']+){0,2}?)\s+[Ff]amily",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, clean_title)
+    for pattern in NAME_PATTERNS:
+        match = pattern.search(clean_title)
         if match:
             candidate = match.group(1).strip()
             # Verify candidate isn't just a stopword
-            if candidate.upper() not in STOPWORDS and len(candidate) > 2:
+            if candidate.upper() not in NAME_STOPWORDS and len(candidate) > 2:
                 full_name = candidate
                 break
     
@@ -104,9 +132,9 @@ def extract_names_from_title(title: str) -> dict:
         candidates = []
         for word in words:
             # Check if looks like a name (Capitalized, no numbers, not all caps unless explicitly short like 'AL')
-            clean_word = re.sub(r"[^\w\.]", "", word) # Remove punctuation attached to word
+            clean_word = WORD_PUNCTUATION.sub("", word) # Remove punctuation attached to word
             if (word[0].isupper() and 
-                clean_word.upper() not in STOPWORDS and 
+                clean_word.upper() not in NAME_STOPWORDS and 
                 len(clean_word) > 1):
                 candidates.append(clean_word)
                 if len(candidates) >= 4: # Limit to 4 parts
@@ -131,8 +159,8 @@ def extract_names_from_title(title: str) -> dict:
     name_parts = full_name.split()
     first_name = name_parts[0]
     
-    # Double check extraction didn't grab something like "Gaza Evacuation" if it wasn't caught by STOPWORDS
-    if first_name.upper() in STOPWORDS:
+    # Double check extraction didn't grab something like "Gaza Evacuation" if it wasn't caught by NAME_STOPWORDS
+    if first_name.upper() in NAME_STOPWORDS:
         name_parts = name_parts[1:]
         if not name_parts:
              return {"display_name": "Family", "full_name": None, "first_name": None}
@@ -333,7 +361,7 @@ def aggregate_requests(campaigns: list) -> dict:
     }
 
 
-def load_chuffed_reports() -> Dict[str, float]:
+def load_chuffed_reports(store: Optional[DonationStore] = None) -> Dict[str, float]:
     """
     Loads automated Chuffed reports from data/reports/chuffed/ (*.json or *.csv).
     Returns a mapping of campaign_title -> total_eur.
@@ -341,68 +369,29 @@ def load_chuffed_reports() -> Dict[str, float]:
     reports_dir = os.path.join(DATA_DIR, "data", "reports", "chuffed")
     if not os.path.exists(reports_dir):
         return {}
-        
+
+    store = store or DonationStore()
+    reports = [path for kind, path in default_sources(DATA_DIR) if kind == CHUFFED_REPORT]
+    for path in reports:
+        try:
+            store.ingest(path, CHUFFED_REPORT)
+        except Exception as e:
+            print(f"DEBUG: Failed to parse report {os.path.basename(path)}: {e}")
+
     # We need a mapping of ID -> Title because CSV filenames are IDs
     # and the CSV content might not contain the project title.
+    # Resolved at query time so a refreshed chuffed_campaigns.json applies without re-ingesting.
     chuffed_raw = load_chuffed()
     id_to_title = {str(c.get('id')): c.get('title', '').strip() for c in chuffed_raw}
-    
+
     aggregates = {}
     report_count = 0
-    for filename in os.listdir(reports_dir):
-        path = os.path.join(reports_dir, filename)
-        total_eur = 0.0
-        title = None
-        
-        try:
-            if filename.endswith(".json"):
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                
-                # Robust Title Discovery (handles scraper v1.7 title-less JSON and navigation noise)
-                title = data.get("title", "").strip()
-                campaign_id = str(data.get("campaign_id") or filename.split(".")[0])
-                
-                bad_titles = ["View donation data", "Unknown", "Reports - Per Campaign", "Analytics", ""]
-                if not title or title in bad_titles:
-                    title = id_to_title.get(campaign_id)
-                
-                donations = data.get("donations", [])
-                for d in donations:
-                    # Robust amount retrieval (handles diff scraper versions and field cases)
-                    amount_str = str(d.get("Amount") or d.get("amount") or d.get("raw") or "0")
-                    total_eur += parse_currency_string(amount_str)
-                    report_count += 1
-                    
-            elif filename.endswith(".csv"):
-                campaign_id = filename.replace(".csv", "")
-                title = id_to_title.get(campaign_id)
-                
-                with open(path, "r", encoding="utf-8") as f:
-                    # Chuffed CSVs usually have a BOM and use commas
-                    content = f.read()
-                    if content.startswith('\ufeff'):
-                        content = content[1:]
-                    
-                    import io
-                    reader = csv.DictReader(io.StringIO(content))
-                    for row in reader:
-                        # Resilient header mapping for exported CSVs
-                        amount_val = row.get("Amount") or row.get("amount") or row.get("Total") or row.get("Total Raised") or 0
-                        currency_val = row.get("Currency") or row.get("currency") or row.get("Symbol") or "EUR"
-                        
-                        if isinstance(amount_val, str):
-                            total_eur += parse_currency_string(amount_val)
-                        else:
-                            total_eur += CurrencyConverter.convert_to_eur(float(amount_val), currency_val)
-            
-            if title and total_eur > 0:
-                aggregates[title] = aggregates.get(title, 0.0) + total_eur
-                
-        except Exception as e:
-            print(f"DEBUG: Failed to parse report {filename}: {e}")
-            continue
-            
+    for title, campaign_id, total_eur, count in store.campaign_totals(CHUFFED_REPORT, source=reports):
+        title = title or id_to_title.get(campaign_id)
+        report_count += count
+        if title and total_eur > 0:
+            aggregates[title] = aggregates.get(title, 0.0) + total_eur
+
     print(f"DEBUG: Found and parsed {report_count} granular donation records across reports.")
     return aggregates
 
@@ -432,38 +421,20 @@ def parse_currency_string(amount_str: str) -> float:
         return 0.0
 
 
-def load_primary_donations() -> Dict[str, float]:
+def load_primary_donations(store: Optional[DonationStore] = None) -> Dict[str, float]:
     """
     Loads primary_campaign_dataset.csv and aggregates total raised per campaign in EUR.
     Returns a mapping of campaign description -> total_eur.
     """
     path = os.path.join(DATA_DIR, "primary_campaign_dataset.csv")
+    store = store or DonationStore()
     csv_aggregates = {}
     if os.path.exists(path):
-        with open(path, mode='r', encoding='utf-8') as f:
-            # Check for BOM
-            first_char = f.read(1)
-            if first_char != '\ufeff':
-                f.seek(0)
-                
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('Type', '').lower() != 'donation':
-                    continue
-                
-                try:
-                    desc = row.get('Description', '').strip()
-                    amount_str = row.get('Amount', '0').strip('" ')
-                    amount = float(amount_str)
-                    currency = row.get('Currency', 'EUR')
-                    
-                    amount_eur = CurrencyConverter.convert_to_eur(amount, currency)
-                    csv_aggregates[desc] = csv_aggregates.get(desc, 0.0) + amount_eur
-                except Exception:
-                    continue
-    
+        store.ingest(path, PRIMARY_CSV)
+        csv_aggregates = {title: total for title, _, total, _ in store.campaign_totals(PRIMARY_CSV, source=path)}
+
     # Merge with automated reports
-    report_aggregates = load_chuffed_reports()
+    report_aggregates = load_chuffed_reports(store)
     
     # Combined dictionary (Reports take priority or add up? 
     # Usually they should be distinct or the dashboard report is the source of truth)
@@ -475,11 +446,71 @@ def load_primary_donations() -> Dict[str, float]:
     return combined
 
 
-def consolidate() -> dict:
-    """Consolidate all campaign data."""
+def content_hash(*parts) -> str:
+    """Stable SHA-256 of JSON-serializable values."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def donation_sources() -> List[str]:
+    """Donation files consolidate() reads through the donation store."""
+    paths = [os.path.join(DATA_DIR, "primary_campaign_dataset.csv")]
+    return paths + [path for kind, path in default_sources(DATA_DIR) if kind == CHUFFED_REPORT]
+
+
+def store_fingerprint(store: DonationStore) -> Dict[str, list]:
+    """What the donation store holds for those files: (hash, row watermark) per ingested path."""
+    return {os.path.relpath(path, DATA_DIR): list(state)
+            for path, state in sorted(store.source_state(donation_sources()).items())}
+
+
+def source_fingerprints(store: Optional[DonationStore] = None) -> Dict[str, list]:
+    """
+    (size, mtime) of every file consolidate() reads, keyed by path relative to
+    DATA_DIR, plus the donation store's state under "donation_store": totals
+    come from the store, so a rebuilt or cleared store is a change too.
+    """
+    paths = [
+        os.path.join(DATA_DIR, "data", "chuffed_campaigns.json"),
+        os.path.join(DATA_DIR, "whydonate_campaigns.json"),
+        os.path.join(DATA_DIR, "data", "whydonate_campaigns.json"),
+    ] + donation_sources()
+    fingerprints = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprints[os.path.relpath(path, DATA_DIR)] = [stat.st_size, stat.st_mtime_ns]
+    fingerprints["donation_store"] = store_fingerprint(store or DonationStore())
+    return fingerprints
+
+
+def consolidate(state: Optional[dict] = None, store: Optional[DonationStore] = None) -> dict:
+    """Consolidate all campaign data.
+
+    With a `state` dict (see main), a campaign whose raw record and donation
+    total hash the same as last time reuses its previous normalized entry
+    instead of being normalized again; `state` is updated in place.
+    Donation totals come from `store` (default: the shared DonationStore).
+    """
+    previous = state.get("campaigns", {}) if state is not None else {}
+    current = {}
+    reused = 0
+
+    def normalized(build, *inputs) -> dict:
+        nonlocal reused
+        key = content_hash(*inputs)
+        if key in previous:
+            reused += 1
+            entry = previous[key]
+        else:
+            entry = build()
+        current[key] = entry
+        # Entries are shared with the state cache; hand out copies
+        return json.loads(json.dumps(entry))
+
     chuffed = load_chuffed()
     whydonate = load_whydonate()
-    real_totals = load_primary_donations()
+    real_totals = load_primary_donations(store)
     
     unified = []
     chuffed_matches = 0
@@ -490,13 +521,17 @@ def consolidate() -> dict:
         real_raised = real_totals.get(title, 0.0)
         if real_raised > 0:
             chuffed_matches += 1
-        unified.append(normalize_chuffed(campaign, real_raised))
+        unified.append(normalized(lambda: normalize_chuffed(campaign, real_raised), "chuffed", campaign, real_raised))
         
     print(f"DEBUG: Matched {chuffed_matches} Chuffed campaigns with real donations.")
     
     # Process Whydonate campaigns
     for i, campaign in enumerate(whydonate):
-        unified.append(normalize_whydonate(campaign, i))
+        unified.append(normalized(lambda: normalize_whydonate(campaign, i), "whydonate", campaign, i))
+
+    if state is not None:
+        state["campaigns"] = current
+        print(f"DEBUG: Reused {reused} of {len(unified)} normalized campaigns.")
     
     # Calculate totals
     total_raised = sum(c["raised_eur"] for c in unified)
@@ -517,13 +552,97 @@ def consolidate() -> dict:
     }
 
 
-def main():
+def diff_campaigns(before: Dict[str, str], after: Dict[str, str]) -> dict:
+    """Added / changed / removed campaign ids between two {id: content_hash} maps."""
+    return {
+        "added": sorted(set(after) - set(before)),
+        "changed": sorted(i for i in set(after) & set(before) if after[i] != before[i]),
+        "removed": sorted(set(before) - set(after)),
+    }
+
+
+def write_json_atomic(path: str, data, indent: Optional[int] = 2):
+    """Write JSON to a temp file next to `path`, then rename it over `path`."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _load_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def consolidate_incremental(output_path: str = UNIFIED_PATH, state_path: str = STATE_PATH,
+                            changes_path: str = CHANGES_PATH, full: bool = False,
+                            store: Optional[DonationStore] = None) -> dict:
+    """
+    Rebuild campaigns_unified.json only as far as its inputs changed.
+
+    Returns {"result", "changes", "written"}. `result` is None when every
+    source fingerprint and the output file are exactly as the last run left
+    them. The output is replaced atomically and only when a campaign
+    changed; the changes manifest is written on every run.
+    """
+    state = {} if full else (_load_json(state_path) or {})
+    store = store or DonationStore()
+    fingerprints = source_fingerprints(store)
+    output_stamp = None
+    if os.path.exists(output_path):
+        stat = os.stat(output_path)
+        output_stamp = [stat.st_size, stat.st_mtime_ns]
+
+    no_changes = {"added": [], "changed": [], "removed": []}
+    if not full and state.get("sources") == fingerprints and state.get("output") == output_stamp and output_stamp:
+        print("DEBUG: Campaign sources unchanged; skipping consolidation.")
+        changes = no_changes
+        result, written = None, False
+    else:
+        result = consolidate(state, store)
+        # The run itself ingests changed donation files; record the store as it left it
+        fingerprints["donation_store"] = store_fingerprint(store)
+        entries = {c["id"]: content_hash(c) for c in result["campaigns"]}
+        changes = diff_campaigns(state.get("entries", {}), entries)
+        # Downstream scripts annotate the output file; a run with no delta leaves it alone
+        written = full or output_stamp is None or changes != no_changes or state.get("output") != output_stamp
+        if written:
+            write_json_atomic(output_path, result)
+            stat = os.stat(output_path)
+            output_stamp = [stat.st_size, stat.st_mtime_ns]
+        state.update(sources=fingerprints, entries=entries, output=output_stamp)
+        write_json_atomic(state_path, state, indent=None)
+
+    write_json_atomic(changes_path, {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "output_written": written,
+        **changes,
+    })
+    return {"result": result, "changes": changes, "written": written}
+
+
+def main(full: bool = False):
     """Main entry point."""
-    result = consolidate()
+    outcome = consolidate_incremental(full=full)
+    changes = outcome["changes"]
+    print(f"Changes: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed (manifest: {CHANGES_PATH})")
+    result = outcome["result"]
+    if result is None:
+        print(f"✅ {UNIFIED_PATH} is up to date")
+        return
     
-    output_path = os.path.join(DATA_DIR, "data", "campaigns_unified.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    output_path = UNIFIED_PATH
     
     print(f"✅ Consolidated {result['summary']['total_campaigns']} families")
     print(f"   - Chuffed: {result['summary']['chuffed_campaigns']}")
@@ -533,8 +652,9 @@ def main():
     print(f"   - Open cases: {result['attention']['open_cases']}")
     print(f"   - In progress: {result['attention']['in_progress']}")
     print(f"   - Resolved: {result['attention']['resolved']}")
-    print(f"\n📁 Saved to: {output_path}")
+    print(f"\n📁 Saved to: {output_path}" if outcome["written"] else f"\n📁 No campaign changed; {output_path} left as is")
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(full="--full" in sys.argv)
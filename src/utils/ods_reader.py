@@ -0,0 +1,435 @@
+"""
+Streaming ODS Reader
+Reads spreadsheet rows straight out of an .ods archive (or an extracted
+content.xml) with iterparse, one row at a time, in bounded memory.
+"""
+
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, FrozenSet, Callable, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+NS = {
+    "office": "urn:oasis:names:tc:opendocument:xmlns:office:1.0",
+    "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
+    "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
+    "style": "urn:oasis:names:tc:opendocument:xmlns:style:1.0",
+    "fo": "urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+
+def _q(prefix: str, local: str) -> str:
+    return f"{{{NS[prefix]}}}{local}"
+
+TABLE = _q("table", "table")
+TABLE_COLUMN = _q("table", "table-column")
+TABLE_ROW = _q("table", "table-row")
+TABLE_CELL = _q("table", "table-cell")
+COVERED_CELL = _q("table", "covered-table-cell")
+ANNOTATION = _q("office", "annotation")
+TEXT_P = _q("text", "p")
+TEXT_S = _q("text", "s")
+TEXT_TAB = _q("text", "tab")
+TEXT_LINE_BREAK = _q("text", "line-break")
+DC_CREATOR = _q("dc", "creator")
+DC_DATE = _q("dc", "date")
+OFFICE_BODY = _q("office", "body")
+STYLE_STYLE = _q("style", "style")
+STYLE_DEFAULT = _q("style", "default-style")
+CELL_PROPERTIES = _q("style", "table-cell-properties")
+
+A_NAME = _q("table", "name")
+A_STYLE = _q("table", "style-name")
+A_DEFAULT_CELL_STYLE = _q("table", "default-cell-style-name")
+A_COLS_REPEATED = _q("table", "number-columns-repeated")
+A_ROWS_REPEATED = _q("table", "number-rows-repeated")
+A_VALUE_TYPE = _q("office", "value-type")
+A_TEXT_C = _q("text", "c")
+A_STYLE_NAME = _q("style", "name")
+A_STYLE_FAMILY = _q("style", "family")
+A_STYLE_PARENT = _q("style", "parent-style-name")
+A_BACKGROUND = _q("fo", "background-color")
+# An explicit background-color="transparent": clears the parent's colour, unlike an unset one
+NO_FILL = "transparent"
+
+# office:value-type -> attribute holding the machine value
+VALUE_ATTRS = {
+    "float": _q("office", "value"),
+    "percentage": _q("office", "value"),
+    "currency": _q("office", "value"),
+    "date": _q("office", "date-value"),
+    "time": _q("office", "time-value"),
+    "boolean": _q("office", "boolean-value"),
+}
+NUMERIC_TYPES = {"float", "percentage", "currency"}
+
+SheetFilter = Union[None, str, Iterable[str], Callable[[str], bool]]
+
+def idx_to_col(idx: int) -> str:
+    """0-based column index -> spreadsheet letters (0 -> A, 27 -> AB)"""
+    col = ""
+    while idx >= 0:
+        idx, rem = divmod(idx, 26)
+        col = chr(65 + rem) + col
+        idx -= 1
+    return col
+
+def col_to_idx(col: str) -> int:
+    """Spreadsheet letters -> 0-based column index (AB -> 27)"""
+    idx = 0
+    for char in col.upper():
+        idx = idx * 26 + (ord(char) - 64)
+    return idx - 1
+
+class OdsAnnotation(NamedTuple):
+    author: Optional[str]
+    date: Optional[str]
+    text: str
+
+class OdsCell(NamedTuple):
+    column: int                       # 0-based
+    text: str                         # Displayed text, paragraphs joined by newlines
+    value_type: Optional[str]         # office:value-type (float, date, string, ...)
+    raw_value: Optional[str]          # Machine value attribute as written in the XML
+    style: Optional[str]              # Effective cell style (cell, row or column default)
+    annotation: Optional[OdsAnnotation]
+    covered: bool = False             # Part of a merged range
+
+    @property
+    def col(self) -> str:
+        return idx_to_col(self.column)
+
+    @property
+    def value(self) -> Any:
+        """Typed value: float for numeric cells, bool for booleans, else the raw/text string"""
+        if self.value_type in NUMERIC_TYPES and self.raw_value is not None:
+            try:
+                return float(self.raw_value)
+            except ValueError:
+                return self.raw_value
+        if self.value_type == "boolean":
+            return self.raw_value == "true"
+        if self.raw_value is not None:
+            return self.raw_value
+        return self.text
+
+class OdsRow:
+    """A non-empty spreadsheet row. `index` is 1-based like the sheet UI."""
+    __slots__ = ("sheet", "index", "cells", "styles")
+
+    def __init__(self, sheet: str, index: int, cells: List[OdsCell], styles: Set[str]):
+        self.sheet = sheet
+        self.index = index
+        self.cells = cells
+        # Every style set on a cell of the row, empty cells included; row and
+        # column default-cell-styles are not counted (they only fill OdsCell.style)
+        self.styles = styles
+
+    def get(self, col: Union[int, str]) -> Optional[OdsCell]:
+        column = col_to_idx(col) if isinstance(col, str) else col
+        for cell in self.cells:
+            if cell.column == column:
+                return cell
+        return None
+
+    def values(self) -> Dict[str, str]:
+        """{'A': '...', 'E': '12.5'}: office:value when present, else the text (legacy get_row_values shape)"""
+        out = {}
+        for cell in self.cells:
+            val = cell.raw_value if cell.value_type in NUMERIC_TYPES and cell.raw_value is not None else cell.text
+            if val and val.strip():
+                out[cell.col] = val
+        return out
+
+    def __repr__(self):
+        return f"OdsRow({self.sheet!r}, {self.index}, {self.values()!r})"
+
+def open_part(source: str, part: str = "content.xml") -> IO[bytes]:
+    """
+    Opens an XML part of a workbook. `source` may be an .ods archive, a folder
+    holding an extracted archive, or an extracted content.xml (sibling parts
+    such as styles.xml are then looked up next to it).
+    """
+    if os.path.isdir(source):
+        return open(os.path.join(source, part), "rb")
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        stream = archive.open(part)
+        # Keep the archive alive as long as the member stream
+        stream._archive = archive
+        return stream
+    if part == "content.xml":
+        return open(source, "rb")
+    return open(os.path.join(os.path.dirname(source), part), "rb")
+
+def _text_of(elem: ET.Element) -> str:
+    parts = [elem.text or ""]
+    for child in elem:
+        if child.tag == TEXT_S:
+            parts.append(" " * int(child.get(A_TEXT_C, "1")))
+        elif child.tag == TEXT_TAB:
+            parts.append("\t")
+        elif child.tag == TEXT_LINE_BREAK:
+            parts.append("\n")
+        elif child.tag != ANNOTATION:
+            parts.append(_text_of(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+def _annotation_of(elem: ET.Element) -> OdsAnnotation:
+    author = elem.find(DC_CREATOR)
+    date = elem.find(DC_DATE)
+    paragraphs = [_text_of(p) for p in elem.iter(TEXT_P)]
+    return OdsAnnotation(
+        author=author.text if author is not None else None,
+        date=date.text if date is not None else None,
+        text="\n".join(paragraphs),
+    )
+
+def _sheet_matcher(sheets: SheetFilter) -> Tuple[Callable[[str], bool], Optional[Set[str]]]:
+    """Predicate on sheet names, plus the finite set of names when there is one"""
+    if sheets is None:
+        return (lambda name: True), None
+    if callable(sheets):
+        return sheets, None
+    if isinstance(sheets, str):
+        sheets = [sheets]
+    wanted = set(sheets)
+    return (lambda name: name in wanted), wanted
+
+class _ColumnStyles:
+    """Default cell style per column of the current sheet, run-length encoded"""
+
+    def __init__(self):
+        self.runs: List[tuple] = []   # (first_column, last_column, style)
+        self.next_col = 0
+
+    def add(self, elem: ET.Element):
+        repeat = int(elem.get(A_COLS_REPEATED, "1"))
+        style = elem.get(A_DEFAULT_CELL_STYLE)
+        if style and style != "Default":
+            self.runs.append((self.next_col, self.next_col + repeat - 1, style))
+        self.next_col += repeat
+
+    def style_at(self, column: int) -> Optional[str]:
+        for first, last, style in self.runs:
+            if first <= column <= last:
+                return style
+        return None
+
+def _parse_row(row_elem: ET.Element, sheet: str, index: int, columns: _ColumnStyles, max_columns: Optional[int]) -> Optional[OdsRow]:
+    row_default = row_elem.get(A_DEFAULT_CELL_STYLE)
+    cells: List[OdsCell] = []
+    styles: Set[str] = set()
+    col = 0
+    for cell in row_elem:
+        if cell.tag != TABLE_CELL and cell.tag != COVERED_CELL:
+            continue
+        if max_columns is not None and col >= max_columns:
+            break
+        repeat = int(cell.get(A_COLS_REPEATED, "1"))
+        own_style = cell.get(A_STYLE)
+        if own_style:
+            styles.add(own_style)
+        style = own_style or row_default
+
+        annotation = None
+        paragraphs = []
+        for child in cell:
+            if child.tag == TEXT_P:
+                paragraphs.append(_text_of(child))
+            elif child.tag == ANNOTATION:
+                annotation = _annotation_of(child)
+        text = "\n".join(paragraphs)
+        value_type = cell.get(A_VALUE_TYPE)
+        raw_value = cell.get(VALUE_ATTRS[value_type]) if value_type in VALUE_ATTRS else None
+
+        if text or raw_value is not None or annotation is not None:
+            for i in range(repeat):
+                cells.append(OdsCell(
+                    column=col + i,
+                    text=text,
+                    value_type=value_type,
+                    raw_value=raw_value,
+                    style=style or columns.style_at(col + i),
+                    annotation=annotation,
+                    covered=cell.tag == COVERED_CELL,
+                ))
+        col += repeat
+
+    if not cells:
+        return None
+    return OdsRow(sheet, index, cells, styles)
+
+def iter_rows(source: str, sheets: SheetFilter = None, max_columns: Optional[int] = None) -> Iterator[OdsRow]:
+    """
+    Streams the non-empty rows of a workbook, sheet by sheet.
+
+    `sheets` restricts parsing to some sheets: a name, a list of names or a
+    predicate on the name. Rows of other sheets are skipped without building
+    cells, and parsing stops once every named sheet has been read. Repeated
+    rows are expanded (with consecutive indexes) unless empty; processed
+    elements are detached so memory stays flat on large files.
+    """
+    wants, remaining = _sheet_matcher(sheets)
+    if remaining is not None:
+        remaining = set(remaining)
+    stack: List[ET.Element] = []
+    sheet: Optional[str] = None
+    active = False
+    row_index = 0
+    columns = _ColumnStyles()
+
+    with open_part(source) as stream:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if elem.tag == TABLE:
+                    sheet = elem.get(A_NAME)
+                    active = wants(sheet)
+                    row_index = 0
+                    columns = _ColumnStyles()
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            tag = elem.tag
+            if tag == TABLE_ROW:
+                repeat = int(elem.get(A_ROWS_REPEATED, "1"))
+                if active:
+                    row = _parse_row(elem, sheet, row_index + 1, columns, max_columns)
+                    if row is not None:
+                        yield row
+                        for i in range(1, repeat):
+                            yield OdsRow(sheet, row_index + 1 + i, row.cells, row.styles)
+                row_index += repeat
+                if stack:
+                    stack[-1].remove(elem)
+            elif tag == TABLE_COLUMN:
+                if active:
+                    columns.add(elem)
+            elif tag == TABLE:
+                if remaining is not None:
+                    remaining.discard(sheet)
+                    if not remaining:
+                        return
+                sheet, active = None, False
+                if stack:
+                    stack[-1].remove(elem)
+
+def read_sheets(source: str, sheets: Iterable[str], max_columns: Optional[int] = None) -> Dict[str, Dict[int, OdsRow]]:
+    """Non-empty rows of several sheets in one pass: {sheet: {row_index: row}}"""
+    names = [sheets] if isinstance(sheets, str) else list(sheets)
+    result: Dict[str, Dict[int, OdsRow]] = {name: {} for name in names}
+    for row in iter_rows(source, sheets=names, max_columns=max_columns):
+        result[row.sheet][row.index] = row
+    return result
+
+def read_sheet(source: str, sheet: str, max_columns: Optional[int] = None) -> Dict[int, OdsRow]:
+    """All non-empty rows of one sheet keyed by 1-based row index"""
+    return read_sheets(source, [sheet], max_columns=max_columns)[sheet]
+
+def list_sheets(source: str) -> List[str]:
+    """Sheet names in workbook order (parses tags only, no cell content is built)"""
+    names = []
+    stack: List[ET.Element] = []
+    with open_part(source) as stream:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if elem.tag == TABLE:
+                    names.append(elem.get(A_NAME))
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag in (TABLE_ROW, TABLE) and stack:
+                stack[-1].remove(elem)
+    return names
+
+def find_sheet(names: Iterable[str], term: str) -> Optional[str]:
+    """First sheet name containing `term`, case-insensitively (e.g. 'noor' -> 'Noor ')"""
+    term = term.lower()
+    for name in names:
+        if term in name.lower():
+            return name
+    return None
+
+class StyleTable:
+    """
+    Table-cell styles of a workbook with parent inheritance resolved.
+    Built once per workbook; `select` turns a colour predicate into the set
+    of matching style names so per-row checks are plain set operations.
+    """
+
+    def __init__(self, styles: Dict[str, Tuple[Optional[str], Optional[str]]], default_background: Optional[str] = None):
+        self.styles = styles                  # name -> (parent, own background, NO_FILL or None)
+        self.default_background = default_background
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    def background(self, name: Optional[str]) -> Optional[str]:
+        """Effective background colour ('#rrggbb', lower case) of a cell style"""
+        if name is None:
+            return self.default_background
+        if name not in self._resolved:
+            color, seen, current = None, set(), name
+            while current in self.styles and current not in seen:
+                seen.add(current)
+                parent, own = self.styles[current]
+                if own is not None:
+                    color = own
+                    break
+                current = parent
+            if color is None:
+                color = self.default_background
+            self._resolved[name] = None if color == NO_FILL else color
+        return self._resolved[name]
+
+    def select(self, predicate: Callable[[Optional[str]], bool]) -> FrozenSet[str]:
+        """Names of all styles whose resolved background satisfies `predicate`"""
+        return frozenset(name for name in self.styles if predicate(self.background(name)))
+
+    @staticmethod
+    def flag_rows(rows: Iterable[OdsRow], names: FrozenSet[str]) -> List[bool]:
+        """
+        Per-row column: does any cell of the row (empty ones included) carry
+        one of `names` as its own style. A row-level default-cell-style does
+        not count, as in the regex classification this replaced.
+        """
+        return [not names.isdisjoint(row.styles) for row in rows]
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
+def _collect_styles(stream: IO[bytes], styles: Dict[str, Tuple[Optional[str], Optional[str]]], defaults: List[str]):
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            # Automatic styles precede the body; nothing after it is a style
+            if elem.tag == OFFICE_BODY:
+                return
+            continue
+        if elem.tag == STYLE_STYLE or elem.tag == STYLE_DEFAULT:
+            if elem.get(A_STYLE_FAMILY) != "table-cell":
+                continue
+            props = elem.find(CELL_PROPERTIES)
+            color = props.get(A_BACKGROUND) if props is not None else None
+            color = color.lower() if color else None
+            if elem.tag == STYLE_DEFAULT:
+                if color and color != NO_FILL:
+                    defaults.append(color)
+            else:
+                styles[elem.get(A_STYLE_NAME)] = (elem.get(A_STYLE_PARENT), color)
+            elem.clear()
+
+def read_styles(source: str) -> StyleTable:
+    """
+    Cell styles from styles.xml (named styles such as 'Good') and the
+    automatic styles at the head of content.xml (ce1, ce2, ...). Parsing of
+    content.xml stops at office:body, so this stays cheap on large files.
+    """
+    styles: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    defaults: List[str] = []
+    for part in ("styles.xml", "content.xml"):
+        try:
+            with open_part(source, part) as stream:
+                _collect_styles(stream, styles, defaults)
+        except (FileNotFoundError, KeyError):
+            continue
+    return StyleTable(styles, defaults[0] if defaults else None)
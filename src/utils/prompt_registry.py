@@ -0,0 +1,109 @@
+import os
+import re
+import threading
+import yaml
+from typing import Dict, Any, List, Optional, Union
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+class _RuleString:
+    """A rule string pre-split around its {placeholders}"""
+    __slots__ = ("parts",)
+    
+    def __init__(self, text: str):
+        # Even indexes are literal text, odd indexes are variable names
+        self.parts = PLACEHOLDER.split(text)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        out = []
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                out.append(part)
+            elif part in variables:
+                out.append(str(variables[part]))
+            else:
+                out.append("{" + part + "}")  # Unknown placeholders stay as written
+        return "".join(out)
+
+def _compile_rules(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {k: _compile_rules(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_compile_rules(v) for v in node]
+    if isinstance(node, str) and PLACEHOLDER.search(node):
+        return _RuleString(node)
+    return node
+
+def _render_rules(node: Any, variables: Dict[str, Any]) -> Any:
+    if isinstance(node, _RuleString):
+        return node.render(variables)
+    if isinstance(node, dict):
+        return {k: _render_rules(v, variables) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_render_rules(v, variables) for v in node]
+    return node
+
+class CompiledPrompt:
+    """A prompt template split into its instructions and parsed validation rules"""
+    
+    def __init__(self, path: str, content: str, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        
+        # Split template from config
+        parts = content.split("### Validation Configuration")
+        template = parts[0].strip()
+        
+        # Only the '### Instructions' section is sent to the model
+        instructions_parts = template.split("### Instructions")
+        self.prompt_text = instructions_parts[-1].strip() if len(instructions_parts) > 1 else template
+        
+        rules = yaml.safe_load(parts[1]) if len(parts) > 1 else None
+        self._rules = _compile_rules(rules or {})
+
+    def format(self, variables: Dict[str, Any]) -> str:
+        return self.prompt_text.format(**variables)
+
+    def render_rules(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Validation rules with {var} replaced by the variable values"""
+        return _render_rules(self._rules, variables)
+
+class PromptRegistry:
+    """
+    Loads and compiles prompt templates once; a template is recompiled only
+    when its file's mtime changes.
+    """
+    
+    def __init__(self, root: Optional[str] = "prompts"):
+        self.root = root
+        self._prompts: Dict[str, CompiledPrompt] = {}
+        self._lock = threading.Lock()
+        if root and os.path.isdir(root):
+            self.load_all()
+
+    def load_all(self) -> List[str]:
+        """Compiles every .md template under the root folder"""
+        loaded = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    path = os.path.join(dirpath, filename)
+                    self.get(path)
+                    loaded.append(path)
+        return loaded
+
+    def get(self, template_path: str) -> CompiledPrompt:
+        key = os.path.abspath(template_path)
+        mtime = os.stat(key).st_mtime
+        compiled = self._prompts.get(key)
+        if compiled is not None and compiled.mtime == mtime:
+            return compiled
+        
+        with self._lock:
+            with open(key, 'r', encoding='utf-8') as f:
+                compiled = CompiledPrompt(key, f.read(), mtime)
+            self._prompts[key] = compiled
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self._prompts)
@@ -0,0 +1,207 @@
+"""
+Campaign title index for duplicate detection.
+
+Titles are normalized once when added (lowercase, accents folded, punctuation
+dropped). A lookup then checks, without scanning every known title:
+- exact: same normalized title (dict lookup)
+- prefix: one title is a word-aligned truncation of the other, e.g. a title
+  cut by a platform length limit (sorted list of word suffixes + bisect).
+- contained: one title appears as whole words inside the other, e.g. with
+  "URGENT:" put in front. Prefix and contained hits need the shorter title
+  to have at least MIN_PREFIX_TOKENS words, so "Help Ahmed" does not swallow
+  every longer "Help Ahmed ..." title.
+- near: Jaccard similarity of the titles' distinctive words (campaign
+  boilerplate such as "help", "family", "gaza" removed) above a threshold.
+  Both titles need MIN_NEAR_TOKENS such words: a first name, or a first
+  name and a family name, is shared by too many different campaigns.
+  Candidates come from MinHash LSH buckets and are verified exactly.
+
+Near matches are hints for a human; anything that writes a decision (a URL,
+a status) should only trust a unique exact, prefix or contained match, see
+find_unique.
+"""
+import bisect
+import hashlib
+import random
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.utils.normalize_campaigns import NAME_STOPWORDS
+
+NON_ALNUM = re.compile(r"[^a-z0-9 ]")
+
+# Words every campaign title shares; they say nothing about which campaign it is
+TEMPLATE_WORDS = frozenset(w.lower() for w in NAME_STOPWORDS) | frozenset({
+    "a", "an", "his", "her", "their", "them", "who", "is", "are", "this", "these", "at", "on", "by",
+    "lives", "home", "homes", "after", "all", "everything", "lost", "me", "us", "we", "i",
+})
+
+MIN_PREFIX_TOKENS = 5
+MIN_NEAR_TOKENS = 3
+DEFAULT_THRESHOLD = 0.75
+STRICT_KINDS = ("exact", "prefix", "contained")
+_PRIME = (1 << 61) - 1
+
+def normalize_title(title: Any) -> str:
+    """'Help Al-Masrí & family!' -> 'help almasri family'"""
+    if not title:
+        return ""
+    text = unicodedata.normalize("NFKD", str(title)).lower()  # NFKD also turns NBSP into a space
+    return " ".join(NON_ALNUM.sub("", text).split())
+
+def distinctive_tokens(normalized: str) -> FrozenSet[str]:
+    """Words of a normalized title minus template words (all words if nothing else is left)"""
+    words = normalized.split()
+    distinct = frozenset(w for w in words if w not in TEMPLATE_WORDS)
+    return distinct or frozenset(words)
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+class MinHasher:
+    """Stable MinHash signatures (blake2b token hashes, seeded universal hashing)."""
+
+    def __init__(self, num_perm: int = 16, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [_token_hash(t) for t in tokens]
+        if not hashes:
+            return ()
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.params)
+
+class TitleMatch(NamedTuple):
+    title: str
+    value: Any
+    score: float
+    kind: str  # "exact", "prefix", "contained" or "near"
+
+class _Entry(NamedTuple):
+    title: str
+    normalized: str
+    tokens: FrozenSet[str]
+    value: Any
+
+def _title_of(item: Any) -> str:
+    return item.get("title", "") if isinstance(item, dict) else str(item or "")
+
+class TitleIndex:
+    """
+    Known titles, each with an attached value (usually the campaign dict).
+    Build it once, then query it for every candidate title.
+    """
+
+    def __init__(self, items: Iterable[Any] = (), threshold: float = DEFAULT_THRESHOLD,
+                 title_of: Callable[[Any], str] = _title_of, num_perm: int = 16, bands: int = 8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.title_of = title_of
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._entries: List[_Entry] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._suffixes: List[Tuple[str, int, int]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, title: str) -> bool:
+        return self.find(title) is not None
+
+    def extend(self, items: Iterable[Any]):
+        for item in items:
+            self.add(self.title_of(item), item)
+
+    def add(self, title: str, value: Any = None):
+        normalized = normalize_title(title)
+        if not normalized:
+            return
+        idx = len(self._entries)
+        entry = _Entry(title, normalized, distinctive_tokens(normalized), value)
+        self._entries.append(entry)
+        self._exact.setdefault(normalized, []).append(idx)
+        words = normalized.split()
+        for start in range(max(len(words) - MIN_PREFIX_TOKENS, 0) + 1):
+            bisect.insort(self._suffixes, (" ".join(words[start:]), idx, start))
+        if len(entry.tokens) < MIN_NEAR_TOKENS:
+            return
+        for key in self._band_keys(entry.tokens):
+            self._buckets.setdefault(key, []).append(idx)
+
+    def _band_keys(self, tokens: FrozenSet[str]):
+        # 8 bands of 2 rows: pairs at Jaccard 0.75 share a bucket with p > 0.99
+        signature = self.hasher.signature(tokens)
+        for band in range(self.bands if signature else 0):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _containment_hits(self, normalized: str):
+        """(idx, score, kind) of known titles found as whole words in this one, or containing it"""
+        words = normalized.split()
+        if len(words) < MIN_PREFIX_TOKENS:
+            return
+        # Known titles that contain this one: it starts one of their word suffixes
+        probe = normalized + " "
+        pos = bisect.bisect_left(self._suffixes, (normalized, -1, -1))
+        while pos < len(self._suffixes):
+            suffix, idx, start = self._suffixes[pos]
+            if suffix != normalized and not suffix.startswith(probe):
+                break
+            if start or suffix != normalized:
+                yield idx, len(words) / len(self._entries[idx].normalized.split()), "contained" if start else "prefix"
+            pos += 1
+        # Known titles this one contains, longest first
+        for n in range(len(words) - 1, MIN_PREFIX_TOKENS - 1, -1):
+            for start in range(len(words) - n + 1):
+                for idx in self._exact.get(" ".join(words[start:start + n]), ()):
+                    yield idx, n / len(words), "contained" if start else "prefix"
+
+    def matches(self, title: str, threshold: Optional[float] = None,
+                kinds: Optional[Iterable[str]] = None) -> List[TitleMatch]:
+        """Known titles duplicating `title`, best first; only matches of `kinds` if given"""
+        threshold = self.threshold if threshold is None else threshold
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+        found: Dict[int, Tuple[float, str]] = {}
+        for idx in self._exact.get(normalized, ()):
+            found[idx] = (1.0, "exact")
+        for idx, score, kind in self._containment_hits(normalized):
+            found.setdefault(idx, (score, kind))
+        tokens = distinctive_tokens(normalized)
+        candidates = set()
+        if len(tokens) >= MIN_NEAR_TOKENS:
+            candidates = {idx for key in self._band_keys(tokens) for idx in self._buckets.get(key, ())}
+        for idx in candidates - found.keys():
+            score = jaccard(tokens, self._entries[idx].tokens)
+            if score >= threshold:
+                found[idx] = (score, "near")
+        if kinds is not None:
+            kinds = set(kinds)
+            found = {idx: hit for idx, hit in found.items() if hit[1] in kinds}
+        ranked = sorted(found.items(), key=lambda kv: (kv[1][1] != "exact", -kv[1][0], kv[0]))
+        return [TitleMatch(self._entries[idx].title, self._entries[idx].value, score, kind)
+                for idx, (score, kind) in ranked]
+
+    def find(self, title: str, threshold: Optional[float] = None,
+             kinds: Optional[Iterable[str]] = None) -> Optional[TitleMatch]:
+        """Best duplicate of `title`, or None"""
+        found = self.matches(title, threshold, kinds)
+        return found[0] if found else None
+
+    def find_unique(self, title: str, kinds: Iterable[str] = STRICT_KINDS) -> Optional[TitleMatch]:
+        """The duplicate of `title` when exactly one known title matches (by default not just near)"""
+        found = self.matches(title, kinds=kinds)
+        return found[0] if len(found) == 1 else None
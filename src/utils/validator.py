@@ -1,7 +1,13 @@
-from typing import Dict, Any, List, Optional
+import json
+import re
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union
 from pydantic import BaseModel
 from ..providers.base import AIResponse
 
+# Arabic harakat / Quranic marks and tatweel: stripped so a vocalized word counts once
+ARABIC_MARKS = re.compile("[\u0610-\u061A\u0640\u064B-\u065F\u0670\u06D6-\u06ED]")
+WORD = re.compile(r"\w+")
+
 class ValidationResult(BaseModel):
     passed: bool
     score: float  # 0.0 to 1.0
@@ -9,29 +15,163 @@ class ValidationResult(BaseModel):
     suggestions: List[str]
     raw_response: Dict[str, Any]
 
+class ResponseView:
+    """Response text tokenized and case-folded once, shared by every rule"""
+    
+    def __init__(self, content: str):
+        self.content = content
+        self._folded: Optional[str] = None
+        self._split: Optional[List[str]] = None
+        self._words: Optional[List[str]] = None
+        self._json: Any = None
+        self._json_error: Optional[str] = None
+        self._json_parsed = False
+
+    @property
+    def folded(self) -> str:
+        if self._folded is None:
+            self._folded = self.content.casefold()
+        return self._folded
+
+    @property
+    def split(self) -> List[str]:
+        """Whitespace tokens (legacy min_length / max_length semantics)"""
+        if self._split is None:
+            self._split = self.content.split()
+        return self._split
+
+    @property
+    def words(self) -> List[str]:
+        """Word tokens, Arabic diacritics and tatweel removed before counting"""
+        if self._words is None:
+            self._words = WORD.findall(ARABIC_MARKS.sub("", self.content))
+        return self._words
+
+    def parsed_json(self) -> Tuple[Any, Optional[str]]:
+        if not self._json_parsed:
+            self._json_parsed = True
+            text = self.content.strip()
+            # Tolerate a ```json fenced block around the payload
+            fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.S)
+            if fenced:
+                text = fenced.group(1)
+            try:
+                self._json = json.loads(text)
+            except ValueError as e:
+                self._json_error = f"invalid JSON: {e}"
+        return self._json, self._json_error
+
+_JSON_TYPES = {
+    "object": (dict,), "array": (list,), "string": (str,), "boolean": (bool,),
+    "integer": (int,), "number": (int, float), "null": (type(None),),
+}
+
+def _schema_errors(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Minimal JSON-schema subset: type, enum, required, properties, items, min/max length & items"""
+    errors = []
+    expected = schema.get("type")
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        py_types = tuple(t for name in types for t in _JSON_TYPES[name])
+        # bool is an int subclass in Python but not a number in JSON
+        if not isinstance(value, py_types) or (isinstance(value, bool) and "boolean" not in types):
+            return [f"{path}: expected {expected}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: not one of {schema['enum']}")
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                errors += _schema_errors(value[key], sub, f"{path}.{key}")
+    if isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            errors.append(f"{path}: fewer than {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: more than {schema['maxItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors += _schema_errors(item, schema["items"], f"{path}[{i}]")
+    if isinstance(value, str):
+        if "minLength" in schema and len(value) < schema["minLength"]:
+            errors.append(f"{path}: shorter than {schema['minLength']}")
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            errors.append(f"{path}: longer than {schema['maxLength']}")
+    return errors
+
+def _compile_check(rule_def: Dict[str, Any]) -> Callable[[ResponseView], bool]:
+    rule_type = rule_def.get("type")
+    value = rule_def.get("value")
+    
+    if rule_type == "contains":
+        needle = str(value).casefold()
+        return lambda view: needle in view.folded
+    if rule_type == "not_contains":
+        needle = str(value).casefold()
+        return lambda view: needle not in view.folded
+    if rule_type == "min_length":
+        limit = int(value)
+        return lambda view: len(view.split) >= limit
+    if rule_type == "max_length":
+        limit = int(value)
+        return lambda view: len(view.split) <= limit
+    if rule_type == "min_words":
+        limit = int(value)
+        return lambda view: len(view.words) >= limit
+    if rule_type == "max_words":
+        limit = int(value)
+        return lambda view: len(view.words) <= limit
+    if rule_type == "max_chars":
+        limit = int(value)
+        return lambda view: len(view.content) <= limit
+    if rule_type in ("regex", "not_regex"):
+        flags = re.IGNORECASE if rule_def.get("ignore_case", True) else 0
+        pattern = re.compile(str(value), flags | re.MULTILINE)
+        if rule_type == "regex":
+            return lambda view: pattern.search(view.content) is not None
+        return lambda view: pattern.search(view.content) is None
+    if rule_type == "json_schema":
+        schema = value if isinstance(value, dict) else json.loads(value)
+        def check(view: ResponseView) -> bool:
+            data, error = view.parsed_json()
+            return error is None and not _schema_errors(data, schema)
+        return check
+    
+    return lambda view: True
+
+class CompiledRules:
+    """Rule set compiled once into check functions, reusable across many responses"""
+    
+    def __init__(self, rules: Dict[str, Any]):
+        self.checks: List[Tuple[str, str, Callable[[ResponseView], bool], str]] = []
+        for tier in ("primary", "secondary"):
+            for rule_name, rule_def in (rules.get(tier) or {}).items():
+                self.checks.append((tier, rule_name, _compile_check(rule_def), rule_def.get("message", rule_name)))
+        self.primary_names = list((rules.get("primary") or {}).keys())
+
 class ResponseValidator:
     """Validator to check if AI response meets campaign management requirements"""
     
-    def validate(self, response: AIResponse, rules: Dict[str, Any]) -> ValidationResult:
+    def compile(self, rules: Dict[str, Any]) -> CompiledRules:
+        return CompiledRules(rules)
+
+    def validate(self, response: AIResponse, rules: Union[Dict[str, Any], CompiledRules]) -> ValidationResult:
+        compiled = rules if isinstance(rules, CompiledRules) else self.compile(rules)
+        view = ResponseView(response.content)
         results = {}
         suggestions = []
         
-        # Primary Markers: Logic & Integrity
-        for rule_name, rule_def in rules.get("primary", {}).items():
-            check_passed = self._check_rule(response.content, rule_def)
+        # Primary Markers: Logic & Integrity / Secondary Markers: Style & Performance
+        for tier, rule_name, check, message in compiled.checks:
+            check_passed = check(view)
             results[rule_name] = check_passed
             if not check_passed:
-                suggestions.append(f"Primary Fail: {rule_def.get('message', rule_name)}")
-
-        # Secondary Markers: Style & Performance
-        for rule_name, rule_def in rules.get("secondary", {}).items():
-            check_passed = self._check_rule(response.content, rule_def)
-            results[rule_name] = check_passed
-            if not check_passed:
-                suggestions.append(f"Secondary Hint: {rule_def.get('message', rule_name)}")
+                prefix = "Primary Fail" if tier == "primary" else "Secondary Hint"
+                suggestions.append(f"{prefix}: {message}")
 
         # Calculate score
-        primary_passed = all(results.get(k, True) for k in rules.get("primary", {}).keys())
+        primary_passed = all(results.get(k, True) for k in compiled.primary_names)
         all_passed_count = sum(1 for v in results.values() if v)
         total_rules = len(results)
         score = (all_passed_count / total_rules) if total_rules > 0 else 1.0
@@ -44,17 +184,7 @@ class ResponseValidator:
             raw_response=response.dict()
         )
 
-    def _check_rule(self, content: str, rule_def: Dict[str, Any]) -> bool:
-        rule_type = rule_def.get("type")
-        value = rule_def.get("value")
-        
-        if rule_type == "contains":
-            return value.lower() in content.lower()
-        if rule_type == "not_contains":
-            return value.lower() not in content.lower()
-        if rule_type == "min_length":
-            return len(content.split()) >= int(value)
-        if rule_type == "max_length":
-            return len(content.split()) <= int(value)
-        
-        return True
+    def validate_many(self, responses: List[AIResponse], rules: Union[Dict[str, Any], CompiledRules]) -> List[ValidationResult]:
+        """Validates a batch of responses against one rule set, compiled once"""
+        compiled = rules if isinstance(rules, CompiledRules) else self.compile(rules)
+        return [self.validate(response, compiled) for response in responses]
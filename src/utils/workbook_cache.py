@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .ods_reader import (OdsAnnotation, OdsCell, OdsRow, SheetFilter, StyleTable, idx_to_col,
+                         iter_rows as stream_rows, list_sheets, read_styles)
+
+# Bump when the reader's output changes so stale materializations are rebuilt
+SCHEMA_VERSION = 5
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PATH = os.path.join(ROOT_DIR, "data", "cache", "workbooks.sqlite")
+
+class AnnotationHit(NamedTuple):
+    workbook: str                     # Path the workbook was materialized from
+    sheet: str
+    cell: str                         # A1 reference
+    author: Optional[str]
+    date: Optional[str]
+    text: str
+    value: str                        # Cell content the comment is attached to
+
+class WorkbookCache:
+    """
+    On-disk (SQLite) materialization of parsed ODS workbooks, keyed by the
+    SHA-256 of the workbook file. The first read of a workbook streams it
+    through ods_reader and stores every non-empty cell (value, style,
+    annotation, coordinates) plus the cell style table; later reads of the
+    same bytes are table lookups. A (path, size, mtime) memo avoids re-hashing unchanged files.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, hash TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS workbooks ("
+            " id INTEGER PRIMARY KEY, hash TEXT UNIQUE NOT NULL, path TEXT NOT NULL,"
+            " version INTEGER NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS sheets ("
+            " workbook INTEGER NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL,"
+            " PRIMARY KEY (workbook, position)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS row_styles ("
+            " workbook INTEGER NOT NULL, sheet TEXT NOT NULL, row INTEGER NOT NULL, styles TEXT NOT NULL,"
+            " PRIMARY KEY (workbook, sheet, row)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS cells ("
+            " workbook INTEGER NOT NULL, sheet TEXT NOT NULL, row INTEGER NOT NULL, col INTEGER NOT NULL,"
+            " text TEXT NOT NULL, value_type TEXT, raw_value TEXT, style TEXT, covered INTEGER NOT NULL,"
+            " note_author TEXT, note_date TEXT, note_text TEXT,"
+            " PRIMARY KEY (workbook, sheet, row, col)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS cell_styles ("
+            " workbook INTEGER NOT NULL, name TEXT NOT NULL, parent TEXT, background TEXT,"
+            " PRIMARY KEY (workbook, name)) WITHOUT ROWID;"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS annotations USING fts5("
+            " text, author, sheet UNINDEXED, cell UNINDEXED, date UNINDEXED, value UNINDEXED,"
+            " workbook UNINDEXED, tokenize = 'unicode61 remove_diacritics 2');"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def file_hash(source: str) -> str:
+        """SHA-256 of the workbook; for an extracted folder, of its content.xml"""
+        target = os.path.join(source, "content.xml") if os.path.isdir(source) else source
+        digest = hashlib.sha256()
+        with open(target, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _hash_for(self, source: str) -> str:
+        target = os.path.join(source, "content.xml") if os.path.isdir(source) else source
+        stat = os.stat(target)
+        key = os.path.abspath(source)
+        row = self._conn.execute("SELECT size, mtime_ns, hash FROM files WHERE path = ?", (key,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        digest = self.file_hash(source)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)",
+            (key, stat.st_size, stat.st_mtime_ns, digest)
+        )
+        self._conn.commit()
+        return digest
+
+    def materialize(self, source: str) -> int:
+        """Parses `source` into the cache unless these exact bytes are already there; returns the workbook id"""
+        with self._lock:
+            digest = self._hash_for(source)
+            row = self._conn.execute("SELECT id, version FROM workbooks WHERE hash = ?", (digest,)).fetchone()
+            if row and row[1] == SCHEMA_VERSION:
+                return row[0]
+
+            print(f"DEBUG: Materializing workbook {source} ({digest[:12]})")
+            if row:
+                self._delete(row[0])
+            sheets: List[str] = []
+            cells: List[Tuple] = []
+            styles: List[Tuple] = []
+            notes: List[Tuple] = []
+            for ods_row in stream_rows(source):
+                if not sheets or sheets[-1] != ods_row.sheet:
+                    sheets.append(ods_row.sheet)
+                styles.append((ods_row.sheet, ods_row.index, json.dumps(sorted(ods_row.styles))))
+                for c in ods_row.cells:
+                    note = c.annotation
+                    if note is not None:
+                        notes.append((
+                            note.text, note.author, ods_row.sheet, f"{c.col}{ods_row.index}", note.date,
+                            c.raw_value if c.raw_value is not None else c.text,
+                        ))
+                    cells.append((
+                        ods_row.sheet, ods_row.index, c.column, c.text, c.value_type, c.raw_value,
+                        c.style, int(c.covered),
+                        note.author if note else None, note.date if note else None, note.text if note else None,
+                    ))
+            # Sheets without any content never appear in the row stream
+            for name in list_sheets(source):
+                if name not in sheets:
+                    sheets.append(name)
+            style_table = read_styles(source)
+
+            with self._conn:
+                # Older versions of the same file are dead weight
+                stale = [r[0] for r in self._conn.execute(
+                    "SELECT id FROM workbooks WHERE path = ?", (os.path.abspath(source),)
+                )]
+                for old in stale:
+                    self._delete(old)
+                workbook = self._conn.execute(
+                    "INSERT INTO workbooks (hash, path, version, created_at) VALUES (?, ?, ?, ?)",
+                    (digest, os.path.abspath(source), SCHEMA_VERSION, time.time())
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO sheets (workbook, position, name) VALUES (?, ?, ?)",
+                    [(workbook, i, name) for i, name in enumerate(sheets)]
+                )
+                self._conn.executemany(
+                    "INSERT INTO row_styles VALUES (?, ?, ?, ?)", ((workbook,) + r for r in styles)
+                )
+                self._conn.executemany(
+                    "INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ((workbook,) + c for c in cells)
+                )
+                self._conn.executemany(
+                    "INSERT INTO annotations (text, author, sheet, cell, date, value, workbook)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)", (n + (workbook,) for n in notes)
+                )
+                # The workbook-wide default background is stored under the empty name
+                self._conn.executemany(
+                    "INSERT INTO cell_styles VALUES (?, ?, ?, ?)",
+                    [(workbook, name, parent, color) for name, (parent, color) in style_table.styles.items()]
+                    + [(workbook, "", None, style_table.default_background)]
+                )
+            return workbook
+
+    def _delete(self, workbook: int):
+        self._conn.execute("DELETE FROM workbooks WHERE id = ?", (workbook,))
+        for table in ("sheets", "row_styles", "cells", "cell_styles", "annotations"):
+            self._conn.execute(f"DELETE FROM {table} WHERE workbook = ?", (workbook,))
+
+    def sheets(self, source: str) -> List[str]:
+        workbook = self.materialize(source)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(
+                "SELECT name FROM sheets WHERE workbook = ? ORDER BY position", (workbook,)
+            )]
+
+    def style_table(self, source: str) -> StyleTable:
+        """Cell styles with their own backgrounds, stored at materialization time"""
+        workbook = self.materialize(source)
+        with self._lock:
+            records = self._conn.execute(
+                "SELECT name, parent, background FROM cell_styles WHERE workbook = ?", (workbook,)
+            ).fetchall()
+        styles = {name: (parent, color) for name, parent, color in records if name}
+        default = next((color for name, _, color in records if not name), None)
+        return StyleTable(styles, default)
+
+    def _rows(self, workbook: int, sheet: str, first: Optional[int] = None, last: Optional[int] = None) -> Iterator[OdsRow]:
+        lo = first if first is not None else 0
+        hi = last if last is not None else 2 ** 31
+        with self._lock:
+            styles = {r[0]: set(json.loads(r[1])) for r in self._conn.execute(
+                "SELECT row, styles FROM row_styles WHERE workbook = ? AND sheet = ? AND row BETWEEN ? AND ?",
+                (workbook, sheet, lo, hi)
+            )}
+            records = self._conn.execute(
+                "SELECT row, col, text, value_type, raw_value, style, covered, note_author, note_date, note_text"
+                " FROM cells WHERE workbook = ? AND sheet = ? AND row BETWEEN ? AND ? ORDER BY row, col",
+                (workbook, sheet, lo, hi)
+            ).fetchall()
+
+        current: Optional[OdsRow] = None
+        for row, col, text, value_type, raw_value, style, covered, author, date, note in records:
+            if current is None or current.index != row:
+                if current is not None:
+                    yield current
+                current = OdsRow(sheet, row, [], styles.get(row, set()))
+            annotation = OdsAnnotation(author, date, note) if note is not None else None
+            current.cells.append(OdsCell(col, text, value_type, raw_value, style, annotation, bool(covered)))
+        if current is not None:
+            yield current
+
+    def iter_rows(self, source: str, sheets: SheetFilter = None) -> Iterator[OdsRow]:
+        """Same rows as ods_reader.iter_rows, served from the cache"""
+        workbook = self.materialize(source)
+        if sheets is None:
+            wanted = lambda name: True
+        elif callable(sheets):
+            wanted = sheets
+        else:
+            names = {sheets} if isinstance(sheets, str) else set(sheets)
+            wanted = lambda name: name in names
+        for name in self.sheets(source):
+            if wanted(name):
+                yield from self._rows(workbook, name)
+
+    def read_sheets(self, source: str, sheets: Iterable[str]) -> Dict[str, Dict[int, OdsRow]]:
+        names = [sheets] if isinstance(sheets, str) else list(sheets)
+        workbook = self.materialize(source)
+        return {name: {row.index: row for row in self._rows(workbook, name)} for name in names}
+
+    def read_sheet(self, source: str, sheet: str) -> Dict[int, OdsRow]:
+        return self.read_sheets(source, [sheet])[sheet]
+
+    def row_range(self, source: str, sheet: str, first: int, last: int) -> List[OdsRow]:
+        """Non-empty rows `first`..`last` (inclusive, 1-based) of one sheet"""
+        return list(self._rows(self.materialize(source), sheet, first, last))
+
+    def get_cell(self, source: str, sheet: str, col: str, row: int) -> Optional[OdsCell]:
+        for ods_row in self._rows(self.materialize(source), sheet, row, row):
+            return ods_row.get(col)
+        return None
+
+    def annotations(self, source: str, sheet: Optional[str] = None) -> List[AnnotationHit]:
+        """Every cell comment of a workbook in sheet/row/column order"""
+        workbook = self.materialize(source)
+        query = ("SELECT c.sheet, c.row, c.col, c.note_author, c.note_date, c.note_text, c.raw_value, c.text"
+                 " FROM cells c JOIN sheets s ON s.workbook = c.workbook AND s.name = c.sheet"
+                 " WHERE c.workbook = ? AND c.note_text IS NOT NULL")
+        params: List = [workbook]
+        if sheet is not None:
+            query += " AND c.sheet = ?"
+            params.append(sheet)
+        query += " ORDER BY s.position, c.row, c.col"
+        with self._lock:
+            records = self._conn.execute(query, params).fetchall()
+        return [
+            AnnotationHit(source, name, f"{idx_to_col(col)}{row}", author, date, note,
+                          raw if raw is not None else text)
+            for name, row, col, author, date, note, raw, text in records
+        ]
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # Quote every word so user input never hits FTS syntax; trailing * gives prefix matches
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{w}"*' for w in words)
+
+    def search_annotations(self, query: str, sources: Optional[Iterable[str]] = None, sheet: Optional[str] = None,
+                           author: Optional[str] = None, limit: int = 50) -> List[AnnotationHit]:
+        """
+        Full-text search over cell comments (all words must match, prefixes
+        allowed, accents ignored), best matches first. `sources` limits the
+        search to those workbooks (materializing them if needed); by default
+        every cached workbook is searched. Words match from their start only:
+        '5536' finds '5536.12' but not '15536'; filter annotations() for
+        substring matches.
+        """
+        if sources is not None:
+            workbooks = {self.materialize(src): src for src in sources}
+        else:
+            with self._lock:
+                workbooks = dict(self._conn.execute("SELECT id, path FROM workbooks").fetchall())
+        if not workbooks:
+            return []
+
+        clauses = [f"a.workbook IN ({','.join('?' * len(workbooks))})"]
+        params: List = list(workbooks)
+        expression = self._match_expression(query)
+        if expression:
+            clauses.append("annotations MATCH ?")
+            params.append(expression)
+        if sheet is not None:
+            clauses.append("a.sheet = ?")
+            params.append(sheet)
+        if author is not None:
+            clauses.append("a.author LIKE ?")
+            params.append(f"%{author}%")
+        order = "bm25(annotations)" if expression else "a.rowid"
+        sql = (f"SELECT a.workbook, a.sheet, a.cell, a.author, a.date, a.text, a.value FROM annotations a"
+               f" WHERE {' AND '.join(clauses)} ORDER BY {order} LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            records = self._conn.execute(sql, params).fetchall()
+        return [AnnotationHit(workbooks[wb], *rest) for wb, *rest in records]
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                for table in ("files", "workbooks", "sheets", "row_styles", "cells", "cell_styles", "annotations"):
+                    self._conn.execute(f"DELETE FROM {table}")
@@ -0,0 +1,194 @@
+"""
+Workbook Coordinate Index
+One byte-level pass over content.xml records where every sheet and row
+element starts; A1-style cell reads then parse only the row they need.
+"""
+
+import mmap
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from html import unescape
+from typing import Dict, List, Optional, Tuple
+from .ods_reader import OdsCell, OdsRow, TABLE_COLUMN, TABLE_ROW, _ColumnStyles, _parse_row
+
+TAG_PATTERN = re.compile(rb"<table:table(-row)?[\s>/]|</table:table>")
+COLUMN_PATTERN = re.compile(rb"<table:table-column\b[^>]*>")
+NAME_ATTR = re.compile(rb'table:name="([^"]*)"')
+ROWS_REPEATED_ATTR = re.compile(rb'table:number-rows-repeated="(\d+)"')
+ROOT_PATTERN = re.compile(rb"<office:document-content\b[^>]*>")
+A1_PATTERN = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+class SheetIndex:
+    """Row element offsets of one sheet. Row numbers are 1-based."""
+    __slots__ = ("name", "start", "end", "firsts", "counts", "offsets", "by_first", "columns")
+
+    def __init__(self, name: str, start: int):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.firsts: List[int] = []     # First row number covered by each row element
+        self.counts: List[int] = []     # number-rows-repeated of each element
+        self.offsets: List[int] = []    # Byte offset of each <table:table-row>
+        self.by_first: Dict[int, int] = {}
+        self.columns: Optional[_ColumnStyles] = None
+
+    @property
+    def row_count(self) -> int:
+        return self.firsts[-1] + self.counts[-1] - 1 if self.firsts else 0
+
+    def position(self, row: int) -> Optional[int]:
+        """Index of the row element covering `row`: dict hit, bisect only inside repeated runs"""
+        pos = self.by_first.get(row)
+        if pos is not None:
+            return pos
+        pos = bisect_right(self.firsts, row) - 1
+        if pos >= 0 and row < self.firsts[pos] + self.counts[pos]:
+            return pos
+        return None
+
+class WorkbookIndex:
+    """
+    Sheet and row coordinate index over a workbook's content.xml.
+
+    `source` may be an .ods archive (content.xml is inflated once into
+    memory), an extracted folder or a content.xml file (memory-mapped).
+    Building the index is a single regex pass over the bytes; after that
+    `cell("Noor", "E12")` and `row_range("Noor", 2, 70)` seek straight to
+    the rows involved instead of re-scanning the sheet.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._file = None
+        self.data = self._load(source)
+        self._root_tag, self._root_close = self._root_wrapper()
+        self.sheets: Dict[str, SheetIndex] = {}
+        self._rows: Dict[Tuple[str, int], Optional[OdsRow]] = {}
+        self._build()
+
+    def _load(self, source: str):
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                return archive.read("content.xml")
+        path = os.path.join(source, "content.xml") if os.path.isdir(source) else source
+        self._file = open(path, "rb")
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _root_wrapper(self) -> Tuple[bytes, bytes]:
+        # Row fragments are parsed inside a copy of the root tag so every namespace resolves
+        match = ROOT_PATTERN.search(self.data, 0, 1 << 16)
+        if not match:
+            raise ValueError(f"{self.source}: not an OpenDocument content.xml")
+        return match.group(0), b"</office:document-content>"
+
+    def _build(self):
+        current: Optional[SheetIndex] = None
+        for match in TAG_PATTERN.finditer(self.data):
+            start = match.start()
+            if self.data[start + 1] == ord("/"):
+                if current is not None:
+                    current.end = match.end()
+                    current = None
+                continue
+            tag_end = self.data.find(b">", start)
+            tag = self.data[start:tag_end]
+            if match.group(1):
+                if current is None:
+                    continue
+                repeated = ROWS_REPEATED_ATTR.search(tag)
+                count = int(repeated.group(1)) if repeated else 1
+                first = current.firsts[-1] + current.counts[-1] if current.firsts else 1
+                current.by_first[first] = len(current.firsts)
+                current.firsts.append(first)
+                current.counts.append(count)
+                current.offsets.append(start)
+            else:
+                name = NAME_ATTR.search(tag)
+                if name is None:
+                    continue
+                sheet_name = unescape(name.group(1).decode("utf-8"))
+                current = SheetIndex(sheet_name, start)
+                self.sheets[sheet_name] = current
+
+    def sheet_names(self) -> List[str]:
+        return list(self.sheets)
+
+    def _sheet(self, name: str) -> SheetIndex:
+        if name not in self.sheets:
+            raise KeyError(f"No sheet named {name!r}")
+        return self.sheets[name]
+
+    def _column_styles(self, sheet: SheetIndex) -> _ColumnStyles:
+        if sheet.columns is None:
+            columns = _ColumnStyles()
+            stop = sheet.offsets[0] if sheet.offsets else sheet.end
+            for match in COLUMN_PATTERN.finditer(self.data, sheet.start, stop):
+                tag = match.group(0)
+                if not tag.endswith(b"/>"):
+                    tag = tag[:-1] + b"/>"
+                columns.add(ET.fromstring(self._root_tag + tag + self._root_close).find(TABLE_COLUMN))
+            sheet.columns = columns
+        return sheet.columns
+
+    def _row_element(self, offset: int) -> ET.Element:
+        tag_end = self.data.find(b">", offset)
+        if self.data[tag_end - 1] == ord("/"):
+            end = tag_end + 1
+        else:
+            end = self.data.find(b"</table:table-row>", offset) + len(b"</table:table-row>")
+        fragment = self.data[offset:end]
+        return ET.fromstring(self._root_tag + fragment + self._root_close).find(TABLE_ROW)
+
+    def row(self, sheet_name: str, row: int) -> Optional[OdsRow]:
+        """The row at 1-based `row`, or None when it is empty or past the end"""
+        key = (sheet_name, row)
+        if key not in self._rows:
+            sheet = self._sheet(sheet_name)
+            pos = sheet.position(row)
+            parsed = None
+            if pos is not None:
+                elem = self._row_element(sheet.offsets[pos])
+                parsed = _parse_row(elem, sheet.name, row, self._column_styles(sheet), None)
+            self._rows[key] = parsed
+        return self._rows[key]
+
+    def row_range(self, sheet_name: str, first: int, last: int) -> List[OdsRow]:
+        """Non-empty rows `first`..`last` (inclusive); each row element is parsed once"""
+        sheet = self._sheet(sheet_name)
+        pos = sheet.position(first)
+        if pos is None:
+            return []
+        columns = self._column_styles(sheet)
+        rows = []
+        while pos < len(sheet.offsets) and sheet.firsts[pos] <= last:
+            run_first, count = sheet.firsts[pos], sheet.counts[pos]
+            template = _parse_row(self._row_element(sheet.offsets[pos]), sheet.name, run_first, columns, None)
+            # Empty repeated runs (e.g. the trailing million blank rows) are skipped whole
+            if template is not None:
+                for index in range(max(first, run_first), min(last, run_first + count - 1) + 1):
+                    rows.append(OdsRow(sheet.name, index, template.cells, template.styles))
+            pos += 1
+        return rows
+
+    def cell(self, sheet_name: str, ref: str) -> Optional[OdsCell]:
+        """A1-style lookup, e.g. cell('Noor', 'E12')"""
+        match = A1_PATTERN.match(ref)
+        if not match:
+            raise ValueError(f"Not an A1 reference: {ref!r}")
+        found = self.row(sheet_name, int(match.group(2)))
+        return found.get(match.group(1).upper()) if found else None
+
+    def close(self):
+        if self._file is not None:
+            self.data.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,50 @@
+import threading
+import time
+from src.universal_ai import UniversalAI
+from src.providers.base import BaseProvider, AIResponse
+from src.providers.health import ProviderHealth
+
+class SlowProvider(BaseProvider):
+    """Tracks how many generations overlap in time"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, prompt, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if prompt == "boom":
+            raise RuntimeError("generation failed")
+        return AIResponse(content=prompt.upper(), model="fake", provider="fake")
+
+    def is_available(self):
+        return True
+
+    def list_models(self):
+        return ["fake"]
+
+def make_ai(provider):
+    ai = UniversalAI(provider_name="ollama", failover=False)
+    ai._health = {"ollama": ProviderHealth(provider, failure_threshold=100)}
+    return ai
+
+def test_generate_many_keeps_input_order_and_concurrency():
+    provider = SlowProvider()
+    prompts = [f"msg {i}" for i in range(8)]
+    results = make_ai(provider).generate_many(prompts, concurrency=4)
+
+    assert [r.index for r in results] == list(range(8))
+    assert [r.response.content for r in results] == [p.upper() for p in prompts]
+    assert provider.peak == 4
+
+def test_generate_many_reports_per_item_errors():
+    results = make_ai(SlowProvider()).generate_many(["a", "boom", "c"], concurrency=2)
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert "generation failed" in results[1].error
+    assert results[2].response.content == "C"
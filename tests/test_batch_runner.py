@@ -0,0 +1,75 @@
+import threading
+import time
+from src.utils.batch_runner import BatchJournal, RateLimiter, run_pool
+
+def test_items_are_shared_across_workers():
+    seen = {}
+    lock = threading.Lock()
+
+    def process(worker, item):
+        time.sleep(0.01)
+        with lock:
+            seen.setdefault(worker, []).append(item)
+        if item == 3:
+            raise ValueError("boom")
+        return item * 2
+
+    closed = []
+    results = run_pool(range(12), lambda i: f"tab{i}", process, workers=3, close_worker=closed.append)
+    assert sorted(item for item, _ in results) == list(range(12))
+    assert isinstance(dict(results)[3], ValueError) and dict(results)[5] == 10
+    assert len(seen) == 3 and sorted(closed) == ["tab0", "tab1", "tab2"]
+
+def test_workers_process_items_concurrently():
+    # Every worker must be mid-item at the same time for the barrier to open
+    barrier = threading.Barrier(4, timeout=5)
+
+    def process(worker, item):
+        barrier.wait()
+        return worker
+
+    results = run_pool(range(4), lambda i: i, process, workers=4)
+    assert sorted(res for _, res in results) == [0, 1, 2, 3]
+
+def test_stop_leaves_remaining_items_unprocessed():
+    stop = threading.Event()
+    results = run_pool(range(10), lambda i: i, lambda w, item: item, workers=1,
+                       on_result=lambda item, res: item == 2 and stop.set(), stop=stop)
+    assert [item for item, _ in results] == [0, 1, 2]
+
+def test_rate_limiter_spaces_starts():
+    limiter = RateLimiter(0.05)
+    stamps = []
+    threads = [threading.Thread(target=lambda: (limiter.wait(), stamps.append(time.monotonic()))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stamps.sort()
+    assert all(b - a >= 0.04 for a, b in zip(stamps, stamps[1:]))
+
+def test_journal_replays_latest_status(tmp_path):
+    path = tmp_path / "batch.journal.jsonl"
+    journal = BatchJournal(str(path))
+    journal.record("1", "in_progress")
+    journal.record("2", "in_progress")
+    journal.record("1", "created_initial", processed_at="2026-01-01T00:00:00")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "2", "sta')  # Torn write from a crash
+
+    state = BatchJournal(str(path)).replay()
+    assert state == {"1": {"status": "created_initial", "processed_at": "2026-01-01T00:00:00"},
+                     "2": {"status": "in_progress"}}
+    journal.clear()
+    assert journal.replay() == {}
+
+def test_record_after_a_torn_line_is_not_lost(tmp_path):
+    path = tmp_path / "batch.journal.jsonl"
+    journal = BatchJournal(str(path))
+    journal.record("1", "in_progress")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "1", "sta')  # Torn write from a crash
+
+    journal.record("1", "created_initial")
+    journal.record("2", "in_progress")
+    assert journal.replay() == {"1": {"status": "created_initial"}, "2": {"status": "in_progress"}}
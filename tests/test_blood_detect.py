@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from blood_detect import check_for_blood, check_many, iter_images
+
+def image(path, color, size=(800, 600), red_share=1.0):
+    pixels = np.full((size[1], size[0], 3), (40, 110, 170), dtype=np.uint8)
+    pixels[:, :int(size[0] * red_share)] = color
+    Image.fromarray(pixels).save(path, quality=90)
+    return path
+
+def test_red_images_are_flagged(tmp_path):
+    # Large JPEGs go through draft decoding, PNGs through reduce()
+    wet = image(str(tmp_path / "wet.jpg"), (200, 15, 20), size=(4000, 3000))
+    dried = image(str(tmp_path / "dried.png"), (110, 20, 15), red_share=0.3)
+    for path in (wet, dried):
+        flagged, ratio = check_for_blood(path)
+        assert flagged and ratio > 0.05
+
+def test_other_images_are_not_flagged(tmp_path):
+    sky = image(str(tmp_path / "sky.jpg"), (40, 110, 170))
+    orange = image(str(tmp_path / "orange.png"), (230, 120, 30))
+    speck = image(str(tmp_path / "speck.png"), (200, 15, 20), red_share=0.02)
+    for path in (sky, orange, speck):
+        assert not check_for_blood(path)[0]
+    assert check_for_blood(str(tmp_path / "missing.jpg")) == (False, 0.0)
+
+def test_check_many_matches_single_checks(tmp_path):
+    colors = [(200, 15, 20), (40, 110, 170), (110, 20, 15), (230, 120, 30)]
+    paths = [image(str(tmp_path / f"img{i}.{'jpg' if i % 2 else 'png'}"), colors[i % 4], red_share=0.1 * (i % 5 + 1))
+             for i in range(12)]
+    os.makedirs(tmp_path / "thumbs")
+    image(str(tmp_path / "thumbs" / "img0.jpg"), colors[0])
+    assert sorted(iter_images(str(tmp_path))) == sorted(paths)
+
+    expected = [(path, bool(flagged), float(ratio)) for path in paths for flagged, ratio in [check_for_blood(path)]]
+    assert check_many(paths, workers=1) == expected
+    assert check_many(paths, workers=2) == expected
+    assert any(flagged for _, flagged, _ in expected) and not all(flagged for _, flagged, _ in expected)
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import queue
+import pytest
+from src.utils.cdp_client import CDPClient, CDPDisconnected, CDPError, CDPTab
+
+class FakeBrowserSocket:
+    """Replies to commands in reverse order of arrival, once `batch` commands are queued"""
+
+    def __init__(self, batch=1, handler=None):
+        self.batch = batch
+        self.handler = handler
+        self.sent = []
+        self.waiting = []
+        self.inbox = queue.Queue()
+
+    def send(self, payload):
+        message = json.loads(payload)
+        self.sent.append(message)
+        self.waiting.append(message)
+        if len(self.waiting) >= self.batch:
+            for msg in reversed(self.waiting):
+                self.inbox.put(json.dumps(self.reply(msg)))
+            self.waiting = []
+
+    def reply(self, msg):
+        handled = self.handler(msg) if self.handler else None
+        if handled is not None:
+            return {"id": msg["id"], **handled}
+        if msg["method"] == "Bad.method":
+            return {"id": msg["id"], "error": {"code": -32601, "message": "'Bad.method' wasn't found"}}
+        if msg["method"] == "Runtime.evaluate":
+            expression = msg["params"]["expression"]
+            if expression == "throw":
+                return {"id": msg["id"], "result": {"result": {}, "exceptionDetails": {"text": "Uncaught"}}}
+            return {"id": msg["id"], "result": {"result": {"value": f"{msg.get('sessionId')}:{expression}"}}}
+        return {"id": msg["id"], "result": {"echo": msg["method"]}}
+
+    def event(self, method, session_id=None, **params):
+        message = {"method": method, "params": params}
+        if session_id:
+            message["sessionId"] = session_id
+        self.inbox.put(json.dumps(message))
+
+    def recv(self):
+        item = self.inbox.get()
+        if item is None:
+            raise ConnectionError("closed")
+        return item
+
+    def close(self):
+        self.inbox.put(None)
+
+def run(coro_factory, socket):
+    async def main():
+        client = CDPClient(socket, asyncio.get_running_loop())
+        try:
+            return await coro_factory(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_pipelined_commands_get_their_own_responses():
+    socket = FakeBrowserSocket(batch=3)
+
+    async def scenario(client):
+        tab = CDPTab(client, "S1", "T1")
+        return await asyncio.gather(tab.evaluate("1"), tab.evaluate("2"), client.send("Browser.getVersion"))
+
+    assert run(scenario, socket) == ["S1:1", "S1:2", {"echo": "Browser.getVersion"}]
+    assert len({m["id"] for m in socket.sent}) == 3
+    assert [m.get("sessionId") for m in socket.sent] == ["S1", "S1", None]
+
+def test_errors_surface_as_exceptions():
+    socket = FakeBrowserSocket()
+
+    async def scenario(client):
+        with pytest.raises(CDPError, match="wasn't found"):
+            await client.send("Bad.method")
+        with pytest.raises(CDPError):
+            await CDPTab(client, "S1", "T1").evaluate("throw")
+        return await client.send("Page.enable")
+
+    assert run(scenario, socket) == {"echo": "Page.enable"}
+
+def test_events_reach_subscribers_of_their_session():
+    socket = FakeBrowserSocket()
+
+    async def scenario(client):
+        seen = []
+        client.on("Page.frameNavigated", lambda p: seen.append(("any", p["url"])))
+        CDPTab(client, "S2", "T2").on("Page.frameNavigated", lambda p: seen.append(("S2", p["url"])))
+        waiter = asyncio.ensure_future(CDPTab(client, "S1", "T1").wait_for("Page.loadEventFired", timeout=5))
+        await asyncio.sleep(0)
+        socket.event("Page.frameNavigated", "S1", url="a")
+        socket.event("Page.frameNavigated", "S2", url="b")
+        socket.event("Page.loadEventFired", "S2", timestamp=1)
+        socket.event("Page.loadEventFired", "S1", timestamp=2)
+        loaded = await waiter
+        return seen, loaded
+
+    seen, loaded = run(scenario, socket)
+    assert seen == [("any", "a"), ("any", "b"), ("S2", "b")]
+    assert loaded == {"timestamp": 2}
+
+def test_pending_commands_fail_when_the_connection_drops():
+    socket = FakeBrowserSocket(batch=10)
+
+    async def scenario(client):
+        pending = client.send("Page.enable", timeout=5)
+        socket.close()
+        with pytest.raises(CDPDisconnected):
+            await pending
+        return True
+
+    assert run(scenario, socket)
+
+def test_wait_until_survives_a_navigation():
+    calls = []
+
+    def handler(msg):
+        if msg["method"] != "Runtime.evaluate":
+            return None
+        calls.append(msg["params"]["expression"])
+        if len(calls) == 1:
+            return {"error": {"code": -32000, "message": "Execution context was destroyed."}}
+        return {"result": {"result": {"value": "STEP_2"}}}
+
+    socket = FakeBrowserSocket(handler=handler)
+    result = run(lambda client: CDPTab(client, "S1", "T1").wait_until("document.title", timeout=5), socket)
+    assert result == "STEP_2"
+    assert "MutationObserver" in calls[-1] and "(document.title)" in calls[-1]
+
+def test_request_watch_reports_the_first_finished_match():
+    socket = FakeBrowserSocket()
+
+    async def scenario(client):
+        tab = CDPTab(client, "S1", "T1")
+        watch = await tab.watch_requests(lambda r: r["method"] == "POST")
+        socket.event("Network.requestWillBeSent", "S1", requestId="1", timestamp=1.0,
+                     request={"url": "https://x/page.js", "method": "GET"})
+        socket.event("Network.requestWillBeSent", "S1", requestId="2", timestamp=2.0,
+                     request={"url": "https://x/upload", "method": "POST"})
+        socket.event("Network.loadingFinished", "S1", requestId="1", timestamp=2.5)
+        socket.event("Network.responseReceived", "S1", requestId="2", response={"status": 201})
+        socket.event("Network.loadingFinished", "S1", requestId="2", timestamp=3.5)
+        return await watch.wait(timeout=5)
+
+    finished = run(scenario, socket)
+    assert finished["url"] == "https://x/upload" and finished["status"] == 201
+    assert finished["duration"] == 1.5 and finished["failed"] is False
+
+class FakeField:
+    """One form field behind Runtime.evaluate; `accepts_typing` False mimics a field that ignores insertText"""
+
+    def __init__(self, value="", accepts_typing=True):
+        self.value = value
+        self.accepts_typing = accepts_typing
+        self.methods = []
+
+    def __call__(self, msg):
+        method, params = msg["method"], msg.get("params", {})
+        self.methods.append(method)
+        if method == "Input.insertText":
+            if self.accepts_typing:
+                self.value = params["text"] if self.selected else self.value + params["text"]
+            return {"result": {}}
+        if method != "Runtime.evaluate":
+            return None
+        expression = params["expression"]
+        if "el.focus()" in expression:
+            self.selected = "if (true) {" in expression
+            self.unlocked = "if (true) el.removeAttribute('readonly')" in expression
+            return {"result": {"result": {"value": self.value}}}
+        if "getOwnPropertyDescriptor" in expression:
+            self.value = json.loads(expression.split("set.call(el, ")[1].split(");")[0])
+            return {"result": {"result": {"value": True}}}
+        return {"result": {"result": {"value": self.value}}}
+
+def test_fill_types_with_a_single_insert_text():
+    field = FakeField("old story")
+    story = "Line one.\nLine two " * 100
+    strategy = run(lambda client: CDPTab(client, "S1", "T1").fill("textarea", story), FakeBrowserSocket(handler=field))
+    assert strategy == "insertText" and field.value == story
+    assert field.methods.count("Input.insertText") == 1 and len(field.methods) == 3
+
+def test_fill_falls_back_to_the_native_setter():
+    field = FakeField("Porto", accepts_typing=False)
+    strategy = run(lambda client: CDPTab(client, "S1", "T1").fill("input", ", Portugal", clear=False),
+                   FakeBrowserSocket(handler=field))
+    assert strategy == "setter" and field.value == "Porto, Portugal"
+    assert not field.unlocked  # readonly is only dropped on request
+
+def test_fill_can_unlock_a_readonly_field():
+    field = FakeField("")
+    strategy = run(lambda client: CDPTab(client, "S1", "T1").fill("input.linkUrl", "help-noor", force_editable=True),
+                   FakeBrowserSocket(handler=field))
+    assert strategy == "insertText" and field.unlocked and field.selected
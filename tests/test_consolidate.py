@@ -0,0 +1,87 @@
+import json
+import os
+import pytest
+from src.utils import normalize_campaigns as nc
+
+CHUFFED = [
+    {"id": 1, "title": "Help Noor rebuild", "raised": "10"},
+    {"id": 2, "title": "Support Khaled and family", "raised": "5"},
+]
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(nc, "DATA_DIR", str(tmp_path))
+    write_chuffed(tmp_path, CHUFFED)
+    paths = {name: str(tmp_path / "data" / f"{name}.json") for name in ("unified", "state", "changes")}
+    paths["store"] = nc.DonationStore(str(tmp_path / "donations.sqlite"))
+    return tmp_path, paths
+
+def write_chuffed(root, campaigns):
+    path = root / "data" / "chuffed_campaigns.json"
+    path.write_text(json.dumps(campaigns), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(0, stat.st_mtime_ns + 10**9))
+
+def run(paths, **kwargs):
+    return nc.consolidate_incremental(paths["unified"], paths["state"], paths["changes"],
+                                      store=paths["store"], **kwargs)
+
+def test_first_run_writes_everything(project):
+    _, paths = project
+    outcome = run(paths)
+    assert outcome["written"]
+    assert outcome["changes"]["added"] == ["chuffed_1", "chuffed_2"]
+    with open(paths["unified"], encoding="utf-8") as f:
+        assert [c["id"] for c in json.load(f)["campaigns"]] == ["chuffed_1", "chuffed_2"]
+    with open(paths["changes"], encoding="utf-8") as f:
+        assert json.load(f)["added"] == ["chuffed_1", "chuffed_2"]
+
+def test_unchanged_sources_skip_the_rebuild(project, capsys):
+    _, paths = project
+    run(paths)
+    mtime = os.stat(paths["unified"]).st_mtime_ns
+    capsys.readouterr()
+
+    outcome = run(paths)
+    assert outcome["result"] is None and not outcome["written"]
+    assert "skipping consolidation" in capsys.readouterr().out
+    assert os.stat(paths["unified"]).st_mtime_ns == mtime
+
+def test_only_changed_campaigns_are_renormalized(project, monkeypatch):
+    root, paths = project
+    run(paths)
+
+    calls = []
+    original = nc.normalize_chuffed
+    monkeypatch.setattr(nc, "normalize_chuffed", lambda c, r=0.0: calls.append(c["id"]) or original(c, r))
+    write_chuffed(root, [CHUFFED[0], {"id": 2, "title": "Support Khaled and family", "raised": "7"},
+                         {"id": 3, "title": "Save Ahmed"}])
+
+    outcome = run(paths)
+    assert calls == [2, 3]
+    assert outcome["changes"] == {"added": ["chuffed_3"], "changed": ["chuffed_2"], "removed": []}
+
+    write_chuffed(root, CHUFFED[:1])
+    assert run(paths)["changes"]["removed"] == ["chuffed_2", "chuffed_3"]
+
+def test_atomic_write_leaves_no_temp_files(project):
+    root, paths = project
+    nc.write_json_atomic(paths["unified"], {"a": 1})
+    nc.write_json_atomic(paths["unified"], {"a": 2})
+    with open(paths["unified"], encoding="utf-8") as f:
+        assert json.load(f) == {"a": 2}
+    assert not [n for n in os.listdir(root / "data") if n.startswith(".tmp-")]
+
+def test_rebuilt_donation_store_forces_a_rebuild(project):
+    root, paths = project
+    (root / "primary_campaign_dataset.csv").write_text(
+        "Created At,Type,Currency,Amount,Description,Payment Method\n"
+        '"01/01/2026, 12:00:00","donation","EUR","10.00","Help Noor rebuild","card"\n', encoding="utf-8")
+    run(paths)
+    assert run(paths)["result"] is None
+
+    # Same files, but the store lost what it had ingested: totals must be recomputed
+    paths["store"].clear()
+    assert run(paths)["result"] is not None
+    assert run(paths)["result"] is None
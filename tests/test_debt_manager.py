@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime
 from src.utils.debt_manager import DebtManager, HistoricalDonation
+from src.utils.donation_store import PRIMARY_CSV, DonationStore
 import os
 
 @pytest.fixture
@@ -13,19 +14,23 @@ def sample_csv(tmp_path):
     d.write_text(content, encoding='utf-8')
     return str(d)
 
-def test_debt_manager_loading(sample_csv):
-    manager = DebtManager(sample_csv)
+@pytest.fixture
+def store(tmp_path):
+    return DonationStore(str(tmp_path / "donations.sqlite"))
+
+def test_debt_manager_loading(sample_csv, store):
+    manager = DebtManager(sample_csv, store)
     assert len(manager.donations) == 2
     assert manager.donations[0].amount == 100.0
     assert manager.donations[0].shareholder == "Test Shareholder A"
 
-def test_debt_manager_priority(sample_csv):
-    manager = DebtManager(sample_csv)
+def test_debt_manager_priority(sample_csv, store):
+    manager = DebtManager(sample_csv, store)
     # 01/01 should come before 02/01
     assert manager.donations[0].timestamp < manager.donations[1].timestamp
 
-def test_debt_resolution(sample_csv):
-    manager = DebtManager(sample_csv)
+def test_debt_resolution(sample_csv, store):
+    manager = DebtManager(sample_csv, store)
     # Resolve $120
     resolutions = manager.resolve_debt(120.0)
     
@@ -37,3 +42,30 @@ def test_debt_resolution(sample_csv):
     assert resolutions[1]['status'] == "partially_resolved"
     
     assert manager.get_total_unsatisfied_debt() == 30.0 # 150 - 120
+
+def test_running_totals_follow_fifo_cursor(sample_csv, store):
+    manager = DebtManager(sample_csv, store)
+    for amount in (30.0, 40.0, 25.0):
+        manager.resolve_debt(amount)
+        open_debts = [d for d in manager.donations if d.status != "resolved"]
+        assert manager.get_priority_queue() == open_debts
+        assert abs(manager.get_total_unsatisfied_debt() - sum(d.remaining_amount for d in open_debts)) < 1e-9
+        expected = {}
+        for d in open_debts:
+            expected[d.shareholder] = expected.get(d.shareholder, 0.0) + d.remaining_amount
+        assert manager.get_debts_by_shareholder().keys() == expected.keys()
+
+    # Shareholder A is fully paid and drops out; the head moved past it
+    assert list(manager.get_debts_by_shareholder()) == ["Test Shareholder B"]
+    assert manager.resolve_debt(1000.0)[-1]["status"] == "resolved"
+    assert manager.get_priority_queue() == [] and manager.get_total_unsatisfied_debt() == 0.0
+
+def test_undated_rows_count_for_totals_but_not_debt(tmp_path, store):
+    d = tmp_path / "undated.csv"
+    d.write_text("Created At,Type,Currency,Amount,Description,Payment Method\n"
+                 '"01/01/2026, 12:00:00","donation","EUR","10.00","Dated","card"\n'
+                 '"","donation","EUR","5.00","Undated","card"\n', encoding="utf-8")
+    manager = DebtManager(str(d), store)
+    assert [x.shareholder for x in manager.donations] == ["Dated"]
+    totals = {title: total for title, _, total, _ in store.campaign_totals(PRIMARY_CSV, source=str(d))}
+    assert totals == {"Dated": 10.0, "Undated": 5.0}
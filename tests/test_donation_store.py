@@ -0,0 +1,78 @@
+import os
+from datetime import datetime
+from src.utils.debt_manager import DebtManager
+from src.utils.donation_store import ATOMIC, LAUNCHGOOD, PRIMARY_CSV, DonationStore
+
+HEADER = "Created At,Type,Currency,Amount,Description,Payment Method\n"
+ROWS = [
+    '"01/01/2026, 12:00:00","donation","€","100.00","Help Noor","card"\n',
+    '"02/01/2026, 12:00:00","donation","€","50.00","Help Khaled","card"\n',
+    '"03/01/2026, 12:00:00","other","€","10.00","Not a donation","card"\n',
+]
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def bump_mtime(path):
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+def test_primary_csv_queries(tmp_path):
+    source = write(tmp_path / "primary.csv", "\ufeff" + HEADER + "".join(ROWS))
+    store = DonationStore(str(tmp_path / "facts.sqlite"))
+    assert store.ingest(source, PRIMARY_CSV) == 2
+
+    facts = store.donations(source=source)
+    assert [(f.campaign, f.amount, f.donated_at) for f in facts] == [
+        ("Help Noor", 100.0, datetime(2026, 1, 1, 12)), ("Help Khaled", 50.0, datetime(2026, 1, 2, 12))]
+    assert [f.shareholder for f in store.donations(shareholder="Help Khaled")] == ["Help Khaled"]
+    assert len(store.donations(start=datetime(2026, 1, 2), end=datetime(2026, 1, 3))) == 1
+    assert store.totals(platform="chuffed") == {"Help Noor": 100.0, "Help Khaled": 50.0}
+
+def test_unchanged_and_appended_files(tmp_path, capsys):
+    path = tmp_path / "primary.csv"
+    source = write(path, HEADER + "".join(ROWS))
+    store = DonationStore(str(tmp_path / "facts.sqlite"))
+    store.ingest(source, PRIMARY_CSV)
+    capsys.readouterr()
+
+    bump_mtime(source)
+    assert store.ingest(source, PRIMARY_CSV) == 0  # Same bytes: not re-parsed
+    assert "Ingesting" not in capsys.readouterr().out
+
+    with open(source, "a", encoding="utf-8") as f:
+        f.write('"04/01/2026, 12:00:00","donation","€","5.00","Help Noor","card"\n')
+    assert store.ingest(source, PRIMARY_CSV) == 1
+    assert "(append)" in capsys.readouterr().out
+    assert store.totals()["Help Noor"] == 105.0
+
+    # An edited (not appended) file replaces its facts
+    write(path, HEADER + ROWS[1])
+    bump_mtime(source)
+    store.ingest(source, PRIMARY_CSV)
+    assert [f.campaign for f in store.donations(source=source)] == ["Help Khaled"]
+
+def test_launchgood_and_atomic_sources(tmp_path):
+    store = DonationStore(str(tmp_path / "facts.sqlite"))
+    lg = write(tmp_path / "lg.csv", "Amount,Currency,Comment\n20,EUR,for noor\nbad,EUR,x\n")
+    atomic = write(tmp_path / "atomic.csv",
+                   "DATE,INAMOUNT,INCURRENCY,INTXID,OUTAMOUNT,OUTCURRENCY,ORDERID,ADDRESSTO\n"
+                   "24 January 2026 at 22:58:43 WET,30,TRX-USDT,tx1,-,,,addr\n"
+                   "25 January 2026 at 08:00:00 WET,-,,,25,TRX-USDT,o1,addr2\n")
+    store.sync([(LAUNCHGOOD, lg), (ATOMIC, atomic)])
+
+    assert [(f.amount, f.reference) for f in store.donations(kind=LAUNCHGOOD)] == [(20.0, "for noor")]
+    legs = store.donations(platform="atomic", currency="TRX-USDT")
+    assert [(f.direction, f.amount, f.reference) for f in legs] == [("in", 30.0, "tx1"), ("out", 25.0, "o1")]
+    assert legs[0].amount_eur is None
+
+    os.remove(lg)
+    store.prune()
+    assert store.donations(kind=LAUNCHGOOD) == []
+
+def test_debt_manager_reads_through_store(tmp_path):
+    source = write(tmp_path / "primary.csv", HEADER + "".join(reversed(ROWS)))
+    store = DonationStore(str(tmp_path / "facts.sqlite"))
+    manager = DebtManager(source, store)
+    assert [d.shareholder for d in manager.donations] == ["Help Noor", "Help Khaled"]
+    assert manager.donations[0].amount_eur == 100.0
@@ -0,0 +1,96 @@
+import pytest
+from src.universal_ai import UniversalAI
+from src.providers.base import BaseProvider, AIResponse
+from src.providers.health import ProviderHealth
+
+class FakeProvider(BaseProvider):
+    def __init__(self, name, up=True, fail=False):
+        self.name = name
+        self.up = up
+        self.fail = fail
+        self.calls = 0
+        self.probes = 0
+
+    def generate(self, prompt, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} stalled")
+        return AIResponse(content=f"{self.name}:{prompt}", model="fake", provider=self.name)
+
+    def is_available(self):
+        self.probes += 1
+        return self.up
+
+    def list_models(self):
+        return ["fake"]
+
+def make_ai(*providers, threshold=2):
+    ai = UniversalAI(provider_name="ollama", failover=False)
+    ai.fallback_chain = [p.name for p in providers]
+    ai._health = {p.name: ProviderHealth(p, failure_threshold=threshold, reset_timeout=60) for p in providers}
+    return ai
+
+def test_skips_unavailable_provider():
+    down, backup = FakeProvider("ollama", up=False), FakeProvider("lm_studio")
+    ai = make_ai(down, backup)
+
+    assert ai.generate("hi").content == "lm_studio:hi"
+    assert down.calls == 0
+
+def test_health_probe_is_cached():
+    primary = FakeProvider("ollama")
+    ai = make_ai(primary)
+    for _ in range(5):
+        ai.generate("hi")
+
+    assert primary.probes == 1
+
+def test_breaker_opens_after_repeated_failures():
+    flaky, backup = FakeProvider("ollama", fail=True), FakeProvider("lm_studio")
+    ai = make_ai(flaky, backup, threshold=2)
+    for _ in range(4):
+        assert ai.generate("hi").provider == "lm_studio"
+
+    # Two failures open the circuit; later requests go straight to the backup
+    assert flaky.calls == 2
+    assert ai.provider_status()["ollama"] == "open"
+
+def test_half_open_trial_closes_breaker():
+    flaky, backup = FakeProvider("ollama", fail=True), FakeProvider("lm_studio")
+    ai = make_ai(flaky, backup, threshold=1)
+    ai.generate("hi")
+    assert ai.provider_status()["ollama"] == "open"
+
+    flaky.fail = False
+    ai._health["ollama"].reset_timeout = 0
+    assert ai.generate("hi").provider == "ollama"
+    assert ai.provider_status()["ollama"] == "closed"
+
+def test_half_open_admits_a_single_trial():
+    flaky = FakeProvider("ollama", fail=True)
+    ai = make_ai(flaky, threshold=1)
+    with pytest.raises(RuntimeError):
+        ai.generate("hi")
+
+    health = ai._health["ollama"]
+    health.reset_timeout = 0.5
+    health.opened_at -= 1
+    assert health.allows_request() and not health.allows_request()  # Second caller waits for the trial
+    health.record_failure()
+    assert health.state == "open"
+
+def test_backups_are_not_probed_while_the_primary_serves():
+    primary, backup = FakeProvider("ollama"), FakeProvider("lm_studio")
+    ai = make_ai(primary, backup)
+    ai.generate("hi")
+    assert ai.is_available()
+    assert backup.probes == 0
+
+def test_all_failing_raises():
+    ai = make_ai(FakeProvider("ollama", fail=True), FakeProvider("lm_studio", up=False))
+    with pytest.raises(RuntimeError, match="ollama stalled"):
+        ai.generate("hi")
+
+def test_stream_fails_over_before_first_chunk():
+    ai = make_ai(FakeProvider("ollama", fail=True), FakeProvider("lm_studio"))
+    assert "".join(ai.generate_stream("hi")) == "lm_studio:hi"
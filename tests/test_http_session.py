@@ -0,0 +1,53 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.providers.session import PooledSession
+from src.providers.ollama import OllamaProvider
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"models": [{"name": "gemma3:latest"}]}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.block_on_close = False  # idle keep-alive connections must not block teardown
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+def test_session_defaults_and_timeouts():
+    session = PooledSession({"connect_timeout": 2, "read_timeout": 60})
+    assert session.timeout == (2.0, 60.0)
+    assert session.http_config["pool_size"] == 10
+
+def test_provider_reuses_connections(local_server):
+    host, port = local_server
+    provider = OllamaProvider(host=host, port=port, http_config={"pool_size": 2})
+    for _ in range(3):
+        assert provider.list_models() == ["gemma3:latest"]
+
+    stats = provider.connection_stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+
+def test_keep_alive_disabled_closes_connections(local_server):
+    host, port = local_server
+    provider = OllamaProvider(host=host, port=port, http_config={"keep_alive": False})
+    for _ in range(2):
+        provider.list_models()
+
+    assert provider.connection_stats()["connections_reused"] == 0
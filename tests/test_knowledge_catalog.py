@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from knowledge_catalog import KnowledgeCatalog
+
+def write_ki(root, ki_id, title, artifact="Notes"):
+    folder = os.path.join(root, ki_id, "artifacts")
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(root, ki_id, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"title": title}, f)
+    with open(os.path.join(folder, "notes.md"), "w", encoding="utf-8") as f:
+        f.write(artifact)
+
+def bump(path, seconds=10):
+    # Coarse filesystem clocks can give a rewrite the same mtime
+    mtime = os.path.getmtime(path) + seconds
+    os.utime(path, (mtime, mtime))
+
+def test_watcher_picks_up_added_changed_and_removed_items(tmp_path):
+    root = str(tmp_path / "ki")
+    write_ki(root, "water", "Water tanks")
+    changed = threading.Event()
+    catalog = KnowledgeCatalog(root, poll_interval=0.02, on_change=changed.set)
+    changed.clear()
+    catalog.start_watching()
+    try:
+        assert [ki["title"] for ki in catalog.listing] == ["Water tanks"]
+        assert catalog.get_item("water")["content"] == [{"name": "notes.md", "content": "Notes"}]
+        etag = catalog.etag
+
+        write_ki(root, "tents", "Winter tents")
+        assert changed.wait(5)
+        assert [ki["title"] for ki in catalog.listing] == ["Winter tents", "Water tanks"]
+        assert catalog.etag != etag
+
+        changed.clear()
+        artifact = os.path.join(root, "water", "artifacts", "notes.md")
+        with open(artifact, "w", encoding="utf-8") as f:
+            f.write("Tanks delivered")
+        bump(artifact)
+        assert changed.wait(5)
+        assert catalog.get_item("water")["content"] == [{"name": "notes.md", "content": "Tanks delivered"}]
+
+        changed.clear()
+        shutil.rmtree(os.path.join(root, "tents"))
+        assert changed.wait(5)
+        assert [ki["id"] for ki in catalog.listing] == ["water"]
+        assert catalog.get_item("tents") is None
+    finally:
+        catalog.stop_watching()
+
+def test_unchanged_tree_is_not_reloaded(tmp_path):
+    root = str(tmp_path / "ki")
+    write_ki(root, "water", "Water tanks")
+    catalog = KnowledgeCatalog(root)
+    assert not catalog.reload()
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from knowledge_index import DEFAULT_CACHE_PATH, KnowledgeIndex, chunk_markdown
+
+def write_ki(root, ki_id, name, text):
+    folder = os.path.join(root, ki_id, "artifacts")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+def make_index(tmp_path):
+    return KnowledgeIndex(str(tmp_path / "ki"), cache_path=str(tmp_path / "index.json"), refresh_interval=0)
+
+def test_cache_path_does_not_depend_on_the_working_directory():
+    assert os.path.isabs(DEFAULT_CACHE_PATH)
+    assert DEFAULT_CACHE_PATH.endswith(os.path.join("data", "cache", "knowledge_index.json"))
+
+def test_chunks_pack_paragraphs():
+    assert chunk_markdown("one\n\ntwo\n\n\nthree", max_chars=8) == ["one\n\ntwo", "three"]
+
+def test_search_ranks_the_most_relevant_chunk_first(tmp_path):
+    root = str(tmp_path / "ki")
+    write_ki(root, "water", "notes.md", "Water tanks were delivered to the camp in Khan Younis.\n\nWater filters too.")
+    write_ki(root, "tents", "notes.md", "Tents and blankets for the winter.")
+    write_ki(root, "mixed", "notes.md", "The budget covers tents, food and some water.")
+
+    results = make_index(tmp_path).search("water tanks")
+    assert results[0]["text"].startswith("Water tanks")
+    assert results[0]["score"] > results[-1]["score"]
+    assert all("water" in r["text"].lower() for r in results)
+    # Arabic marks are ignored on both sides
+    write_ki(root, "arabic", "notes.md", "مَاء للمخيم")
+    assert make_index(tmp_path).search("ماء")[0]["text"] == "مَاء للمخيم"
+
+def test_search_returns_at_most_k_chunks(tmp_path):
+    root = str(tmp_path / "ki")
+    for i in range(5):
+        write_ki(root, f"ki{i}", "notes.md", f"Family {i} needs shelter.")
+    index = make_index(tmp_path)
+    assert len(index.search("shelter", top_k=3)) == 3
+    assert len(index.search("shelter", top_k=10)) == 5
+    assert index.search("unrelated") == []
+
+def test_changed_and_deleted_documents_are_reindexed(tmp_path):
+    root = str(tmp_path / "ki")
+    path = write_ki(root, "water", "notes.md", "Water tanks were delivered.")
+    gone = write_ki(root, "tents", "notes.md", "Tents for the winter.")
+    index = make_index(tmp_path)
+    assert index.search("tanks")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Solar panels were installed.")
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    os.remove(gone)
+    assert index.refresh(force=True)
+    assert index.search("tanks") == []
+    assert index.search("tents") == []
+    assert index.search("solar")[0]["text"] == "Solar panels were installed."
+    assert not index.refresh(force=True)  # Nothing changed since
+
+    # A new index starts from the saved cache and keeps the update
+    reloaded = KnowledgeIndex(root, cache_path=str(tmp_path / "index.json"))
+    assert reloaded.search("solar")[0]["text"] == "Solar panels were installed."
+    assert reloaded.search("tanks") == []
@@ -0,0 +1,87 @@
+import os
+import numpy as np
+from PIL import Image
+from src.utils import media_catalog
+from src.utils.media_catalog import MediaCatalog, hamming, media_tokens
+
+def photo(path, size=(120, 90), seed=0):
+    # Smooth per-seed layout plus sensor noise: mid-tones, like a real picture
+    rng = np.random.default_rng(seed)
+    layout = Image.fromarray(rng.integers(40, 215, (6, 8, 3)).astype(np.uint8)).resize(size, Image.Resampling.BILINEAR)
+    pixels = np.clip(np.asarray(layout) + rng.normal(0, 12, (size[1], size[0], 3)), 0, 255).astype(np.uint8)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(pixels).save(path)
+
+def qr(path):
+    cells = np.kron(np.random.default_rng(1).integers(0, 2, (21, 21)), np.ones((5, 5))) * 255
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(cells.astype(np.uint8)).save(path)
+
+def test_tokens_fold_names_and_phone_numbers():
+    assert media_tokens("Abdallah (Ismaël)") == ["abdallah", "ismael"]
+    assert media_tokens("+972599197456") == media_tokens("0599197456") == ["599197456"]
+    assert media_tokens("Mohammed's kids") == ["mohammed", "kids"]
+
+def test_find_by_name_and_id(tmp_path):
+    root = tmp_path / "GAZA"
+    photo(str(root / "Abdallah (Ismael)" / "family.png"), size=(160, 120))
+    photo(str(root / "Abdallah (Ismael)" / "small.png"), size=(40, 30), seed=2)
+    qr(str(root / "Abdallah (Ismael)" / "donate.png"))
+    photo(str(root / "0599197456" / "a.png"), seed=3)
+    catalog = MediaCatalog(str(tmp_path / "media.sqlite"))
+    assert catalog.sync(str(root))["added"] == 4
+
+    found = catalog.find("Ismael", root=str(root))
+    assert [os.path.basename(m.path) for m in found] == ["family.png", "small.png"]  # Largest first, QR left out
+    assert (found[0].width, found[0].height) == (160, 120)
+    assert len(catalog.find("Ismael", max_qr=None)) == 3
+    assert catalog.find("abdallah ismael", min_size=found[1].size + 1) == found[:1]
+    assert [m.folder for m in catalog.find("+972599197456")] == ["0599197456"]
+    assert catalog.find("Khaled") == []
+
+def test_qr_codes_are_scored_by_look_and_name(tmp_path):
+    root = tmp_path / "media"
+    qr(str(root / "x" / "image1.png"))
+    photo(str(root / "x" / "qr-code-2024.png"))
+    photo(str(root / "x" / "photo.png"))
+    catalog = MediaCatalog(str(tmp_path / "media.sqlite"))
+    catalog.sync(str(root))
+    scores = {os.path.basename(m.path): m.qr_score for m in catalog.items()}
+    assert scores["image1.png"] >= media_catalog.QR_THRESHOLD
+    assert scores["qr-code-2024.png"] == 1.0
+    assert scores["photo.png"] < 0.5
+
+def test_sync_only_rereads_changed_files(tmp_path, monkeypatch):
+    root = tmp_path / "media"
+    photo(str(root / "ahmed" / "one.png"))
+    photo(str(root / "sara" / "two.png"), seed=4)
+    catalog = MediaCatalog(str(tmp_path / "media.sqlite"))
+    catalog.sync(str(root))
+
+    read = []
+    original = media_catalog.analyze_image
+    monkeypatch.setattr(media_catalog, "analyze_image", lambda p: read.append(os.path.basename(p)) or original(p))
+    assert catalog.sync(str(root)) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2}
+    assert read == []
+
+    edited = root / "ahmed" / "one.png"
+    photo(str(edited), size=(200, 100))
+    os.utime(edited, ns=(0, os.stat(edited).st_mtime_ns + 10**9))
+    os.remove(root / "sara" / "two.png")
+    photo(str(root / "khaled" / "three.png"), seed=5)
+    counts = MediaCatalog(str(tmp_path / "media.sqlite")).sync(str(root))
+    assert counts == {"added": 1, "updated": 1, "removed": 1, "unchanged": 0}
+    assert sorted(read) == ["one.png", "three.png"]
+    assert catalog.find("sara") == [] and catalog.find("ahmed")[0].width == 200
+
+def test_perceptual_hash_finds_resized_copies(tmp_path):
+    root = tmp_path / "media"
+    photo(str(root / "orig" / "portrait.png"), size=(160, 120))
+    Image.open(root / "orig" / "portrait.png").resize((80, 60)).save(root / "orig" / "portrait_small.png")
+    photo(str(root / "other" / "street.png"), size=(160, 120), seed=9)
+    catalog = MediaCatalog(str(tmp_path / "media.sqlite"))
+    catalog.sync(str(root))
+    original = catalog.find("portrait")[0]
+    copies = {os.path.basename(m.path) for m in catalog.duplicates(original.phash)}
+    assert copies == {"portrait.png", "portrait_small.png"}
+    assert hamming(original.phash, catalog.find("street")[0].phash) > 5
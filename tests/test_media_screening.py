@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+import media_screening
+from media_screening import ScreeningPool
+
+def image(path, color=(30, 120, 200)):
+    Image.fromarray(np.full((60, 80, 3), color, dtype=np.uint8)).save(path)
+    return path
+
+def submission(tmp_path, *files):
+    json_path = str(tmp_path / "970599_submission.json")
+    data = {"beneficiary_id": "970599", "screening_status": "pending",
+            "files": [{"path": f, "screening": "pending", "is_flagged": None, "blood_density": None} for f in files]}
+    return json_path, data
+
+def load(json_path):
+    with open(json_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_upload_is_acknowledged_before_screening_finishes(tmp_path, monkeypatch):
+    release = threading.Event()
+    original = media_screening.check_for_blood
+    monkeypatch.setattr(media_screening, "check_for_blood", lambda path: release.wait(5) and original(path))
+    photo = image(str(tmp_path / "photo.png"))
+    json_path, data = submission(tmp_path, photo)
+    pool = ScreeningPool(max_workers=1)
+
+    pool.write_submission(json_path, data)
+    future = pool.submit(json_path, photo)
+    # The request returns here, while the worker is still screening
+    assert not future.done()
+    assert load(json_path)["files"][0]["screening"] == "pending"
+
+    release.set()
+    assert future.result(5) == {"screening": "done", "is_flagged": False, "blood_density": 0.0}
+    saved = load(json_path)
+    assert saved["screening_status"] == "complete"
+    assert saved["files"][0]["screening"] == "done"
+
+def test_screening_failure_is_recorded_as_an_error(tmp_path, monkeypatch):
+    def broken(path):
+        raise OSError("truncated file")
+    monkeypatch.setattr(media_screening, "check_for_blood", broken)
+    photo = image(str(tmp_path / "photo.jpg"))
+    notes = str(tmp_path / "notes.pdf")
+    json_path, data = submission(tmp_path, photo, notes)
+    pool = ScreeningPool(max_workers=1)
+    pool.write_submission(json_path, data)
+
+    assert pool.submit(json_path, photo).result(5)["screening"] == "error"
+    assert load(json_path)["screening_status"] == "pending"  # notes.pdf is still queued
+    assert pool.submit(json_path, notes).result(5)["screening"] == "skipped"
+    saved = load(json_path)
+    assert [entry["screening"] for entry in saved["files"]] == ["error", "skipped"]
+    assert saved["files"][0]["error"] == "truncated file"
+    assert saved["screening_status"] == "complete"
+
+def test_resume_pending_requeues_unscreened_files(tmp_path):
+    red = image(str(tmp_path / "red.png"), color=(200, 10, 10))
+    blue = image(str(tmp_path / "blue.png"))
+    json_path, data = submission(tmp_path, red, blue)
+    data["files"][1].update({"screening": "done", "is_flagged": False, "blood_density": 0.0})
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    pool = ScreeningPool(max_workers=1)
+    assert pool.resume_pending(str(tmp_path)) == 1
+    pool.executor.shutdown(wait=True)
+    saved = load(json_path)
+    assert saved["screening_status"] == "complete"
+    assert saved["files"][0]["screening"] == "done"
+    assert saved["files"][0]["is_flagged"] is True
+    assert ScreeningPool(max_workers=1).resume_pending(str(tmp_path)) == 0
@@ -0,0 +1,33 @@
+from src.utils import normalize_campaigns
+from src.utils.normalize_campaigns import _extract_names, extract_names_from_title, extract_names_many
+
+BASE_TITLES = [
+    "Help Mohammed Yasser and his family rebuild their lives in Gaza, Palestine.",
+    "Help Fares and his family rebuild their lives",
+    "Support the Gaza evacuation of the Al-Masri family",
+    "Urgent: Help Ahmed and his children survive",
+    "Gaza Resilience Project Fundraiser",
+    "Khaled's family needs shelter",
+]
+# A campaign list repeats titles heavily (one row per donation)
+TITLES = [f"{t} #{i}" for t in BASE_TITLES for i in range(20)] * 25
+
+def test_batch_matches_single_calls():
+    assert extract_names_many(TITLES[:120]) == [extract_names_from_title(t) for t in TITLES[:120]]
+    assert extract_names_many(["", None]) == [{"display_name": "Anonymous", "full_name": None, "first_name": None}] * 2
+
+def test_results_are_independent_copies():
+    first = extract_names_from_title(BASE_TITLES[0])
+    first["display_name"] = "changed"
+    assert extract_names_from_title(BASE_TITLES[0])["display_name"] == "Mohammed Y."
+
+def test_each_distinct_title_is_parsed_once(monkeypatch):
+    parsed = []
+    original = normalize_campaigns._extract_names_uncached
+    monkeypatch.setattr(normalize_campaigns, "_extract_names_uncached", lambda t: parsed.append(t) or original(t))
+    _extract_names.cache_clear()
+
+    extract_names_many(TITLES)
+    extract_names_from_title(TITLES[0])
+    # 3000 titles, 120 distinct: the expensive parse runs once per distinct title
+    assert sorted(parsed) == sorted(set(TITLES))
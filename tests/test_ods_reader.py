@@ -0,0 +1,156 @@
+import zipfile
+from src.utils.ods_reader import StyleTable, col_to_idx, find_sheet, idx_to_col, iter_rows, list_sheets, read_sheet, read_sheets, read_styles
+
+CONTENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+    xmlns:dc="http://purl.org/dc/elements/1.1/">
+<office:body><office:spreadsheet>
+<table:table table:name="Main">
+  <table:table-column table:number-columns-repeated="2"/>
+  <table:table-column table:default-cell-style-name="ce9"/>
+  <table:table-row>
+    <table:table-cell office:value-type="string"><text:p>Campaign</text:p></table:table-cell>
+    <table:table-cell table:number-columns-repeated="3"/>
+    <table:table-cell office:value-type="string"><text:p>Amount</text:p></table:table-cell>
+  </table:table-row>
+  <table:table-row table:number-rows-repeated="2">
+    <table:table-cell table:number-columns-repeated="1024"/>
+  </table:table-row>
+  <table:table-row>
+    <table:table-cell table:style-name="Good" office:value-type="string"><text:p>Help <text:span>Noor</text:span><text:s text:c="2"/>now</text:p></table:table-cell>
+    <table:table-cell table:number-columns-repeated="2" table:style-name="ce3"/>
+    <table:table-cell office:value-type="date" office:date-value="2025-10-29T03:09:36"><text:p>29/10/2025</text:p></table:table-cell>
+    <table:table-cell office:value-type="float" office:value="12.5"><text:p>12,50</text:p>
+      <office:annotation><dc:creator>Ali</dc:creator><dc:date>2025-11-01T10:00:00</dc:date><text:p>paid via USDT</text:p></office:annotation>
+    </table:table-cell>
+  </table:table-row>
+  <table:table-row table:number-rows-repeated="2">
+    <table:table-cell office:value-type="string"><text:p>same</text:p></table:table-cell>
+    <table:covered-table-cell/>
+    <table:table-cell office:value-type="boolean" office:boolean-value="true"><text:p>TRUE</text:p></table:table-cell>
+  </table:table-row>
+  <table:table-row table:number-rows-repeated="1048000"><table:table-cell/></table:table-row>
+</table:table>
+<table:table table:name="Noor debts">
+  <table:table-row><table:table-cell office:value-type="string"><text:p>N1</text:p></table:table-cell></table:table-row>
+</table:table>
+</office:spreadsheet></office:body>
+</office:document-content>
+"""
+
+def make_ods(tmp_path):
+    path = tmp_path / "book.ods"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+        z.writestr("content.xml", CONTENT_XML)
+    return str(path)
+
+def test_column_letters_round_trip():
+    for idx in (0, 25, 26, 27, 701, 702):
+        assert col_to_idx(idx_to_col(idx)) == idx
+    assert idx_to_col(27) == "AB"
+
+def test_rows_repeats_and_typed_values(tmp_path):
+    rows = read_sheet(make_ods(tmp_path), "Main")
+    assert sorted(rows) == [1, 4, 5, 6]
+    assert rows[1].values() == {"A": "Campaign", "E": "Amount"}
+
+    row = rows[4]
+    assert row.get("A").text == "Help Noor  now"
+    assert row.get("D").raw_value == "2025-10-29T03:09:36"
+    amount = row.get("E")
+    assert amount.value == 12.5 and amount.text == "12,50"
+    assert row.values()["E"] == "12.5"
+    assert amount.annotation.author == "Ali"
+    assert amount.annotation.text == "paid via USDT"
+    assert row.styles == {"Good", "ce3"}
+
+    # Repeated row expanded; covered cell skipped but still advances columns
+    assert rows[5].values() == rows[6].values() == {"A": "same", "C": "TRUE"}
+    assert rows[5].get("C").value is True
+
+def test_column_default_style_applies(tmp_path):
+    rows = read_sheet(make_ods(tmp_path), "Main")
+    assert rows[5].get("C").style == "ce9"
+    assert rows[4].get("A").style == "Good"
+
+def test_sheet_filter_and_listing(tmp_path):
+    path = make_ods(tmp_path)
+    names = list_sheets(path)
+    assert names == ["Main", "Noor debts"]
+    assert find_sheet(names, "noor") == "Noor debts"
+    assert [r.sheet for r in iter_rows(path, sheets=lambda n: n.startswith("Noor"))] == ["Noor debts"]
+    both = read_sheets(path, names)
+    assert both["Noor debts"][1].values() == {"A": "N1"}
+
+def test_reads_extracted_content_xml(tmp_path):
+    (tmp_path / "content.xml").write_text(CONTENT_XML, encoding="utf-8")
+    from_dir = read_sheet(str(tmp_path), "Noor debts")
+    from_file = read_sheet(str(tmp_path / "content.xml"), "Noor debts")
+    assert from_dir[1].values() == from_file[1].values() == {"A": "N1"}
+
+STYLES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-styles
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0"
+    xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0">
+<office:styles>
+  <style:default-style style:family="table-cell"><style:table-cell-properties fo:background-color="transparent"/></style:default-style>
+  <style:style style:name="Default" style:family="table-cell"/>
+  <style:style style:name="Good" style:family="table-cell" style:parent-style-name="Default">
+    <style:table-cell-properties fo:background-color="#CCFFCC"/>
+  </style:style>
+  <style:style style:name="ro1" style:family="table-row"/>
+</office:styles>
+</office:document-styles>
+"""
+
+AUTOMATIC_STYLES = """<office:automatic-styles>
+  <style:style style:name="ce3" style:family="table-cell" style:parent-style-name="Good"/>
+  <style:style style:name="ce4" style:family="table-cell" style:parent-style-name="Good">
+    <style:table-cell-properties fo:background-color="#ff0000"/>
+  </style:style>
+  <style:style style:name="ce5" style:family="table-cell" style:parent-style-name="Good">
+    <style:table-cell-properties fo:background-color="transparent"/>
+  </style:style>
+</office:automatic-styles>
+"""
+
+def test_style_table_resolves_parent_backgrounds(tmp_path):
+    content = CONTENT_XML.replace('xmlns:dc=', 'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+                                  'xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0" xmlns:dc=')
+    content = content.replace("<office:body>", AUTOMATIC_STYLES + "<office:body>")
+    path = tmp_path / "styled.ods"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("content.xml", content)
+        z.writestr("styles.xml", STYLES_XML)
+
+    styles = read_styles(str(path))
+    assert styles.background("ce3") == "#ccffcc"
+    assert styles.background("ce4") == "#ff0000"
+    assert styles.background("Default") is None
+    assert styles.background("ce5") is None  # Explicitly cleared, not inherited from Good
+    assert "ro1" not in styles.styles
+
+    paid = styles.select(lambda color: color == "#ccffcc")
+    assert paid == {"Good", "ce3"}
+    rows = [r for r in iter_rows(str(path), sheets="Main") if r.index in (1, 4)]
+    assert StyleTable.flag_rows(rows, paid) == [False, True]
+
+def test_row_default_style_fills_cells_but_does_not_flag_the_row(tmp_path):
+    content = CONTENT_XML.replace(
+        '<table:table-row table:number-rows-repeated="2">\n    <table:table-cell office:value-type="string"><text:p>same',
+        '<table:table-row table:number-rows-repeated="2" table:default-cell-style-name="ce3">\n'
+        '    <table:table-cell office:value-type="string"><text:p>same')
+    assert content != CONTENT_XML
+    path = tmp_path / "row_default.ods"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("content.xml", content)
+
+    row = read_sheet(str(path), "Main")[5]
+    assert row.get("A").style == "ce3"
+    assert row.styles == set()
+    assert StyleTable.flag_rows([row], frozenset({"ce3"})) == [False]
@@ -0,0 +1,44 @@
+import os
+import yaml
+from src.utils.prompt_registry import PromptRegistry
+
+CAMPAIGN_PROMPT = os.path.join("prompts", "campaign", "create_campaign.md")
+
+def legacy_process_rules(rules, variables):
+    """The previous yaml.dump / str.replace round trip, kept as a reference"""
+    rules_str = yaml.dump(rules)
+    for k, v in variables.items():
+        rules_str = rules_str.replace(f"{{{k}}}", str(v))
+    return yaml.safe_load(rules_str)
+
+def test_registry_preloads_prompt_folder():
+    registry = PromptRegistry("prompts")
+    assert len(registry) >= 2
+    assert registry.get(CAMPAIGN_PROMPT) is registry.get(CAMPAIGN_PROMPT)
+
+def test_rules_match_legacy_substitution():
+    compiled = PromptRegistry(None).get(CAMPAIGN_PROMPT)
+    variables = {"project_title": "Clean Water for Gaza", "liq_debt_resolution": "500"}
+    with open(CAMPAIGN_PROMPT, encoding="utf-8") as f:
+        raw_rules = yaml.safe_load(f.read().split("### Validation Configuration")[1])
+
+    assert compiled.render_rules(variables) == legacy_process_rules(raw_rules, variables)
+    assert compiled.render_rules(variables)["primary"]["title_mention"]["value"] == "Clean Water for Gaza"
+    assert compiled.render_rules(variables)["secondary"]["min_words"]["value"] == 50
+
+def test_prompt_is_instructions_section_only():
+    compiled = PromptRegistry(None).get(CAMPAIGN_PROMPT)
+    text = compiled.format({"project_title": "T", "goal_amount": "€1", "context": "C", "liq_public_note": "N"})
+    assert text.startswith("Create a compelling fundraising campaign")
+    assert "Validation Configuration" not in text
+
+def test_template_recompiled_on_mtime_change(tmp_path):
+    path = tmp_path / "p.md"
+    path.write_text("### Instructions\nHello {name}", encoding="utf-8")
+    registry = PromptRegistry(None)
+    first = registry.get(str(path))
+    assert registry.get(str(path)) is first
+
+    path.write_text("### Instructions\nBye {name}", encoding="utf-8")
+    os.utime(path, (first.mtime + 5, first.mtime + 5))
+    assert registry.get(str(path)).format({"name": "Reem"}) == "Bye Reem"
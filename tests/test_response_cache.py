@@ -0,0 +1,84 @@
+import time
+from src.universal_ai import UniversalAI
+from src.providers.base import BaseProvider, AIResponse
+from src.providers.health import ProviderHealth
+from src.utils.response_cache import ResponseCache
+
+TEMPLATE = """## Prompt
+
+### Instructions
+Write about {project_title}.
+
+### Validation Configuration
+primary:
+  title_mention:
+    type: contains
+    value: "{project_title}"
+"""
+
+class CountingProvider(BaseProvider):
+    default_model = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return AIResponse(content=f"Story: {prompt}", model="fake-model", provider="ollama")
+
+    def is_available(self):
+        return True
+
+    def list_models(self):
+        return ["fake-model"]
+
+def response(text="hello"):
+    return AIResponse(content=text, model="m", provider="ollama")
+
+def test_key_depends_on_all_inputs():
+    base = ResponseCache.make_key("p", "ollama", "gemma3", {"temperature": 0.7})
+    assert base == ResponseCache.make_key("p", "ollama", "gemma3", {"temperature": 0.7})
+    assert base != ResponseCache.make_key("p", "ollama", "gemma3", {"temperature": 0.2})
+    assert base != ResponseCache.make_key("p", "lm_studio", "gemma3", {"temperature": 0.7})
+    assert base != ResponseCache.make_key("q", "ollama", "gemma3", {"temperature": 0.7})
+
+def test_ttl_expiry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite"), ttl_seconds=0.05)
+    cache.put("k", response())
+    assert cache.get("k").content == "hello"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    cache.put("a", response("a"))
+    time.sleep(0.01)
+    cache.put("b", response("b"))
+    time.sleep(0.01)
+    cache.get("a")  # refresh a, so b is now least recently used
+    time.sleep(0.01)
+    cache.put("c", response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").content == "a"
+    assert cache.get("c").content == "c"
+
+def test_run_validated_prompt_uses_cache(tmp_path):
+    template = tmp_path / "prompt.md"
+    template.write_text(TEMPLATE, encoding="utf-8")
+    provider = CountingProvider()
+    ai = UniversalAI(provider_name="ollama", failover=False)
+    ai.provider = provider
+    ai._health = {"ollama": ProviderHealth(provider)}
+    ai.cache = ResponseCache(str(tmp_path / "c.sqlite"))
+
+    first, validation = ai.run_validated_prompt(str(template), {"project_title": "Clean Water"})
+    second, _ = ai.run_validated_prompt(str(template), {"project_title": "Clean Water"})
+    assert provider.calls == 1
+    assert second.content == first.content
+    assert validation.passed
+
+    ai.run_validated_prompt(str(template), {"project_title": "Clean Water"}, bypass_cache=True)
+    ai.run_validated_prompt(str(template), {"project_title": "Clean Water"}, temperature=0.1)
+    assert provider.calls == 3
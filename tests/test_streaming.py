@@ -0,0 +1,65 @@
+import json
+import pytest
+from src.providers.ollama import OllamaProvider
+from src.providers.lm_studio import LMStudioProvider
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            yield line if decode_unicode else line.encode("utf-8")
+
+def test_ollama_stream_yields_ndjson_chunks(monkeypatch):
+    lines = [
+        json.dumps({"response": "Salam", "done": False}),
+        "",
+        json.dumps({"response": " Gaza", "done": False}),
+        json.dumps({"response": "", "done": True, "eval_count": 2}),
+    ]
+    captured = {}
+
+    def fake_post(url, json=None, stream=False, **kwargs):
+        captured.update(url=url, payload=json, stream=stream)
+        return FakeStreamResponse(lines)
+
+    provider = OllamaProvider()
+    monkeypatch.setattr(provider.session, "post", fake_post)
+    chunks = list(provider.generate_stream("hi", temperature=0.1))
+
+    assert chunks == ["Salam", " Gaza"]
+    assert captured["stream"] is True
+    assert captured["payload"]["stream"] is True
+    assert captured["payload"]["options"]["temperature"] == 0.1
+
+def test_lm_studio_stream_parses_sse(monkeypatch):
+    lines = [
+        ": keep-alive",
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+        'data: {"choices": [{"delta": {"content": "Hello"}}]}',
+        'data: {"choices": [{"delta": {"content": " world"}}]}',
+        "data: [DONE]",
+        'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+    ]
+    provider = LMStudioProvider()
+    monkeypatch.setattr(provider.session, "post", lambda *a, **k: FakeStreamResponse(lines))
+
+    assert "".join(provider.generate_stream("hi")) == "Hello world"
+
+def test_stream_errors_are_wrapped(monkeypatch):
+    lines = [json.dumps({"error": "model not found"})]
+    provider = OllamaProvider()
+    monkeypatch.setattr(provider.session, "post", lambda *a, **k: FakeStreamResponse(lines))
+
+    with pytest.raises(RuntimeError, match="model not found"):
+        list(provider.generate_stream("hi"))
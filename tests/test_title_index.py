@@ -0,0 +1,83 @@
+from src.utils import title_index
+from src.utils.title_index import TitleIndex, normalize_title
+
+EXISTING = [
+    {"title": "Help Fares and his family rebuild their lives", "url": "/fares"},
+    {"title": "Help Mohammed Yasser and his family rebuild their lives in Gaza, Palestine.", "url": "/yasser"},
+    {"title": "Gaza Resilience Project Fundraiser", "url": "/resilience"},
+    {"title": "Help Ahmed", "url": "/ahmed"},
+    {"title": "Help Mohammed Yasser Abu Ali and his family rebuild", "url": "/abuali"},
+]
+
+def old_is_double(title, existing):
+    # Previous check_for_double: normalized equality or containment either way
+    target = normalize_title(title)
+    return any(target == ext or target in ext or ext in target
+               for ext in (normalize_title(e["title"]) for e in existing))
+
+def test_normalization():
+    assert normalize_title("Help Al-Masrí & family!") == "help almasri family"
+    assert normalize_title(None) == ""
+
+def test_exact_and_truncated_titles_match():
+    index = TitleIndex(EXISTING)
+    match = index.find("help fares and his family REBUILD their lives!!")
+    assert (match.kind, match.value["url"]) == ("exact", "/fares")
+    # Title cut short by a length limit
+    match = index.find("Help Mohammed Yasser and his family rebuild their")
+    assert (match.kind, match.value["url"]) == ("prefix", "/yasser")
+
+def test_titles_with_words_added_in_front_match():
+    existing = [{"title": "Help Mohammed Yasser and his family rebuild their lives in Gaza", "url": "/yasser"}]
+    index = TitleIndex(existing)
+    title = "URGENT: Help Mohammed Yasser and his family rebuild their lives in Gaza"
+    assert old_is_double(title, existing)
+    match = index.find_unique(title)
+    assert (match.kind, match.value["url"]) == ("contained", "/yasser")
+    # And the other way round: the known title has the extra words
+    index.add(title, {"url": "/urgent-yasser"})
+    hits = {m.value["url"]: m.kind for m in index.matches("Mohammed Yasser and his family rebuild their lives in Gaza")}
+    assert hits == {"/yasser": "contained", "/urgent-yasser": "contained"}
+    # Too short to count as contained
+    assert "Mohammed Yasser in Gaza" not in index
+
+def test_reworded_titles_match_as_near_duplicates():
+    match = TitleIndex(EXISTING).find("Support Mohammed Yasser Abu Ali to rebuild in Gaza")
+    assert (match.kind, match.value["url"], match.score) == ("near", "/abuali", 1.0)
+
+def test_two_names_are_not_enough_for_a_near_match():
+    index = TitleIndex(EXISTING + [{"title": "Help Mohammed Ahmed and his children survive", "url": "/m-ahmed"}])
+    # Same two names, different campaigns
+    assert "Help Mohammed Ahmed and his family in Gaza" not in index
+    assert "Support Mohammed Yasser to rebuild in Gaza" not in index
+
+def test_find_unique_trusts_only_one_exact_or_prefix_match():
+    index = TitleIndex(EXISTING)
+    assert index.find_unique("Help Fares and his family rebuild their lives").value["url"] == "/fares"
+    assert index.find_unique("Help Mohammed Yasser and his family rebuild their").kind == "prefix"
+    assert index.find_unique("Support Mohammed Yasser Abu Ali to rebuild in Gaza") is None  # Near only
+    index.add("Help Fares and his family rebuild their lives", {"url": "/fares-2"})
+    assert index.find_unique("Help Fares and his family rebuild their lives") is None  # Ambiguous
+
+def test_short_and_template_titles_are_not_doubles():
+    index = TitleIndex(EXISTING)
+    # The containment check flagged this one: "help ahmed" is inside it
+    assert old_is_double("Help Ahmed and his children survive the winter in Gaza", EXISTING)
+    assert "Help Ahmed and his children survive the winter in Gaza" not in index
+    # Same template, different people
+    assert "Help Khaled and his family rebuild their lives" not in index
+    assert "Gaza Fundraiser" not in index
+
+def test_lookups_do_not_scan_every_title(monkeypatch):
+    existing = [{"title": f"Help Person{i} Family{i} Relative{i} rebuild in Gaza"} for i in range(2000)]
+    pending = [f"Help Newcomer{i} Kin{i} Cousin{i} survive" for i in range(300)] + ["Help Person7 Family7 Relative7 rebuild in Gaza"]
+    index = TitleIndex(existing)
+
+    compared = []
+    original = title_index.jaccard
+    monkeypatch.setattr(title_index, "jaccard", lambda a, b: compared.append(b) or original(a, b))
+    found = [title for title in pending if title in index]
+    assert found == [title for title in pending if old_is_double(title, existing)]
+    assert found == ["Help Person7 Family7 Relative7 rebuild in Gaza"]
+    # A full scan would compare each of the 301 titles with all 2000 known ones
+    assert len(compared) < len(pending) * 5
@@ -1,5 +1,6 @@
 import pytest
 from src.utils.debt_manager import DebtManager
+from src.utils.donation_store import DonationStore
 from src.utils.trust_manager import TrustProjection
 
 @pytest.fixture
@@ -9,7 +10,7 @@ def mock_manager(tmp_path):
     content += '"01/01/2026, 12:00:00","donation","$","1000.00","Shareholder A","card"\n'
     content += '"02/01/2026, 12:00:00","donation","$","500.00","Shareholder B","card"\n'
     d.write_text(content, encoding='utf-8')
-    return DebtManager(str(d))
+    return DebtManager(str(d), DonationStore(str(tmp_path / "donations.sqlite")))
 
 def test_trust_shares(mock_manager):
     engine = TrustProjection(mock_manager)
@@ -0,0 +1,45 @@
+from src.providers.base import AIResponse
+from src.utils.validator import ResponseValidator
+
+def resp(text):
+    return AIResponse(content=text, model="m", provider="p")
+
+RULES = {
+    "primary": {
+        "title": {"type": "contains", "value": "Clean Water", "message": "title missing"},
+        "no_tags": {"type": "not_contains", "value": "#"},
+    },
+    "secondary": {
+        "short": {"type": "max_chars", "value": 80},
+        "amount": {"type": "regex", "value": r"€\s?\d+"},
+    },
+}
+
+def test_legacy_rule_types_and_scoring():
+    result = ResponseValidator().validate(resp("Support CLEAN WATER now with €500 #gaza"), RULES)
+    assert result.criteria_results == {"title": True, "no_tags": False, "short": True, "amount": True}
+    assert result.passed is False
+    assert result.score == 0.75
+    assert result.suggestions == ["Primary Fail: no_tags"]
+
+def test_arabic_word_count_ignores_diacritics():
+    validator = ResponseValidator()
+    rules = {"primary": {"words": {"type": "min_words", "value": 3}, "cap": {"type": "max_words", "value": 3}}}
+    # Vocalized "bismillah ar-rahman ar-rahim": marks must not split words
+    assert validator.validate(resp("بِسْمِ اللَّهِ الرَّحْمَٰنِ"), rules).passed
+
+def test_json_schema_rule():
+    rules = {"primary": {"shape": {"type": "json_schema", "value": {
+        "type": "object",
+        "required": ["title", "tags"],
+        "properties": {"title": {"type": "string", "minLength": 3}, "tags": {"type": "array", "items": {"type": "string"}}},
+    }}}}
+    validator = ResponseValidator()
+    assert validator.validate(resp('```json\n{"title": "Help Reem", "tags": ["gaza"]}\n```'), rules).passed
+    assert not validator.validate(resp('{"title": "Help Reem", "tags": [1]}'), rules).passed
+    assert not validator.validate(resp("not json"), rules).passed
+
+def test_validate_many_compiles_once():
+    validator = ResponseValidator()
+    results = validator.validate_many([resp("Clean Water €5"), resp("nothing")], RULES)
+    assert [r.passed for r in results] == [True, False]
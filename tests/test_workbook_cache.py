@@ -0,0 +1,92 @@
+import os
+import zipfile
+from src.utils.ods_reader import iter_rows
+from src.utils.workbook_cache import WorkbookCache
+
+CONTENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+    xmlns:dc="http://purl.org/dc/elements/1.1/">
+<office:body><office:spreadsheet>
+<table:table table:name="Noor">
+  <table:table-row>
+    <table:table-cell office:value-type="string"><text:p>Campaign</text:p></table:table-cell>
+    <table:table-cell table:number-columns-repeated="3"/>
+    <table:table-cell office:value-type="string"><text:p>Amount</text:p></table:table-cell>
+  </table:table-row>
+  <table:table-row>
+    <table:table-cell table:style-name="Good" office:value-type="string"><text:p>Help Noor</text:p></table:table-cell>
+    <table:table-cell table:number-columns-repeated="3" table:style-name="ce3"/>
+    <table:table-cell office:value-type="float" office:value="{amount}"><text:p>{amount}</text:p>
+      <office:annotation><dc:creator>Ali</dc:creator><text:p>paid via USDT</text:p></office:annotation>
+    </table:table-cell>
+  </table:table-row>
+</table:table>
+<table:table table:name="Empty"><table:table-row><table:table-cell/></table:table-row></table:table>
+</office:spreadsheet></office:body>
+</office:document-content>
+"""
+
+def write_ods(path, amount):
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("content.xml", CONTENT_XML.format(amount=amount))
+    return str(path)
+
+def snapshot(rows):
+    return [(r.sheet, r.index, r.cells, r.styles) for r in rows]
+
+def test_cached_rows_match_streamed_rows(tmp_path):
+    source = write_ods(tmp_path / "book.ods", "12.5")
+    cache = WorkbookCache(str(tmp_path / "wb.sqlite"))
+
+    assert snapshot(cache.iter_rows(source)) == snapshot(iter_rows(source))
+    assert cache.sheets(source) == ["Noor", "Empty"]
+    cell = cache.get_cell(source, "Noor", "E", 2)
+    assert cell.value == 12.5 and cell.annotation.author == "Ali"
+    assert [r.index for r in cache.row_range(source, "Noor", 2, 70)] == [2]
+
+def test_unchanged_file_is_not_reparsed(tmp_path, capsys):
+    source = write_ods(tmp_path / "book.ods", "12.5")
+    db = str(tmp_path / "wb.sqlite")
+    WorkbookCache(db).materialize(source)
+    assert "Materializing" in capsys.readouterr().out
+
+    # A fresh instance (new process) reuses the stored tables
+    assert WorkbookCache(db).read_sheet(source, "Noor")[2].get("E").value == 12.5
+    assert "Materializing" not in capsys.readouterr().out
+
+def test_changed_file_replaces_old_version(tmp_path):
+    source = write_ods(tmp_path / "book.ods", "12.5")
+    cache = WorkbookCache(str(tmp_path / "wb.sqlite"))
+    cache.materialize(source)
+
+    write_ods(tmp_path / "book.ods", "99")
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10**9))
+    cache.materialize(source)
+
+    assert cache.get_cell(source, "Noor", "E", 2).value == 99.0
+    count = cache._conn.execute("SELECT COUNT(*) FROM workbooks").fetchone()[0]
+    assert count == 1
+
+def test_style_table_is_stored(tmp_path):
+    source = write_ods(tmp_path / "book.ods", "12.5")
+    cache = WorkbookCache(str(tmp_path / "wb.sqlite"))
+    # No styles.xml in this archive: the table is simply empty
+    assert len(cache.style_table(source)) == 0
+
+def test_annotation_search(tmp_path):
+    first = write_ods(tmp_path / "one.ods", "12.5")
+    second = write_ods(tmp_path / "two.ods", "30")
+    cache = WorkbookCache(str(tmp_path / "wb.sqlite"))
+
+    notes = cache.annotations(first)
+    assert [(n.sheet, n.cell, n.author, n.text, n.value) for n in notes] == [("Noor", "E2", "Ali", "paid via USDT", "12.5")]
+
+    hits = cache.search_annotations("usdt", sources=[first, second])
+    assert sorted(h.value for h in hits) == ["12.5", "30"]
+    assert cache.search_annotations("US", sources=[second])[0].workbook == second
+    assert cache.search_annotations('paid "via', author="ali")  # FTS syntax in input is neutralised
+    assert cache.search_annotations("paypal") == []
+    assert cache.search_annotations("usdt", sheet="Empty") == []
@@ -0,0 +1,66 @@
+import zipfile
+import pytest
+from src.utils.ods_reader import read_sheet
+from src.utils.workbook_index import WorkbookIndex
+
+CONTENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">
+<office:body><office:spreadsheet>
+<table:table table:name="Let&apos;s draw">
+  <table:table-row><table:table-cell office:value-type="string"><text:p>x</text:p></table:table-cell></table:table-row>
+</table:table>
+<table:table table:name="Noor">
+  <table:table-column table:default-cell-style-name="ce9" table:number-columns-repeated="5"/>
+  <table:table-row>
+    <table:table-cell office:value-type="string"><text:p>Campaign</text:p></table:table-cell>
+  </table:table-row>
+  {rows}
+  <table:table-row table:number-rows-repeated="3">
+    <table:table-cell office:value-type="string"><text:p>dup</text:p></table:table-cell>
+  </table:table-row>
+  <table:table-row table:number-rows-repeated="1048000"><table:table-cell/></table:table-row>
+</table:table>
+</office:spreadsheet></office:body>
+</office:document-content>
+"""
+
+ROW = ('<table:table-row><table:table-cell office:value-type="string"><text:p>Help {i}</text:p></table:table-cell>'
+       '<table:table-cell table:number-columns-repeated="3"/>'
+       '<table:table-cell office:value-type="float" office:value="{i}.5"><text:p>{i},5</text:p></table:table-cell>'
+       '</table:table-row>')
+
+@pytest.fixture
+def ods_path(tmp_path):
+    path = tmp_path / "book.ods"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("content.xml", CONTENT_XML.format(rows="\n".join(ROW.format(i=i) for i in range(2, 71))))
+    return str(path)
+
+def test_a1_lookup(ods_path):
+    index = WorkbookIndex(ods_path)
+    assert index.sheet_names() == ["Let's draw", "Noor"]
+    assert index.cell("Noor", "E12").value == 12.5
+    assert index.cell("Noor", "a12").text == "Help 12"
+    assert index.cell("Noor", "$A$72").text == index.cell("Noor", "A73").text == "dup"
+    assert index.cell("Noor", "E72") is None
+    assert index.cell("Noor", "A500") is None
+    assert index.row("Noor", 5).get("E").style == "ce9"
+
+def test_row_range_matches_streaming_reader(ods_path):
+    index = WorkbookIndex(ods_path)
+    streamed = read_sheet(ods_path, "Noor")
+    ranged = index.row_range("Noor", 1, 10 ** 7)
+    assert [r.index for r in ranged] == sorted(streamed)
+    assert all(r.cells == streamed[r.index].cells for r in ranged)
+    assert [r.index for r in index.row_range("Noor", 2, 70)] == list(range(2, 71))
+
+def test_extracted_content_xml_is_memory_mapped(ods_path, tmp_path):
+    with zipfile.ZipFile(ods_path) as z:
+        z.extract("content.xml", tmp_path / "extracted")
+    with WorkbookIndex(str(tmp_path / "extracted" / "content.xml")) as index:
+        assert index.cell("Noor", "E70").value == 70.5
+    with pytest.raises(KeyError):
+        WorkbookIndex(ods_path).row("Missing", 1)